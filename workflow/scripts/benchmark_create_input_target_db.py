@@ -0,0 +1,144 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: benchmark_create_input_target_db.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program benchmarks the list-based target table builder in
+		create_input_target_db.py at several input sizes. Synthetic RawData file
+		name lists are generated with a mix of PE & SE samples, and the time needed
+		to build & write out both target tables is reported for every size.
+	If pandas is installed, the original row-by-row DataFrame growth
+		(df.loc[len(df)] = [...]) is timed as well, up to a configurable size.
+
+List of functions:
+	synthetic_file_names(file_count, samples_per_cohort): Returns a list of
+		RawData-relative FASTQ file paths.
+	time_builder(lines, workdir): Times building & writing the target tables with
+		create_input_target_db.py.
+	time_legacy_builder(lines): Times the original row-by-row DataFrame growth.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	time
+	argparse
+	tempfile
+	pandas (optional)
+
+Procedure:
+	1. Loading required modules & defining the benchmark functions.
+	2. Assigning command line arguments.
+	3. Timing the builders at every input size & printing the results.
+
+Known bugs and limitations:
+	- The original builder is quadratic, so by default it is only timed up to
+		10,000 file names.
+
+Usage
+	./benchmark_create_input_target_db.py [--sizes 1000,10000,100000] [--legacy-max N]
+	OR
+	python benchmark_create_input_target_db.py [--sizes 1000,10000,100000] [--legacy-max N]
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define benchmark functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import time # enables timing of the runs
+import argparse # enables parsing of command line arguments
+import tempfile # enables creation of a temporary working directory
+
+# the builder being benchmarked lives next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import create_input_target_db as target_db
+from sample_paths import parse_raw_read_paths
+
+try:
+	import pandas as pd # enables timing of the original DataFrame builder
+except ImportError:
+	pd = None
+
+
+def synthetic_file_names(file_count, samples_per_cohort=50):
+	"""Return a list of RawData-relative FASTQ file paths, with 2 PE samples per SE sample."""
+	lines = []
+	sample_number = 0
+	while len(lines) < file_count:
+		cohort_id = f"PRJNA{100000 + sample_number // samples_per_cohort}"
+		sample_id = f"SRR{10000000 + sample_number}"
+		if sample_number % 3 == 2:
+			# single-end sample
+			lines.append(f"{cohort_id}/{sample_id}/{sample_id}.fastq")
+		else:
+			# paired-end sample
+			lines.append(f"{cohort_id}/{sample_id}/{sample_id}_1.fastq")
+			lines.append(f"{cohort_id}/{sample_id}/{sample_id}_2.fastq")
+		sample_number += 1
+	return lines[:file_count]
+
+
+def time_builder(lines, workdir):
+	"""Time building & writing the target tables with create_input_target_db.py."""
+	start = time.perf_counter()
+	sample_rows, cohort_rows = target_db.build_target_tables(lines)
+	target_db.write_target_table(os.path.join(workdir, "sample-target_info.txt"),
+		target_db.reads_df_column_headers, sample_rows)
+	target_db.write_target_table(os.path.join(workdir, "cohort-target_info.txt"),
+		target_db.assembly_df_column_headers, cohort_rows)
+	return time.perf_counter() - start, len(cohort_rows)
+
+
+def time_legacy_builder(lines):
+	"""Time the original row-by-row DataFrame growth, using the new row derivation."""
+	start = time.perf_counter()
+	target_sample_df = pd.DataFrame(columns=target_db.reads_df_column_headers)
+	target_cohort_df = pd.DataFrame(columns=target_db.assembly_df_column_headers)
+	for line in lines:
+		sample_row = target_db.build_sample_row(parse_raw_read_paths([line])[0])
+		target_sample_df.loc[len(target_sample_df)] = sample_row
+		target_cohort_df.loc[len(target_cohort_df)] = target_db.build_cohort_row(sample_row[0])
+	return time.perf_counter() - start, len(target_cohort_df)
+
+
+def main():
+	"""Parse the command line arguments & run the benchmark."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Benchmark the target table builder of create_input_target_db.py.")
+	parser.add_argument("--sizes", default="1000,10000,100000",
+		help="comma-separated numbers of file names to test (default: 1000,10000,100000)")
+	parser.add_argument("--legacy-max", type=int, default=10000,
+		help="largest size at which the original builder is timed (default: 10000)")
+	args = parser.parse_args()
+	sizes = [int(size) for size in args.sizes.split(",")]
+
+
+	# Part 3: Time the builders & print the results
+
+	if pd is None:
+		print("pandas is not installed: only the list-based builder is timed", file=sys.stderr)
+	print(f"{'file names':>12}{'builder (s)':>14}{'files/s':>12}{'cohort rows':>13}"
+		f"{'original (s)':>14}{'original cohort rows':>22}")
+	with tempfile.TemporaryDirectory() as workdir:
+		for size in sizes:
+			lines = synthetic_file_names(size)
+			builder_time, cohort_rows = time_builder(lines, workdir)
+			legacy_columns = f"{'-':>14}{'-':>22}"
+			if pd is not None and size <= args.legacy_max:
+				legacy_time, legacy_cohort_rows = time_legacy_builder(lines)
+				legacy_columns = f"{legacy_time:>14.2f}{legacy_cohort_rows:>22}"
+			print(f"{size:>12}{builder_time:>14.3f}{size / builder_time:>12.0f}{cohort_rows:>13}{legacy_columns}")
+
+
+if __name__ == "__main__":
+	main()
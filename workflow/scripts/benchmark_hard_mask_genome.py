@@ -0,0 +1,232 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: benchmark_hard_mask_genome.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program benchmarks the block-based hard-masking engine in hard_mask_genome.py
+		against the original line-by-line re.sub() version of the script, which is
+		taken from the git history (the version before the block engine was added).
+		A synthetic soft-masked FASTA file of configurable size is generated, masked
+		with both versions, and the run times, throughput & peak memory usage are
+		reported. Both versions are run as separate processes & measured the same
+		way, through instrument.py. The two outputs are checked to be identical.
+
+List of functions:
+	write_synthetic_fasta(file_path, genome_size, records, line_width, seed): Writes
+		a soft-masked FASTA file with random sequence & lowercase repeat regions.
+	write_baseline_script(script_path, output_file): Writes the version of
+		hard_mask_genome.py before the block engine, from the git history.
+	file_md5(file_path): Returns the MD5 checksum of a file.
+	run_timed(command, cwd): Runs a command & returns its wall time & peak memory usage.
+	run_benchmark(args, workdir): Generates the synthetic FASTA file, times both
+		versions & compares their outputs.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	time
+	random
+	shutil
+	hashlib
+	argparse
+	subprocess
+	tempfile
+	instrument (SPOT-BGC)
+
+Procedure:
+	1. Loading required modules & defining the benchmark functions.
+	2. Assigning command line arguments.
+	3. Generating the synthetic soft-masked FASTA file.
+	4. Timing the original & block-based masking, and comparing the outputs.
+
+Known bugs and limitations:
+	- The synthetic FASTA file is built by repeating a random 1 Mb template, so it is
+		not suitable for anything but speed measurements.
+	- The synthetic & output FASTA files need roughly 3 times the genome size in
+		free disk space in the working directory.
+	- Without --baseline-script, the original script is taken from the git history,
+		so the script must be run from a git clone of the pipeline.
+
+Usage
+	./benchmark_hard_mask_genome.py [--genome-size BP] [--records N] [--threads N]
+		[--workdir DIR] [--skip-legacy] [--baseline-script FILE]
+	OR
+	python benchmark_hard_mask_genome.py [--genome-size BP] [--records N] [--threads N]
+		[--workdir DIR] [--skip-legacy] [--baseline-script FILE]
+
+	The temporary working directory is removed at the end; a --workdir is kept.
+
+	For a GRCh38-scale run, use: --genome-size 3100000000 --records 25
+
+This script was written for Python 3.9.18.
+
+"""
+
+
+# Part 1: Import modules & define benchmark functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import time # enables timing of the runs
+import random # enables generation of random sequence
+import shutil # enables removal of the temporary working directory
+import hashlib # enables comparison of the output files
+import argparse # enables parsing of command line arguments
+import subprocess # enables reading the original script from the git history
+import tempfile # enables creation of a temporary working directory
+
+# the scripts being benchmarked live next to this script
+scripts_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, scripts_dir)
+from instrument import run_instrumented
+
+
+# function that only exists in the block-based version of hard_mask_genome.py
+ENGINE_MARKER = "def mask_block"
+
+
+def write_synthetic_fasta(file_path, genome_size, records, line_width, seed=1234):
+	"""Write a soft-masked FASTA file with random sequence & lowercase repeat regions."""
+	rng = random.Random(seed)
+	# build a 1 Mb template of random sequence with ~50% soft-masked runs
+	template_parts = []
+	template_length = 0
+	while template_length < 1000000:
+		run = "".join(rng.choice("ACGT") for _ in range(rng.randint(50, 500)))
+		if rng.random() < 0.5:
+			run = run.lower()
+		template_parts.append(run)
+		template_length += len(run)
+	template = "".join(template_parts)[:1000000]
+	record_size = genome_size // records
+	with open(file_path, "w") as outfile:
+		for record_number in range(records):
+			outfile.write(f">chr{record_number + 1} synthetic soft-masked record\n")
+			# rotate the template, so the records are not identical
+			offset = rng.randrange(len(template))
+			sequence = template[offset:] + template[:offset]
+			# each chunk is a whole number of lines, except for the last one of the record
+			chunk_size = len(sequence) // line_width * line_width
+			remaining = record_size
+			while remaining > 0:
+				chunk = sequence[:min(remaining, chunk_size)]
+				outfile.write("\n".join(chunk[i:i + line_width] for i in range(0, len(chunk), line_width)) + "\n")
+				remaining -= len(chunk)
+
+
+def write_baseline_script(script_path, output_file):
+	"""Write the version of hard_mask_genome.py before the block engine, from the git history.
+
+	The block engine was added by the oldest commit that added ENGINE_MARKER to the script,
+	so the baseline is the script as of the parent of that commit.
+	"""
+	script_dir, script_name = os.path.split(script_path)
+	engine_commits = subprocess.run(["git", "log", "--format=%H", "--reverse", "-S", ENGINE_MARKER,
+		"--", script_name], cwd=script_dir, capture_output=True, text=True, check=True).stdout.split()
+	if not engine_commits:
+		raise RuntimeError(f"No commit adding the block engine to {script_path} was found")
+	script = subprocess.run(["git", "show", f"{engine_commits[0]}^:./{script_name}"], cwd=script_dir,
+		capture_output=True, text=True, check=True).stdout
+	with open(output_file, "w") as outfile:
+		outfile.write(script)
+
+
+def file_md5(file_path):
+	"""Return the MD5 checksum of a file."""
+	md5 = hashlib.md5()
+	with open(file_path, "rb") as infile:
+		for chunk in iter(lambda: infile.read(16 * 1024 * 1024), b''):
+			md5.update(chunk)
+	return md5.hexdigest()
+
+
+def run_timed(command, cwd=None):
+	"""Run a command in the directory cwd & return its wall time in seconds & peak memory usage in MB.
+
+	A command that fails raises a RuntimeError.
+	"""
+	exit_code, measurements = run_instrumented(command, cwd=cwd)
+	if exit_code != 0:
+		raise RuntimeError(f"{' '.join(command)} failed with exit code {exit_code}")
+	return measurements["wall_s"], measurements["max_rss_mb"]
+
+
+def run_benchmark(args, workdir):
+	"""Generate the synthetic FASTA file in workdir, time both versions & compare their outputs."""
+	os.makedirs(workdir, exist_ok=True)
+	mask_script = os.path.join(scripts_dir, "hard_mask_genome.py")
+	input_fasta = os.path.join(workdir, "synthetic_softMask.fasta")
+	engine_fasta = os.path.join(workdir, "synthetic_engine_hardMask.fasta")
+	# the original script writes {input basename}_hardMask.fasta to its working directory
+	legacy_dir = os.path.join(workdir, "legacy")
+	legacy_fasta = os.path.join(legacy_dir, "synthetic_softMask_hardMask.fasta")
+
+
+	# Part 3: Generate the synthetic soft-masked FASTA file
+
+	start = time.perf_counter()
+	write_synthetic_fasta(input_fasta, args.genome_size, args.records, args.line_width)
+	print(f"Generated {args.genome_size} bp synthetic FASTA in {time.perf_counter() - start:.1f} s: {input_fasta}")
+	input_mb = os.path.getsize(input_fasta) / 1024 / 1024
+
+
+	# Part 4: Time both implementations & compare outputs
+
+	results = []
+	if not args.skip_legacy:
+		os.makedirs(legacy_dir, exist_ok=True)
+		baseline_script = args.baseline_script
+		if not baseline_script:
+			baseline_script = os.path.join(workdir, "hard_mask_genome_baseline.py")
+			write_baseline_script(mask_script, baseline_script)
+		legacy_time, legacy_rss = run_timed([sys.executable, os.path.abspath(baseline_script), input_fasta],
+			cwd=legacy_dir)
+		results.append(("re.sub line-by-line", legacy_time, legacy_rss))
+	engine_time, engine_rss = run_timed([sys.executable, mask_script, input_fasta,
+		"-o", engine_fasta, "-t", str(args.threads)])
+	results.append((f"block engine ({args.threads} threads)", engine_time, engine_rss))
+
+	print(f"{'implementation':<30}{'wall time (s)':>15}{'MB/s':>10}{'peak RSS (MB)':>15}")
+	for name, wall_time, peak_rss in results:
+		print(f"{name:<30}{wall_time:>15.2f}{input_mb / wall_time:>10.1f}{peak_rss:>15.1f}")
+	if not args.skip_legacy:
+		print(f"speed-up: {legacy_time / engine_time:.1f}x")
+		identical = file_md5(legacy_fasta) == file_md5(engine_fasta)
+		print(f"outputs identical: {identical}")
+		if not identical:
+			sys.exit(1)
+
+
+def main():
+	"""Parse the command line arguments & run the benchmark."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Benchmark hard_mask_genome.py against the original implementation.")
+	parser.add_argument("--genome-size", type=int, default=200000000,
+		help="total length of the synthetic genome in bp (default: 200000000)")
+	parser.add_argument("--records", type=int, default=5, help="number of FASTA records (default: 5)")
+	parser.add_argument("--line-width", type=int, default=60, help="FASTA line width (default: 60)")
+	parser.add_argument("--threads", type=int, default=os.cpu_count() or 1,
+		help="worker processes for the block-based engine (default: all cores)")
+	parser.add_argument("--workdir", help="directory for the synthetic & output files (default: temporary directory)")
+	parser.add_argument("--skip-legacy", action="store_true", help="only time the block-based engine")
+	parser.add_argument("--baseline-script",
+		help="original hard_mask_genome.py to compare to (default: taken from the git history)")
+	args = parser.parse_args()
+
+	workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="hard_mask_benchmark_"))
+	try:
+		run_benchmark(args, workdir)
+	finally:
+		if not args.workdir:
+			shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,181 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: benchmark_kraken_batch.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program benchmarks the batched Kraken2 human contig removal against the
+		original per-assembly loop on synthetic assemblies. It always times the
+		merge & split steps of kraken_batch.py, which are the overhead added by
+		batching. If a Kraken2 command & database are given, it also times one
+		Kraken2 run per assembly (the original loop) against one Kraken2 run on
+		the merged batch (with --memory-mapping).
+
+List of functions:
+	create_assemblies(assembly_dir, assembly_count, contigs, contig_length):
+		Writes synthetic assemblies & returns the batch manifest rows.
+	time_per_file(kraken_command, db_dir, batch, threads): Times one Kraken2 run per
+		assembly.
+	time_batched(kraken_command, db_dir, batch, batch_dir, threads): Times the
+		merge, one Kraken2 run & the split of a batch.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	time
+	random
+	shutil
+	argparse
+	subprocess
+	tempfile
+
+Procedure:
+	1. Loading required modules & defining the benchmark functions.
+	2. Assigning command line arguments.
+	3. Creating the synthetic assemblies.
+	4. Timing the merge & split steps, and (optionally) both Kraken2 strategies.
+
+Known bugs and limitations:
+	- The Kraken2 runs are only timed if the Kraken2 command & database are available.
+	- The synthetic contigs are random sequences, so Kraken2 leaves them all unclassified.
+
+Usage
+	./benchmark_kraken_batch.py [--assemblies N] [--contigs N] [--contig-length N]
+		[--kraken2 COMMAND] [--db DIR] [--threads N] [--workdir DIR]
+	OR
+	python benchmark_kraken_batch.py [--assemblies N] [--contigs N] [--contig-length N]
+		[--kraken2 COMMAND] [--db DIR] [--threads N] [--workdir DIR]
+
+	For the containerized Kraken2, use e.g.:
+		--kraken2 "apptainer exec workflow/containers/env-kraken2db.sif kraken2"
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define benchmark functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import time # enables timing of the runs
+import random # enables creation of synthetic contigs
+import shutil # enables locating the kraken2 executable
+import argparse # enables parsing of command line arguments
+import subprocess # enables running kraken2
+import tempfile # enables creation of a temporary working directory
+
+# the module being benchmarked lives next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import kraken_batch
+
+
+def create_assemblies(assembly_dir, assembly_count, contigs, contig_length):
+	"""Write synthetic assemblies & return the batch manifest rows."""
+	rng = random.Random(7)
+	batch = []
+	for assembly_number in range(assembly_count):
+		sample_id = f"SAMPLE{assembly_number:05d}"
+		assembly = os.path.join(assembly_dir, sample_id, sample_id + "_scaffolds.fasta")
+		os.makedirs(os.path.dirname(assembly), exist_ok=True)
+		with open(assembly, "w") as outfile:
+			for contig_number in range(contigs):
+				sequence = "".join(rng.choices("ACGT", k=contig_length))
+				outfile.write(f">NODE_{contig_number + 1}_length_{contig_length}_cov_5.0\n")
+				outfile.writelines(sequence[i:i + 60] + "\n" for i in range(0, contig_length, 60))
+		batch.append((sample_id, assembly, os.path.join(assembly_dir, "out", sample_id, sample_id)))
+	return batch
+
+
+def time_per_file(kraken_command, db_dir, batch, threads):
+	"""Time one Kraken2 run per assembly, as in the original loop."""
+	start = time.perf_counter()
+	for _, assembly, output_prefix in batch:
+		os.makedirs(os.path.dirname(output_prefix), exist_ok=True)
+		subprocess.run(kraken_command.split() + ["--db", db_dir, "--threads", str(threads),
+			"--output", output_prefix + "__kraken2_out.txt",
+			"--report", output_prefix + "__kraken2_report.txt",
+			"--unclassified-out", output_prefix + "_final.contigs_nonHuman.fasta", assembly],
+			check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+	return time.perf_counter() - start
+
+
+def time_batched(kraken_command, db_dir, batch, batch_dir, threads):
+	"""Time the merge, one Kraken2 run on the merged batch & the split."""
+	merged_fasta = os.path.join(batch_dir, "merged.fasta")
+	kraken_output = os.path.join(batch_dir, "merged__kraken2_out.txt")
+	unclassified_fasta = os.path.join(batch_dir, "merged_nonHuman.fasta")
+	start = time.perf_counter()
+	kraken_batch.merge_assemblies(batch, merged_fasta)
+	subprocess.run(kraken_command.split() + ["--db", db_dir, "--memory-mapping", "--threads", str(threads),
+		"--output", kraken_output, "--report", os.path.join(batch_dir, "merged__kraken2_report.txt"),
+		"--unclassified-out", unclassified_fasta, merged_fasta],
+		check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+	kraken_batch.split_results(batch, kraken_output, unclassified_fasta,
+		os.path.join(batch_dir, "merged__kraken2_report.txt"))
+	return time.perf_counter() - start
+
+
+def main():
+	"""Parse the command line arguments & run the benchmark."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Benchmark batched against per-assembly Kraken2 runs.")
+	parser.add_argument("--assemblies", type=int, default=200, help="number of synthetic assemblies (default: 200)")
+	parser.add_argument("--contigs", type=int, default=500, help="contigs per assembly (default: 500)")
+	parser.add_argument("--contig-length", type=int, default=2000, help="length of each contig (default: 2000)")
+	parser.add_argument("--kraken2", default="kraken2", help="Kraken2 command (default: kraken2)")
+	parser.add_argument("--db", default="resources/kraken2_human_db", help="Kraken2 database directory")
+	parser.add_argument("--threads", type=int, default=1, help="Kraken2 threads (default: 1)")
+	parser.add_argument("--workdir", help="directory for the synthetic assemblies (default: temporary directory)")
+	args = parser.parse_args()
+
+
+	# Part 3: Create the synthetic assemblies
+
+	work_dir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="spot-bgc_kraken_benchmark_"))
+	batch_dir = os.path.join(work_dir, "kraken2_batch")
+	os.makedirs(batch_dir, exist_ok=True)
+	batch = create_assemblies(work_dir, args.assemblies, args.contigs, args.contig_length)
+	print(f"{args.assemblies} synthetic assemblies of {args.contigs} contigs: {work_dir}")
+
+
+	# Part 4: Time the merge & split steps, and both Kraken2 strategies
+
+	results = []
+	merged_fasta = os.path.join(batch_dir, "merged.fasta")
+	start = time.perf_counter()
+	kraken_batch.merge_assemblies(batch, merged_fasta)
+	results.append(("merge (kraken_batch.py)", time.perf_counter() - start))
+	# without Kraken2, the merged file stands in for the unclassified contigs,
+	# and every contig is reported as unclassified
+	kraken_output = os.path.join(batch_dir, "merged__kraken2_out.txt")
+	with open(merged_fasta, "r") as infile, open(kraken_output, "w") as outfile:
+		outfile.writelines(f"U\t{line[1:].split()[0]}\t0\t{args.contig_length}\t0:1\n"
+			for line in infile if line.startswith(">"))
+	start = time.perf_counter()
+	kraken_batch.split_results(batch, kraken_output, merged_fasta)
+	results.append(("split (kraken_batch.py)", time.perf_counter() - start))
+
+	if shutil.which(args.kraken2.split()[0]) and os.path.isdir(args.db):
+		results.append(("kraken2 per assembly (original)",
+			time_per_file(args.kraken2, args.db, batch, args.threads)))
+		results.append(("kraken2 batched, --memory-mapping",
+			time_batched(args.kraken2, args.db, batch, batch_dir, args.threads)))
+	else:
+		print(f"{args.kraken2} or {args.db} not found: the Kraken2 runs are not timed", file=sys.stderr)
+
+	print(f"{'step':<36}{'time (s)':>10}")
+	for step, step_time in results:
+		print(f"{step:<36}{step_time:>10.3f}")
+	if not args.workdir:
+		shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,198 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: benchmark_snakefile_startup.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program benchmarks the start-up cost of the SPOT-BGC Snakefile for a
+		large synthetic sample sheet. It times loading the target files with the
+		cached target index (cold & warm cache), the original five pandas.read_csv()
+		calls (if pandas is installed), and a full `snakemake -n` DAG construction
+		with a cold & warm target index cache (if Snakemake is installed).
+
+List of functions:
+	create_project(project_dir, sample_count, fastq_template): Creates a synthetic
+		SPOT-BGC project directory with sample sheets & raw read files.
+	time_pandas_load(sample_sheet, cohort_sheet): Times the original pandas-based
+		loading of the target files.
+	dry_run_command(project_dir, snakemake_command): Returns the `snakemake -n`
+		command for the project directory.
+	time_dry_run(project_dir, snakemake_command): Times `snakemake -n` in the
+		project directory.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	time
+	shutil
+	argparse
+	subprocess
+	tempfile
+	pandas (optional)
+
+Procedure:
+	1. Loading required modules & defining the benchmark functions.
+	2. Assigning command line arguments.
+	3. Creating the synthetic project directory.
+	4. Timing the target file loading & the Snakemake dry-run.
+
+Known bugs and limitations:
+	- The dry-run is only timed if the snakemake command is available.
+	- Two thirds of the synthetic samples are paired-end, so 10,000 samples
+		correspond to roughly 16,700 raw read files.
+
+Usage
+	./benchmark_snakefile_startup.py [--samples N] [--workdir DIR] [--snakemake COMMAND]
+	OR
+	python benchmark_snakefile_startup.py [--samples N] [--workdir DIR] [--snakemake COMMAND]
+
+	The temporary project directory is removed at the end; a --workdir is kept.
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define benchmark functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import time # enables timing of the runs
+import shutil # enables locating the snakemake executable, copying the FASTQ template & removing the project
+import argparse # enables parsing of command line arguments
+import subprocess # enables running snakemake
+import tempfile # enables creation of a temporary working directory
+
+# the modules being benchmarked live next to this script
+scripts_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, scripts_dir)
+import create_input_target_db as target_db
+import target_index
+from benchmark_create_input_target_db import synthetic_file_names
+
+try:
+	import pandas as pd # enables timing of the original loading
+except ImportError:
+	pd = None
+
+
+def create_project(project_dir, sample_count, fastq_template=None):
+	"""Create a synthetic SPOT-BGC project directory with sample sheets & raw read files.
+
+	The raw read files are empty, unless a FASTQ template file is given, which is then
+	hard-linked (or copied, if hard links are not supported) to every raw read file.
+	"""
+	# 2 PE files per 2 of every 3 samples, 1 SE file per third sample
+	# (every third sample, counting from the third, is SE, so no PE sample is cut in half)
+	lines = synthetic_file_names(2 * sample_count - sample_count // 3)
+	sample_rows, cohort_rows = target_db.build_target_tables(lines)
+	resources_dir = os.path.join(project_dir, "resources")
+	os.makedirs(os.path.join(resources_dir, "Ref"), exist_ok=True)
+	target_db.write_target_table(os.path.join(resources_dir, target_db.output_file_sample),
+		target_db.reads_df_column_headers, sample_rows)
+	target_db.write_target_table(os.path.join(resources_dir, target_db.output_file_cohort),
+		target_db.assembly_df_column_headers, cohort_rows)
+	for line in lines:
+		# raw read files, so the dry-run finds the workflow inputs
+		raw_file = os.path.join(resources_dir, "RawData", line)
+		os.makedirs(os.path.dirname(raw_file), exist_ok=True)
+		if fastq_template is None:
+			open(raw_file, "w").close()
+		elif not os.path.exists(raw_file):
+			try:
+				os.link(fastq_template, raw_file)
+			except OSError:
+				shutil.copyfile(fastq_template, raw_file)
+	open(os.path.join(resources_dir, "Ref", "GCA_000001405.29_GRCh38.p14_genomic_hardMask.fasta"), "w").close()
+	# the workflow is linked into the project, as the rules use workflow/ relative paths
+	workflow_link = os.path.join(project_dir, "workflow")
+	if not os.path.exists(workflow_link):
+		os.symlink(os.path.dirname(scripts_dir), workflow_link)
+	return len({row[2] for row in sample_rows})
+
+
+def time_pandas_load(sample_sheet, cohort_sheet):
+	"""Time the original pandas-based loading of the target files."""
+	start = time.perf_counter()
+	pd.read_csv(sample_sheet, sep='\t').set_index('FileBase_Raw', drop=False)
+	pd.read_csv(sample_sheet, sep='\t').set_index('CohortBase_Raw', drop=False)
+	cohort_sample_df = pd.read_csv(sample_sheet, sep='\t').set_index('CohortSample', drop=False)
+	for read_id in ('1', '2', 'SE'):
+		cohort_sample_df[cohort_sample_df['ReadNum'] == read_id]
+	pd.read_csv(sample_sheet, sep='\t').set_index('FileBase_Trim', drop=False)
+	pd.read_csv(cohort_sheet, sep='\t').set_index('Cohort', drop=False)
+	return time.perf_counter() - start
+
+
+def dry_run_command(project_dir, snakemake_command):
+	"""Return the `snakemake -n` command for the project directory."""
+	return snakemake_command.split() + ["-n", "--quiet", "--cores", "1",
+		"--snakefile", os.path.join(project_dir, "workflow", "Snakefile"), "--directory", project_dir]
+
+
+def time_dry_run(project_dir, snakemake_command):
+	"""Time `snakemake -n` in the project directory."""
+	start = time.perf_counter()
+	subprocess.run(dry_run_command(project_dir, snakemake_command), check=True, stdout=subprocess.DEVNULL)
+	return time.perf_counter() - start
+
+
+def main():
+	"""Parse the command line arguments & run the benchmark."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Benchmark the start-up cost of the SPOT-BGC Snakefile.")
+	parser.add_argument("--samples", type=int, default=10000, help="number of synthetic samples (default: 10000)")
+	parser.add_argument("--workdir", help="project directory to create (default: temporary directory)")
+	parser.add_argument("--snakemake", default="snakemake", help="snakemake command (default: snakemake)")
+	args = parser.parse_args()
+
+
+	# Part 3: Create the synthetic project directory
+
+	project_dir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="spot-bgc_startup_benchmark_"))
+	try:
+		os.makedirs(project_dir, exist_ok=True)
+		sample_count = create_project(project_dir, args.samples)
+		sample_sheet = os.path.join(project_dir, "resources", target_db.output_file_sample)
+		cohort_sheet = os.path.join(project_dir, "resources", target_db.output_file_cohort)
+		cache_dir = os.path.join(project_dir, ".snakemake", "spot-bgc_target_index")
+		print(f"Synthetic project with {sample_count} samples: {project_dir}")
+
+
+		# Part 4: Time the target file loading & the dry-run
+
+		results = []
+		if pd is not None:
+			results.append(("pandas.read_csv x5 (original)", time_pandas_load(sample_sheet, cohort_sheet)))
+		shutil.rmtree(cache_dir, ignore_errors=True)
+		start = time.perf_counter()
+		target_index.load_target_index(sample_sheet, cohort_sheet, cache_dir)
+		results.append(("target index, cold cache", time.perf_counter() - start))
+		start = time.perf_counter()
+		target_index.load_target_index(sample_sheet, cohort_sheet, cache_dir)
+		results.append(("target index, warm cache", time.perf_counter() - start))
+
+		if shutil.which(args.snakemake.split()[0]):
+			shutil.rmtree(cache_dir, ignore_errors=True)
+			results.append(("snakemake -n, cold cache", time_dry_run(project_dir, args.snakemake)))
+			results.append(("snakemake -n, warm cache", time_dry_run(project_dir, args.snakemake)))
+		else:
+			print(f"{args.snakemake} not found: the dry-run is not timed", file=sys.stderr)
+
+		print(f"{'step':<34}{'time (s)':>10}")
+		for step, step_time in results:
+			print(f"{step:<34}{step_time:>10.3f}")
+	finally:
+		# the temporary project is removed, a --workdir is kept
+		if not args.workdir:
+			shutil.rmtree(project_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,326 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: benchmark_suite.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program benchmarks the SPOT-BGC Python tooling & the Snakemake DAG
+		construction on synthetic data at several scales, so that performance
+		regressions show up before a production run. Neither the containers nor
+		a network connection are needed.
+	For every scale (number of samples), a synthetic project is generated: a
+		resources/RawData/{COHORT_ID}/{SAMPLE_ID}/ tree with PE & SE FASTQ files of
+		a configurable read count & length (hard links to one random FASTQ file),
+		the target tables, and the list of filtered read files that
+		create_target_db.py parses. A soft-masked FASTA file of configurable length
+		is generated once.
+	Each script is run as a separate process, started through instrument.py so that
+		the memory of this process is not included, and its wall time, CPU time & peak
+		memory are measured as in instrument.py, keeping the fastest of several
+		repeats to reduce noise: create_input_target_db.py
+		(scanning the RawData tree), create_target_db.py, hard_mask_genome.py,
+		and `snakemake -n` (if Snakemake is installed). The results, with the
+		throughput of every run, are written to a JSON file.
+	If a baseline results file is given, the wall time & peak memory of every run
+		are compared to the baseline, & runs that are slower or larger than the
+		tolerance allows are reported as regressions.
+
+List of functions:
+	write_fastq(file_path, read_count, read_length, seed): Writes a FASTQ file with
+		random reads.
+	generate_project(project_dir, sample_count, fastq_template): Creates a synthetic
+		SPOT-BGC project with raw read files & the target file list.
+	run_benchmark(name, scale, command, items, unit, repeats, cwd): Runs one
+		benchmarked command & returns its result record.
+	compare_to_baseline(results, baseline, tolerance): Compares the results to a
+		baseline & returns the comparison rows.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	json
+	time
+	random
+	shutil
+	socket
+	argparse
+	platform
+	subprocess
+	tempfile
+	benchmark_snakefile_startup (SPOT-BGC)
+	benchmark_hard_mask_genome (SPOT-BGC)
+	instrument (SPOT-BGC)
+	sample_paths (SPOT-BGC)
+
+Procedure:
+	1. Loading required modules & defining the benchmark functions.
+	2. Assigning command line arguments.
+	3. Generating the synthetic FASTQ & FASTA files, and the project of every scale.
+	4. Running the benchmarks & writing out the results.
+	5. Comparing the results to the baseline.
+
+Known bugs and limitations:
+	- All raw read files of a project share the content of one FASTQ file, so the
+		files are only realistic in size, not in sequence.
+	- The dry-run at 100,000 samples takes a long time, so by default `snakemake -n`
+		is only timed up to 10,000 samples (see --dry-run-max).
+	- Results are only comparable to a baseline recorded on the same machine,
+		with the same settings.
+	- The peak memory of a script can not be lower than that of the instrument.py
+		process it is started from (about 13 MB), so smaller scripts are not resolved.
+
+Usage
+	./benchmark_suite.py generate --samples N --workdir DIR [--read-count N] [--read-length N]
+		[--genome-size BP]
+	./benchmark_suite.py run [--scales 100,1000,10000,100000] [--read-count N] [--read-length N]
+		[--genome-size BP] [--repeats N] [--dry-run-max N] [--snakemake COMMAND] [--workdir DIR] [--keep]
+		[--output FILE] [--baseline FILE] [--update-baseline] [--tolerance FRACTION]
+	OR
+	python benchmark_suite.py generate ...
+	python benchmark_suite.py run ...
+
+	With --baseline, the exit status is 1 if any run regressed. With --update-baseline,
+		the results are (also) written to the baseline file, & nothing is compared.
+	No baseline is shipped with the pipeline, as results are only comparable on the same
+		machine: record one with --baseline FILE --update-baseline first, e.g. before a
+		change, and compare later runs to it with --baseline FILE.
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define benchmark functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import json # enables writing & reading of the results
+import time # enables recording of the benchmark date
+import random # enables generation of random reads
+import shutil # enables locating the snakemake executable & removing the projects
+import socket # enables recording of the host name
+import argparse # enables parsing of command line arguments
+import platform # enables recording of the Python version
+import subprocess # enables discarding the output of the benchmarked scripts
+import tempfile # enables creation of a temporary working directory
+
+# the scripts being benchmarked live next to this script
+scripts_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, scripts_dir)
+from benchmark_snakefile_startup import create_project, dry_run_command
+from benchmark_hard_mask_genome import write_synthetic_fasta
+from instrument import run_instrumented
+from sample_paths import parse_raw_read_paths
+
+
+# default numbers of samples the benchmarks are run at
+DEFAULT_SCALES = "100,1000,10000,100000"
+
+# measurements compared to the baseline
+COMPARED_METRICS = ["wall_s", "max_rss_mb"]
+
+
+def write_fastq(file_path, read_count, read_length, seed=42):
+	"""Write a FASTQ file with random reads & quality scores."""
+	rng = random.Random(seed)
+	with open(file_path, "w") as outfile:
+		for read_number in range(read_count):
+			sequence = "".join(rng.choice("ACGT") for _ in range(read_length))
+			quality = "".join(chr(33 + rng.randint(20, 40)) for _ in range(read_length))
+			outfile.write(f"@synthetic.{read_number + 1}\n{sequence}\n+\n{quality}\n")
+
+
+def generate_project(project_dir, sample_count, fastq_template):
+	"""Create a synthetic SPOT-BGC project with raw read files & the target file list.
+
+	Returns the RawData-relative raw read file paths & the path of the target file list,
+	which lists the filtered read files as written by snakemake_100k_filt.sh.
+	"""
+	create_project(project_dir, sample_count, fastq_template)
+	raw_data_dir = os.path.join(project_dir, "resources", "RawData")
+	lines = sorted(os.path.relpath(os.path.join(root, file_name), raw_data_dir)
+		for root, _, file_names in os.walk(raw_data_dir) for file_name in file_names)
+	target_list = os.path.join(project_dir, "results", "DataNonHuman", "100k_Filt", "FullFileNamesTrimmed.txt")
+	os.makedirs(os.path.dirname(target_list), exist_ok=True)
+	with open(target_list, "w") as outfile:
+		outfile.writelines(f"{read_file.cohort}/{read_file.sample}_norm.{read_file.read}.fq\n"
+			for read_file in parse_raw_read_paths(lines))
+	# create_input_target_db.py copies its tables to the config/ directory of the project
+	os.makedirs(os.path.join(project_dir, "config"), exist_ok=True)
+	return lines, target_list
+
+
+def run_benchmark(name, scale, command, items, unit, repeats=1, cwd=None):
+	"""Run one benchmarked command & return its result record.
+
+	The command is run repeats times, & the measurements of the fastest run are kept.
+	The throughput is the number of items processed per second of wall time.
+	A command that fails raises a RuntimeError.
+	"""
+	measurements = None
+	for _ in range(repeats):
+		# the output of the benchmarked scripts is discarded, so it does not break up the results table
+		exit_code, run_measurements = run_instrumented(command, cwd=cwd, stdout=subprocess.DEVNULL,
+			stderr=subprocess.DEVNULL)
+		if exit_code != 0:
+			raise RuntimeError(f"{name} failed at scale {scale} with exit code {exit_code}: {' '.join(command)}")
+		if measurements is None or run_measurements["wall_s"] < measurements["wall_s"]:
+			measurements = run_measurements
+	record = {"benchmark": name, "scale": scale, "items": items, "unit": unit, "repeats": repeats}
+	record.update(measurements)
+	record["throughput"] = round(items / measurements["wall_s"], 1) if measurements["wall_s"] else None
+	print(f"{name:<26}{scale:>10}{measurements['wall_s']:>12.3f}{record['throughput'] or 0:>14.1f} {unit:<10}"
+		f"{measurements['max_rss_mb']:>14.1f}", flush=True)
+	return record
+
+
+def compare_to_baseline(results, baseline, tolerance):
+	"""Compare the wall time & peak memory of every run to the baseline.
+
+	Returns one row per run & metric that is in both: benchmark, scale, metric,
+	baseline value, current value, ratio & whether the run regressed (the ratio
+	exceeds 1 + tolerance).
+	"""
+	baseline_runs = {(record["benchmark"], record["scale"]): record for record in baseline["results"]}
+	rows = []
+	for record in results:
+		baseline_record = baseline_runs.get((record["benchmark"], record["scale"]))
+		if baseline_record is None:
+			continue
+		for metric in COMPARED_METRICS:
+			if not baseline_record.get(metric):
+				continue
+			ratio = record[metric] / baseline_record[metric]
+			rows.append((record["benchmark"], record["scale"], metric, baseline_record[metric],
+				record[metric], ratio, ratio > 1 + tolerance))
+	return rows
+
+
+def main():
+	"""Parse the command line arguments, generate the synthetic data & run the benchmarks."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Benchmark the SPOT-BGC tooling on synthetic data.")
+	subparsers = parser.add_subparsers(dest="step", required=True)
+	generate_parser = subparsers.add_parser("generate", help="only generate a synthetic project")
+	generate_parser.add_argument("--samples", type=int, required=True, help="number of synthetic samples")
+	generate_parser.add_argument("--workdir", required=True, help="project directory to create")
+	run_parser = subparsers.add_parser("run", help="run the benchmarks at every scale")
+	run_parser.add_argument("--scales", default=DEFAULT_SCALES,
+		help=f"comma-separated numbers of samples to benchmark (default: {DEFAULT_SCALES})")
+	run_parser.add_argument("--repeats", type=int, default=3,
+		help="runs of every benchmark, of which the fastest is kept (default: 3)")
+	run_parser.add_argument("--dry-run-max", type=int, default=10000,
+		help="largest number of samples at which `snakemake -n` is timed (default: 10000)")
+	run_parser.add_argument("--snakemake", default="snakemake", help="snakemake command (default: snakemake)")
+	run_parser.add_argument("--workdir", help="directory for the synthetic data (default: temporary directory)")
+	run_parser.add_argument("--keep", action="store_true", help="keep the synthetic projects after the run")
+	run_parser.add_argument("--output", default="spot-bgc_benchmark.json",
+		help="JSON results file to write (default: spot-bgc_benchmark.json)")
+	run_parser.add_argument("--baseline", help="JSON results file of an earlier run to compare to")
+	run_parser.add_argument("--update-baseline", action="store_true",
+		help="write the results to the baseline file instead of comparing to it")
+	run_parser.add_argument("--tolerance", type=float, default=0.25,
+		help="fraction by which a run may be slower or larger than the baseline (default: 0.25)")
+	for step_parser in (generate_parser, run_parser):
+		step_parser.add_argument("--read-count", type=int, default=1000,
+			help="reads per synthetic FASTQ file (default: 1000)")
+		step_parser.add_argument("--read-length", type=int, default=150,
+			help="length of the synthetic reads (default: 150)")
+		step_parser.add_argument("--genome-size", type=int, default=20000000,
+			help="length of the synthetic soft-masked FASTA in bp (default: 20000000)")
+	args = parser.parse_args()
+	if args.step == "run" and args.update_baseline and not args.baseline:
+		parser.error("--update-baseline requires --baseline")
+
+
+	# Part 3: Generate the synthetic FASTQ & FASTA files
+
+	if args.step == "generate":
+		workdir = os.path.abspath(args.workdir)
+	else:
+		workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="spot-bgc_benchmark_"))
+	os.makedirs(workdir, exist_ok=True)
+	fastq_template = os.path.join(workdir, "synthetic_reads.fastq")
+	write_fastq(fastq_template, args.read_count, args.read_length)
+	if args.step == "generate":
+		lines, target_list = generate_project(workdir, args.samples, fastq_template)
+		write_synthetic_fasta(os.path.join(workdir, "resources", "Ref", "synthetic_softMask.fasta"),
+			args.genome_size, max(args.genome_size // 50000000, 1), 60)
+		print(f"Synthetic project with {args.samples} samples & {len(lines)} raw read files: {workdir}")
+		print(f"Target file list: {target_list}")
+		return
+	softmask_fasta = os.path.join(workdir, "synthetic_softMask.fasta")
+	write_synthetic_fasta(softmask_fasta, args.genome_size, max(args.genome_size // 50000000, 1), 60)
+
+
+	# Part 4: Run the benchmarks & write out the results
+
+	results = []
+	print(f"{'benchmark':<26}{'scale':>10}{'wall (s)':>12}{'throughput':>14} {'':<10}{'peak RSS (MB)':>14}")
+	results.append(run_benchmark("hard_mask_genome", args.genome_size,
+		[sys.executable, os.path.join(scripts_dir, "hard_mask_genome.py"), softmask_fasta,
+		"-o", os.path.join(workdir, "synthetic_hardMask.fasta")],
+		os.path.getsize(softmask_fasta) / 1024 / 1024, "MB/s", args.repeats))
+	snakemake_found = shutil.which(args.snakemake.split()[0]) is not None
+	if not snakemake_found:
+		print(f"{args.snakemake} not found: the dry-run is not timed", file=sys.stderr)
+	for scale in [int(scale) for scale in args.scales.split(",")]:
+		project_dir = os.path.join(workdir, f"samples_{scale}")
+		lines, target_list = generate_project(project_dir, scale, fastq_template)
+		resources_dir = os.path.join(project_dir, "resources")
+		results.append(run_benchmark("create_input_target_db", scale,
+			[sys.executable, os.path.join(scripts_dir, "create_input_target_db.py"), "--scan", "RawData"],
+			len(lines), "files/s", args.repeats, cwd=resources_dir))
+		# (the table is not written to resources/, where it would mark the 100k filtration as done)
+		results.append(run_benchmark("create_target_db", scale,
+			[sys.executable, os.path.join(scripts_dir, "create_target_db.py"),
+			os.path.join(os.path.dirname(target_list), "benchmark_target_info_100k.txt"), target_list,
+			"noexclusion,noneexcluded"], len(lines), "files/s", args.repeats))
+		if snakemake_found and scale <= args.dry_run_max:
+			results.append(run_benchmark("snakemake_dry_run", scale,
+				dry_run_command(project_dir, args.snakemake), scale, "samples/s", args.repeats))
+		if not args.keep:
+			shutil.rmtree(project_dir)
+
+	report = {"time": int(time.time()), "host": socket.gethostname(), "python": platform.python_version(),
+		"settings": {"read_count": args.read_count, "read_length": args.read_length,
+		"genome_size": args.genome_size}, "results": results}
+	with open(args.output, "w") as outfile:
+		json.dump(report, outfile, indent=1)
+	print(f"Wrote the results of {len(results)} runs to {args.output}.", file=sys.stderr)
+	if args.workdir is None and not args.keep:
+		shutil.rmtree(workdir)
+
+
+	# Part 5: Compare the results to the baseline
+
+	if args.baseline is None:
+		return
+	if args.update_baseline:
+		with open(args.baseline, "w") as outfile:
+			json.dump(report, outfile, indent=1)
+		print(f"Updated the baseline {args.baseline}.", file=sys.stderr)
+		return
+	with open(args.baseline, "r") as infile:
+		baseline = json.load(infile)
+	if baseline.get("settings") != report["settings"]:
+		print("Warning: the baseline was recorded with different settings.", file=sys.stderr)
+	rows = compare_to_baseline(results, baseline, args.tolerance)
+	print(f"\n{'benchmark':<26}{'scale':>10}{'metric':>12}{'baseline':>12}{'current':>12}{'ratio':>8}")
+	for benchmark, scale, metric, baseline_value, value, ratio, regressed in rows:
+		print(f"{benchmark:<26}{scale:>10}{metric:>12}{baseline_value:>12.2f}{value:>12.2f}{ratio:>8.2f}"
+			f"{'  REGRESSION' if regressed else ''}")
+	regressions = sum(row[-1] for row in rows)
+	print(f"{regressions} of {len(rows)} measurements regressed by more than {args.tolerance:.0%}.")
+	if regressions:
+		sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,347 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: bgc_batch.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program batches the GECCO & antiSMASH BGC predictions of the SPOT-BGC
+		pipeline, so that the container is started, and the Pfam/HMM databases &
+		the GECCO model are loaded, only once for many small MAGs (bins) instead
+		of once per bin.
+	The bins of a cohort are packed into batches of a target size (in Mb). The merge
+		step writes all bins of a batch into one multi-record FASTA file, prefixing
+		each contig ID with the ID of its bin (e.g., S1_metabat2_minContig1500.3__k141_42),
+		and writes a manifest of the bins of the batch. After GECCO or antiSMASH has
+		been run once on the merged file, the split step splits the results back out
+		into the per-bin result files of the per-bin runs, removing the bin ID prefix
+		again, so that the cohort, sample & bin of every cluster are kept:
+			GECCO: the clusters GFF, the clusters, genes & features tables, and the
+				GenBank file of each cluster
+			antiSMASH: the JSON results (records, with the top-level fields of the batch),
+				and the GenBank file of each region
+
+List of functions:
+	pack_bins(bins_by_group, batch_mb): Packs the bins of each group (e.g., cohort)
+		into batches of about batch_mb megabases.
+	bin_label(bin_path): Returns the bin ID of a bin file.
+	bin_output_dir(bin_path, mag_root, result_root, tool): Returns the per-bin output
+		directory of a bin.
+	read_manifest(manifest_file): Reads a batch manifest into a list of
+		(label, bin, output_dir) tuples.
+	write_manifest(manifest_file, bin_paths, mag_root, result_root, tool): Writes the
+		manifest of a batch.
+	merge_bins(batch, merged_fasta): Writes the contigs of all bins of a batch into
+		one FASTA file, with labelled contig IDs.
+	split_table(batch, table_file, suffix, gff): Splits a GECCO GFF or table file
+		per bin.
+	split_genbank_files(batch, result_dir): Moves the per-cluster (or per-region)
+		GenBank files of a batch into the per-bin output directories.
+	split_gecco(batch, result_dir, merged_name): Splits the GECCO results of a batch
+		per bin.
+	split_antismash(batch, result_dir, merged_name): Splits the antiSMASH results of
+		a batch per bin.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	json
+	shutil
+	argparse
+
+Procedure:
+	1. Loading required modules & defining the packing, merge & split functions.
+	2. Assigning command line arguments.
+	3. Running the merge or split step.
+
+Known bugs and limitations:
+	- Bin IDs must not contain whitespace or the LABEL_SEPARATOR string; contig IDs
+		may not contain the LABEL_SEPARATOR string either.
+	- The antiSMASH HTML report, the full GenBank file & the other whole-run outputs
+		are written once per batch, and are not kept after the split.
+	- The antiSMASH JSON results of a batch are loaded into memory as a whole for the
+		split, so the batch size also bounds the memory used by the split.
+	- A bin is packed alone if it is larger than the batch size.
+
+Usage
+	./bgc_batch.py merge --tool {gecco,antismash} --mag-root DIR --result-root DIR
+		manifest_file merged_fasta bin [bin ...]
+	./bgc_batch.py split --tool {gecco,antismash} manifest_file merged_fasta result_dir result_list
+	OR
+	python bgc_batch.py merge ...
+	python bgc_batch.py split ...
+
+	Where the manifest_file is a tab-separated file with the columns label, bin &
+	output_dir (no header), result_dir is the output directory of the GECCO or
+	antiSMASH run on the merged FASTA file, and result_list is the list of the
+	per-bin result files (*.clusters.gff or *.json) to write.
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the packing, merge & split functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import json # enables splitting of the antiSMASH JSON results
+import shutil # enables removal of earlier per-bin antiSMASH results
+import argparse # enables parsing of command line arguments
+
+
+# separates the bin ID from the original contig ID in the merged FASTA file
+LABEL_SEPARATOR = "__"
+
+# size of the file buffers, as the bins & tables are streamed
+BUFFER_SIZE = 4 * 1024 * 1024
+
+# extension of the MetaBAT2 bin files
+BIN_EXTENSION = ".fa"
+
+# GECCO result tables, split by their first column (the sequence ID)
+GECCO_TABLES = [".clusters.tsv", ".genes.tsv", ".features.tsv"]
+
+
+def pack_bins(bins_by_group, batch_mb):
+	"""Pack the bins of each group into batches of about batch_mb megabases of bin files.
+
+	Bins are added to a batch until the next bin would take it over the target size,
+	so a bin larger than the target size makes up a batch of its own.
+	Returns a dictionary of batch ID ({group}.{batch number}): list of bin paths.
+	"""
+	target_bytes = batch_mb * 1e6
+	batches = {}
+	for group, bin_paths in sorted(bins_by_group.items()):
+		group_batches = [[]]
+		batch_bytes = 0
+		for bin_path in sorted(bin_paths):
+			bin_bytes = os.path.getsize(bin_path) if os.path.exists(bin_path) else 0
+			if group_batches[-1] and batch_bytes + bin_bytes > target_bytes:
+				group_batches.append([])
+				batch_bytes = 0
+			group_batches[-1].append(bin_path)
+			batch_bytes += bin_bytes
+		for batch_number, batch in enumerate(group_batches, start=1):
+			if batch:
+				batches[f"{group}.{batch_number}"] = batch
+	return batches
+
+
+def bin_label(bin_path):
+	"""Return the bin ID of a bin file, e.g. S1_metabat2_minContig1500.3."""
+	file_name = os.path.basename(bin_path)
+	return file_name[:-len(BIN_EXTENSION)] if file_name.endswith(BIN_EXTENSION) else file_name
+
+
+def bin_output_dir(bin_path, mag_root, result_root, tool):
+	"""Return the output directory of a bin, as used by the per-bin GECCO & antiSMASH rules.
+
+	GECCO writes the results of all bins of a sample (or cohort) to one directory, which
+	mirrors the directory of the bins below mag_root; antiSMASH writes the results of each
+	bin to a directory of its own in the cohort directory, e.g. for MAGs/PerSample/C1/S1/S1_...1.fa:
+		GECCO: {result_root}/C1/S1
+		antiSMASH: {result_root}/C1/S1_metabat2_minContig1500_1
+	"""
+	relative_dir = os.path.relpath(os.path.dirname(bin_path), mag_root)
+	if tool == "gecco":
+		return os.path.join(result_root, relative_dir)
+	cohort_id = relative_dir.split(os.sep)[0]
+	mag_id, _, bin_id = bin_label(bin_path).rpartition(".")
+	return os.path.join(result_root, cohort_id, f"{mag_id}_{bin_id}")
+
+
+def read_manifest(manifest_file):
+	"""Read a batch manifest into a list of (label, bin, output_dir) tuples."""
+	batch = []
+	with open(manifest_file, "r") as infile:
+		for line in infile:
+			if not line.strip():
+				continue
+			label, bin_path, output_dir = line.rstrip("\n").split("\t")
+			if LABEL_SEPARATOR in label or label != "".join(label.split()):
+				raise ValueError(f"Invalid batch label: {label}")
+			batch.append((label, bin_path, output_dir))
+	labels = [label for label, _, _ in batch]
+	if len(set(labels)) != len(labels):
+		raise ValueError(f"Batch labels in {manifest_file} are not unique")
+	return batch
+
+
+def write_manifest(manifest_file, bin_paths, mag_root, result_root, tool):
+	"""Write the manifest of a batch & return it as a list of (label, bin, output_dir) tuples."""
+	batch = [(bin_label(bin_path), bin_path, bin_output_dir(bin_path, mag_root, result_root, tool))
+		for bin_path in bin_paths]
+	if os.path.dirname(manifest_file):
+		os.makedirs(os.path.dirname(manifest_file), exist_ok=True)
+	with open(manifest_file, "w") as outfile:
+		outfile.writelines("\t".join(row) + "\n" for row in batch)
+	return read_manifest(manifest_file)
+
+
+def merge_bins(batch, merged_fasta):
+	"""Write the contigs of all bins of a batch into one FASTA file, with labelled contig IDs.
+
+	Returns the number of contigs written.
+	"""
+	contig_count = 0
+	with open(merged_fasta, "w", buffering=BUFFER_SIZE) as outfile:
+		for label, bin_path, _ in batch:
+			with open(bin_path, "r", buffering=BUFFER_SIZE) as infile:
+				for line in infile:
+					if line.startswith(">"):
+						outfile.write(">" + label + LABEL_SEPARATOR + line[1:])
+						contig_count += 1
+					else:
+						outfile.write(line)
+	return contig_count
+
+
+def split_table(batch, table_file, suffix, gff=False):
+	"""Split a GECCO GFF or table file of a batch into the per-bin files {output_dir}/{label}{suffix}.
+
+	The rows are assigned to the bins by their first column (the sequence ID); header
+	lines are written to every bin. Every bin gets a file, even if it has no rows.
+	Returns the dictionary of label: per-bin file.
+	"""
+	split_files = {label: os.path.join(output_dir, label + suffix) for label, _, output_dir in batch}
+	out_files = {}
+	try:
+		for label, split_file in split_files.items():
+			os.makedirs(os.path.dirname(split_file) or ".", exist_ok=True)
+			out_files[label] = open(split_file, "w", buffering=BUFFER_SIZE)
+		if not os.path.exists(table_file):
+			return split_files
+		with open(table_file, "r", buffering=BUFFER_SIZE) as infile:
+			# the first line of a table is its header
+			header_pending = not gff
+			for line in infile:
+				if not line.strip():
+					# blank lines belong to no bin
+					continue
+				if gff and line.startswith("##sequence-region"):
+					sequence_id = line.split()[1]
+				elif (gff and line.startswith("#")) or header_pending:
+					header_pending = False
+					# header lines are shared by all bins
+					for outfile in out_files.values():
+						outfile.write(line)
+					continue
+				else:
+					sequence_id = line.split("\t", 1)[0]
+				label = sequence_id.split(LABEL_SEPARATOR, 1)[0]
+				out_files[label].write(line.replace(label + LABEL_SEPARATOR, ""))
+	finally:
+		for outfile in out_files.values():
+			outfile.close()
+	return split_files
+
+
+def split_genbank_files(batch, result_dir):
+	"""Move the per-cluster (GECCO) or per-region (antiSMASH) GenBank files of a batch into the
+	per-bin output directories, removing the bin ID from their names & contents.
+
+	Returns the number of files moved.
+	"""
+	output_dirs = {label: output_dir for label, _, output_dir in batch}
+	moved = 0
+	for file_name in sorted(os.listdir(result_dir)):
+		label, separator, original_name = file_name.partition(LABEL_SEPARATOR)
+		if not file_name.endswith(".gbk") or not separator or label not in output_dirs:
+			continue
+		with open(os.path.join(result_dir, file_name), "r") as infile:
+			content = infile.read()
+		with open(os.path.join(output_dirs[label], original_name), "w") as outfile:
+			outfile.write(content.replace(label + LABEL_SEPARATOR, ""))
+		moved += 1
+	return moved
+
+
+def split_gecco(batch, result_dir, merged_name):
+	"""Split the GECCO results of a batch into the per-bin result files.
+
+	Returns the list of the per-bin clusters GFF files.
+	"""
+	gff_files = split_table(batch, os.path.join(result_dir, merged_name + ".clusters.gff"),
+		".clusters.gff", gff=True)
+	for suffix in GECCO_TABLES:
+		if os.path.exists(os.path.join(result_dir, merged_name + suffix)):
+			split_table(batch, os.path.join(result_dir, merged_name + suffix), suffix)
+	split_genbank_files(batch, result_dir)
+	return [gff_files[label] for label, _, _ in batch]
+
+
+def split_antismash(batch, result_dir, merged_name):
+	"""Split the antiSMASH results of a batch into the per-bin result files.
+
+	Each bin gets a JSON file with its own records (and their timings), and the
+	top-level fields of the batch results. Returns the list of the per-bin JSON files.
+	"""
+	with open(os.path.join(result_dir, merged_name + ".json"), "r") as infile:
+		results = json.load(infile)
+	records_by_label = {label: [] for label, _, _ in batch}
+	for record in results.get("records", []):
+		records_by_label[record["id"].split(LABEL_SEPARATOR, 1)[0]].append(record)
+	json_files = []
+	for label, bin_path, output_dir in batch:
+		# antiSMASH replaces its output directory, so the per-bin results are replaced as a whole
+		shutil.rmtree(output_dir, ignore_errors=True)
+		os.makedirs(output_dir)
+		bin_results = dict(results, input_file=os.path.basename(bin_path), records=records_by_label[label])
+		if isinstance(results.get("timings"), dict):
+			bin_results["timings"] = {record_id: timing for record_id, timing in results["timings"].items()
+				if record_id.startswith(label + LABEL_SEPARATOR)}
+		json_file = os.path.join(output_dir, label + ".json")
+		with open(json_file, "w") as outfile:
+			outfile.write(json.dumps(bin_results).replace(label + LABEL_SEPARATOR, ""))
+		json_files.append(json_file)
+	split_genbank_files(batch, result_dir)
+	return json_files
+
+
+def main():
+	"""Parse the command line arguments & run the merge or split step."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Pack bins for one GECCO or antiSMASH run & split the results.")
+	subparsers = parser.add_subparsers(dest="step", required=True)
+	merge_parser = subparsers.add_parser("merge", help="merge the bins of a batch into one FASTA file")
+	merge_parser.add_argument("--mag-root", required=True, help="MAG directory the bins are in")
+	merge_parser.add_argument("--result-root", required=True, help="directory of the per-bin results")
+	merge_parser.add_argument("manifest", help="tab-separated manifest to write: label, bin, output_dir")
+	merge_parser.add_argument("merged_fasta", help="merged FASTA file to write")
+	merge_parser.add_argument("bins", nargs="+", help="bin FASTA files of the batch")
+	split_parser = subparsers.add_parser("split", help="split the results of a batch per bin")
+	split_parser.add_argument("manifest", help="tab-separated manifest: label, bin, output_dir")
+	split_parser.add_argument("merged_fasta", help="merged FASTA file the predictor was run on")
+	split_parser.add_argument("result_dir", help="output directory of the predictor run")
+	split_parser.add_argument("result_list", help="list of the per-bin result files to write")
+	for step_parser in (merge_parser, split_parser):
+		step_parser.add_argument("--tool", required=True, choices=["gecco", "antismash"], help="BGC predictor")
+	args = parser.parse_args()
+
+
+	# Part 3: Run the merge or split step
+
+	if args.step == "merge":
+		batch = write_manifest(args.manifest, args.bins, args.mag_root, args.result_root, args.tool)
+		contig_count = merge_bins(batch, args.merged_fasta)
+		print(f"Merged {contig_count} contigs from {len(batch)} bins.", file=sys.stderr)
+	else:
+		batch = read_manifest(args.manifest)
+		merged_name = os.path.splitext(os.path.basename(args.merged_fasta))[0]
+		if args.tool == "gecco":
+			result_files = split_gecco(batch, args.result_dir, merged_name)
+		else:
+			result_files = split_antismash(batch, args.result_dir, merged_name)
+		with open(args.result_list, "w") as outfile:
+			outfile.writelines(result_file + "\n" for result_file in result_files)
+		print(f"Split the {args.tool} results of {len(batch)} bins.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,336 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: bgc_index.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program collects the BGC predictions of the SPOT-BGC pipeline into one
+		SQLite database, so that cohort-level questions can be answered without
+		opening thousands of GECCO & antiSMASH output files.
+	The GECCO *.clusters.gff files are read line by line. The antiSMASH JSON files
+		are streamed one record (contig) at a time, so memory use is bounded by the
+		largest contig rather than by the size of the JSON file. Files are parsed in
+		parallel on a pool of worker processes.
+	The database is updated incrementally: files already indexed with the same size
+		& modification time are skipped, changed files are re-parsed, and the BGCs of
+		files no longer listed are removed. The CheckM quality table is rebuilt on
+		every run, as it is small. MAG IDs are only unique within a cohort (a sample
+		can be part of more than one cohort), so MAGs are keyed on their layout,
+		cohort & MAG ID.
+
+	The database has the tables:
+		bgcs: one row per predicted BGC (layout, cohort_id, sample_id, mag_id, tool,
+			bgc_id, contig, start, end, bgc_type, score, contig_edge, source_file),
+			indexed on cohort_id, bgc_type & contig
+		mags: CheckM quality of each MAG (layout, cohort_id, mag_id, completeness,
+			contamination, strain_heterogeneity)
+		sources: the indexed files, with their size & modification time
+	and the view bgc_summary, which joins each BGC to the quality of its MAG.
+	Coordinates are 1-based & inclusive, as in GFF (antiSMASH coordinates are converted).
+
+List of functions:
+	iter_json_array(json_file, key): Streams the items of a top-level JSON array.
+	parse_bgc_path(bgc_file): Returns the layout, cohort, sample & MAG of a GECCO or
+		antiSMASH output file.
+	parse_gecco(gff_file): Returns the BGC rows of a GECCO *.clusters.gff file.
+	parse_antismash(json_file): Returns the BGC rows of an antiSMASH JSON file.
+	parse_bgc_file(bgc_file): Returns the BGC rows of a GECCO or antiSMASH file.
+	parse_checkm_path(table_file): Returns the layout & cohort of a CheckM table.
+	read_checkm_tables(table_files): Returns the quality rows of CheckM tab tables.
+	update_index(database, bgc_files, checkm_files, jobs): Updates the database.
+	read_file_lists(list_files): Reads the result file paths listed in text files.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	re
+	json
+	sqlite3
+	argparse
+	concurrent.futures
+
+Procedure:
+	1. Loading required modules & defining the parsing functions.
+	2. Assigning command line arguments.
+	3. Reading the lists of result files.
+	4. Updating the database.
+
+Known bugs and limitations:
+	- Only antiSMASH "region" features & GECCO cluster rows are indexed; the per-gene
+		annotations stay in the tool output files.
+	- GECCO BGCs have no contig_edge value, and antiSMASH BGCs have no score.
+	- Per-cohort MAGs have no sample ID.
+
+Usage
+	./bgc_index.py [--jobs N] --database FILE [--gecco LIST] [--antismash LIST] [--checkm LIST]
+	OR
+	python bgc_index.py [--jobs N] --database FILE [--gecco LIST] [--antismash LIST] [--checkm LIST]
+
+	Where each LIST is a text file with one result file path per line (e.g., the logs
+	of the gecco_perSample, antismash_perSample & mag_qc_perSample rules). Each option
+	can be given more than once.
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the parsing functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import re # enables regular expressions
+import json # enables parsing of the antiSMASH JSON files
+import sqlite3 # enables writing the SQLite database
+import argparse # enables parsing of command line arguments
+from concurrent.futures import ProcessPoolExecutor # enables parsing files in parallel
+
+
+# size of the chunks the antiSMASH JSON files are read in
+CHUNK_SIZE = 1024 * 1024
+
+# layout, cohort, sample (or cohort) & MAG of a GECCO or antiSMASH output file
+BGC_PATH = re.compile(r"(?:^|/)BGCs/(?:GECCO|AntiSMASH)/(PerSample|PerCohort)/([^/]+)/(?:[^/]+/)?"
+	r"(([^/]+)_metabat2_minContig1500\.[0-9]+)\.(?:clusters\.gff|json)$")
+
+# layout & cohort of a CheckM table: either the table of a batch (batch ID {cohort}.{batch number},
+# see checkm_batch.py) or the result file of one sample (or cohort)
+CHECKM_PATH = re.compile(r"(?:^|/)MAG_QC/(PerSample|PerCohort)/(?:batches/(.+)\.[0-9]+_CheckM_results\.txt|([^/]+)/)")
+
+# antiSMASH feature locations, e.g. [0:43210] or [<0:>43210](+)
+ANTISMASH_LOCATION = re.compile(r"\[<?([0-9]+):>?([0-9]+)\]")
+
+BGC_COLUMNS = ["layout", "cohort_id", "sample_id", "mag_id", "tool", "bgc_id", "contig", "start",
+	"end", "bgc_type", "score", "contig_edge", "source_file"]
+
+# the mags table & the bgc_summary view are rebuilt on every run, as the CheckM tables are small
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bgcs (layout TEXT, cohort_id TEXT, sample_id TEXT, mag_id TEXT, tool TEXT,
+	bgc_id TEXT, contig TEXT, start INTEGER, end INTEGER, bgc_type TEXT, score REAL, contig_edge INTEGER,
+	source_file TEXT);
+CREATE INDEX IF NOT EXISTS bgcs_cohort ON bgcs (cohort_id);
+CREATE INDEX IF NOT EXISTS bgcs_type ON bgcs (bgc_type);
+CREATE INDEX IF NOT EXISTS bgcs_contig ON bgcs (contig);
+CREATE INDEX IF NOT EXISTS bgcs_source ON bgcs (source_file);
+CREATE TABLE IF NOT EXISTS sources (source_file TEXT PRIMARY KEY, size INTEGER, mtime REAL, bgc_count INTEGER);
+DROP VIEW IF EXISTS bgc_summary;
+DROP TABLE IF EXISTS mags;
+CREATE TABLE mags (layout TEXT, cohort_id TEXT, mag_id TEXT, completeness REAL, contamination REAL,
+	strain_heterogeneity REAL, PRIMARY KEY (layout, cohort_id, mag_id));
+CREATE VIEW bgc_summary AS
+	SELECT bgcs.*, mags.completeness, mags.contamination, mags.strain_heterogeneity
+	FROM bgcs LEFT JOIN mags ON bgcs.layout = mags.layout AND bgcs.cohort_id = mags.cohort_id
+		AND bgcs.mag_id = mags.mag_id;
+"""
+
+
+def iter_json_array(json_file, key):
+	"""Stream the items of the top-level JSON array stored under key, one item at a time."""
+	decoder = json.JSONDecoder()
+	marker = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+	with open(json_file, "r") as infile:
+		# find the start of the array, keeping a tail in case the key is split across chunks
+		buffer = ""
+		while True:
+			chunk = infile.read(CHUNK_SIZE)
+			if not chunk:
+				return
+			buffer += chunk
+			match = marker.search(buffer)
+			if match:
+				buffer = buffer[match.end():]
+				break
+			buffer = buffer[-(len(key) + 16):]
+		# decode one item at a time, reading more of the file until the item is complete
+		read_size = CHUNK_SIZE
+		while True:
+			buffer = buffer.lstrip()
+			if buffer.startswith(","):
+				buffer = buffer[1:].lstrip()
+			if buffer.startswith("]"):
+				return
+			try:
+				item, end = decoder.raw_decode(buffer)
+			except json.JSONDecodeError:
+				chunk = infile.read(read_size)
+				if not chunk:
+					raise
+				buffer += chunk
+				# grow the reads, so that a large item is not decoded too many times
+				read_size *= 2
+				continue
+			yield item
+			buffer = buffer[end:]
+			read_size = CHUNK_SIZE
+
+
+def parse_bgc_path(bgc_file):
+	"""Return the layout, cohort ID, sample ID (None per cohort) & MAG ID of a GECCO or antiSMASH file."""
+	match = BGC_PATH.search(bgc_file.replace(os.sep, "/"))
+	if match is None:
+		raise ValueError(f"Not a SPOT-BGC GECCO or antiSMASH output file: {bgc_file}")
+	layout, cohort_id, mag_id, sample_id = match.groups()
+	return layout, cohort_id, (sample_id if layout == "PerSample" else None), mag_id
+
+
+def parse_gecco(gff_file):
+	"""Return the BGC rows (as lists, in BGC_COLUMNS order) of a GECCO *.clusters.gff file."""
+	layout, cohort_id, sample_id, mag_id = parse_bgc_path(gff_file)
+	rows = []
+	with open(gff_file, "r") as infile:
+		for line in infile:
+			if line.startswith("##FASTA"):
+				break
+			if line.startswith("#") or not line.strip():
+				continue
+			columns = line.rstrip("\n").split("\t")
+			if len(columns) < 9:
+				continue
+			attributes = dict(field.split("=", 1) for field in columns[8].split(";") if "=" in field)
+			score = attributes.get("average_p", columns[5])
+			rows.append([layout, cohort_id, sample_id, mag_id, "GECCO",
+				attributes.get("ID", f"{columns[0]}_{columns[3]}_{columns[4]}"), columns[0],
+				int(columns[3]), int(columns[4]), attributes.get("Type", "Unknown"),
+				float(score) if score not in ("", ".") else None, None, gff_file])
+	return rows
+
+
+def parse_antismash(json_file):
+	"""Return the BGC rows (as lists, in BGC_COLUMNS order) of an antiSMASH JSON file."""
+	layout, cohort_id, sample_id, mag_id = parse_bgc_path(json_file)
+	rows = []
+	for record in iter_json_array(json_file, "records"):
+		for feature in record.get("features", []):
+			if feature.get("type") != "region":
+				continue
+			qualifiers = feature.get("qualifiers", {})
+			location = ANTISMASH_LOCATION.search(feature.get("location", ""))
+			region_number = int(qualifiers.get("region_number", ["0"])[0])
+			contig_edge = qualifiers.get("contig_edge", [None])[0]
+			rows.append([layout, cohort_id, sample_id, mag_id, "antiSMASH",
+				f"{record['id']}.region{region_number:03d}", record["id"],
+				int(location.group(1)) + 1 if location else None, int(location.group(2)) if location else None,
+				",".join(qualifiers.get("product", ["Unknown"])), None,
+				None if contig_edge is None else int(contig_edge == "True"), json_file])
+	return rows
+
+
+def parse_bgc_file(bgc_file):
+	"""Return the BGC rows of a GECCO (*.clusters.gff) or antiSMASH (*.json) file."""
+	if bgc_file.endswith(".json"):
+		return parse_antismash(bgc_file)
+	return parse_gecco(bgc_file)
+
+
+def parse_checkm_path(table_file):
+	"""Return the layout & cohort ID of a CheckM table of a batch, sample or cohort."""
+	match = CHECKM_PATH.search(table_file.replace(os.sep, "/"))
+	if match is None:
+		raise ValueError(f"Not a SPOT-BGC CheckM table: {table_file}")
+	layout, batch_cohort_id, cohort_id = match.groups()
+	return layout, batch_cohort_id or cohort_id
+
+
+def read_checkm_tables(table_files):
+	"""Return the (layout, cohort_id, mag_id, completeness, contamination, strain_heterogeneity) rows of CheckM tab tables."""
+	rows = {}
+	for table_file in table_files:
+		layout, cohort_id = parse_checkm_path(table_file)
+		with open(table_file, "r") as infile:
+			header = infile.readline().rstrip("\n").split("\t")
+			columns = [header.index(name) if name in header else None
+				for name in ("Bin Id", "Completeness", "Contamination", "Strain heterogeneity")]
+			if columns[0] is None:
+				continue
+			for line in infile:
+				values = line.rstrip("\n").split("\t")
+				quality = [float(values[column]) if column is not None else None for column in columns[1:]]
+				rows[(layout, cohort_id, values[columns[0]])] = [layout, cohort_id, values[columns[0]]] + quality
+	return list(rows.values())
+
+
+def update_index(database, bgc_files, checkm_files, jobs=1):
+	"""Update the database with new & changed BGC files, and rebuild the MAG quality table.
+
+	Returns the numbers of parsed, unchanged & removed BGC files.
+	"""
+	file_stats = {}
+	for bgc_file in bgc_files:
+		stat = os.stat(bgc_file)
+		file_stats[bgc_file] = (stat.st_size, stat.st_mtime)
+
+	os.makedirs(os.path.dirname(database) or ".", exist_ok=True)
+	connection = sqlite3.connect(database)
+	try:
+		connection.executescript(SCHEMA)
+		indexed = {source_file: (size, mtime) for source_file, size, mtime
+			in connection.execute("SELECT source_file, size, mtime FROM sources")}
+		to_parse = sorted(bgc_file for bgc_file, stats in file_stats.items() if indexed.get(bgc_file) != stats)
+		removed = sorted(set(indexed) - set(file_stats))
+
+		with connection:
+			for source_file in removed + to_parse:
+				connection.execute("DELETE FROM bgcs WHERE source_file = ?", (source_file,))
+				connection.execute("DELETE FROM sources WHERE source_file = ?", (source_file,))
+			insert = f"INSERT INTO bgcs VALUES ({', '.join('?' * len(BGC_COLUMNS))})"
+			if jobs > 1 and len(to_parse) > 1:
+				with ProcessPoolExecutor(max_workers=jobs) as pool:
+					results = zip(to_parse, pool.map(parse_bgc_file, to_parse, chunksize=16))
+					for bgc_file, rows in results:
+						connection.executemany(insert, rows)
+						connection.execute("INSERT INTO sources VALUES (?, ?, ?, ?)",
+							(bgc_file, *file_stats[bgc_file], len(rows)))
+			else:
+				for bgc_file in to_parse:
+					rows = parse_bgc_file(bgc_file)
+					connection.executemany(insert, rows)
+					connection.execute("INSERT INTO sources VALUES (?, ?, ?, ?)",
+						(bgc_file, *file_stats[bgc_file], len(rows)))
+			connection.executemany("INSERT INTO mags VALUES (?, ?, ?, ?, ?, ?)", read_checkm_tables(checkm_files))
+	finally:
+		connection.close()
+	return len(to_parse), len(file_stats) - len(to_parse), len(removed)
+
+
+def read_file_lists(list_files):
+	"""Read the result file paths listed in list_files, one per line."""
+	paths = []
+	for list_file in list_files:
+		with open(list_file, "r") as infile:
+			paths.extend(line.strip() for line in infile if line.strip())
+	return paths
+
+
+def main():
+	"""Parse the command line arguments & update the BGC database."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Collect the GECCO & antiSMASH BGCs into one SQLite database.")
+	parser.add_argument("--database", required=True, help="SQLite database to create or update")
+	parser.add_argument("--gecco", action="append", default=[], help="file listing GECCO *.clusters.gff files")
+	parser.add_argument("--antismash", action="append", default=[], help="file listing antiSMASH JSON files")
+	parser.add_argument("--checkm", action="append", default=[], help="file listing CheckM tab tables")
+	parser.add_argument("--jobs", type=int, default=1, help="number of worker processes (default: 1)")
+	args = parser.parse_args()
+
+
+	# Part 3: Read the lists of result files
+
+	bgc_files = read_file_lists(args.gecco + args.antismash)
+	checkm_files = read_file_lists(args.checkm)
+
+
+	# Part 4: Update the database
+
+	parsed, unchanged, removed = update_index(args.database, bgc_files, checkm_files, args.jobs)
+	print(f"Indexed {parsed} new or changed BGC files ({unchanged} unchanged, {removed} removed) "
+		f"in {args.database}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,199 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: checkm_batch.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program batches the CheckM MAG quality checking & taxonomy steps of the
+		SPOT-BGC pipeline, so that CheckM loads its reference tree & marker
+		databases once per batch of bins instead of once per sample.
+	The bins of a batch are staged into one directory of symlinks, which CheckM
+		is run on. The combined tab-separated CheckM table of the batch is then
+		split back out into one result file per sample (or cohort), next to where
+		the unbatched runs wrote their results.
+	In incremental runs, CheckM is only run on the bins of new or changed samples
+		(see incremental.py), and the combined table of the batch is collected from
+		the result files of all of its samples.
+
+List of functions:
+	batch_bins(bins_by_group, batch_size): Splits the bins of each group (e.g.,
+		cohort) into batches of at most batch_size bins.
+	result_file(bin_path, mag_root, result_root, suffix): Returns the per-sample
+		(or per-cohort) result file of a bin.
+	stage_bins(bin_paths, staging_dir): Symlinks the bins of a batch into one
+		directory.
+	split_table(table_file, bin_paths, mag_root, result_root, suffix): Splits a
+		combined CheckM table into the per-sample (or per-cohort) result files.
+	collect_table(table_file, bin_paths, mag_root, result_root, suffix): Combines the
+		per-sample (or per-cohort) result files of a batch into one table.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	argparse
+
+Procedure:
+	1. Loading required modules & defining the batching functions.
+	2. Assigning command line arguments.
+	3. Staging the bins of a batch, or splitting or collecting the results of a batch.
+
+Known bugs and limitations:
+	- Bin file names must be unique within a batch; MetaBAT2 names the bins after
+		the sample (or cohort), so this holds for batches within one cohort.
+	- The bins of one sample are always kept in one batch, so a batch can exceed
+		checkm_batch_size if a single sample has more bins than that.
+	- Bins of a group without a row in the CheckM table get a result file with only
+		the header.
+
+Usage
+	From the Snakefile:
+		from checkm_batch import batch_bins
+
+	From the command line:
+		python checkm_batch.py stage staging_dir bin [bin ...]
+		python checkm_batch.py split --mag-root DIR --result-root DIR --suffix SUFFIX table bin [bin ...]
+		python checkm_batch.py collect --mag-root DIR --result-root DIR --suffix SUFFIX table bin [bin ...]
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the batching functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import argparse # enables parsing of command line arguments
+
+
+def batch_bins(bins_by_group, batch_size=0):
+	"""Split the bins of each group into batches of at most batch_size bins (0: one batch per group).
+
+	The bins of one directory (i.e., one sample) are never split across batches, as they share
+	a result file; a directory with more than batch_size bins makes up a batch of its own.
+	Returns a dictionary of batch ID ({group}.{batch number}): list of bin paths.
+	"""
+	batches = {}
+	for group, bin_paths in sorted(bins_by_group.items()):
+		bins_by_dir = {}
+		for bin_path in sorted(bin_paths):
+			bins_by_dir.setdefault(os.path.dirname(bin_path), []).append(bin_path)
+		group_batches = [[]]
+		for dir_bins in bins_by_dir.values():
+			if group_batches[-1] and batch_size and len(group_batches[-1]) + len(dir_bins) > batch_size:
+				group_batches.append([])
+			group_batches[-1].extend(dir_bins)
+		for batch_number, batch in enumerate(group_batches, start=1):
+			if batch:
+				batches[f"{group}.{batch_number}"] = batch
+	return batches
+
+
+def result_file(bin_path, mag_root, result_root, suffix):
+	"""Return the per-sample (or per-cohort) result file of a bin.
+
+	The result file mirrors the directory of the bin below mag_root, and is named
+	after that directory, e.g. MAGs/PerSample/C1/S1/S1_...1.fa -> MAG_QC/PerSample/C1/S1/S1{suffix}.
+	"""
+	relative_dir = os.path.relpath(os.path.dirname(bin_path), mag_root)
+	return os.path.join(result_root, relative_dir, os.path.basename(relative_dir) + suffix)
+
+
+def stage_bins(bin_paths, staging_dir):
+	"""Symlink the bins of a batch into one directory."""
+	os.makedirs(staging_dir, exist_ok=True)
+	for bin_path in bin_paths:
+		link = os.path.join(staging_dir, os.path.basename(bin_path))
+		if os.path.lexists(link):
+			raise ValueError(f"Bin {os.path.basename(bin_path)} occurs more than once in the batch")
+		os.symlink(os.path.abspath(bin_path), link)
+
+
+def split_table(table_file, bin_paths, mag_root, result_root, suffix):
+	"""Split a combined CheckM table into the per-sample (or per-cohort) result files.
+
+	CheckM names each bin (first column) after its file name without the extension.
+	Returns the number of result files written.
+	"""
+	bin_results = {}
+	for bin_path in bin_paths:
+		bin_id = os.path.splitext(os.path.basename(bin_path))[0]
+		bin_results[bin_id] = result_file(bin_path, mag_root, result_root, suffix)
+	rows_by_result = {result: [] for result in bin_results.values()}
+	with open(table_file, "r") as infile:
+		header = infile.readline()
+		for line in infile:
+			bin_id = line.split("\t", 1)[0]
+			if bin_id in bin_results:
+				rows_by_result[bin_results[bin_id]].append(line)
+	for result, rows in rows_by_result.items():
+		os.makedirs(os.path.dirname(result), exist_ok=True)
+		with open(result, "w") as outfile:
+			outfile.write(header)
+			outfile.writelines(rows)
+	return len(rows_by_result)
+
+
+def collect_table(table_file, bin_paths, mag_root, result_root, suffix):
+	"""Combine the per-sample (or per-cohort) result files of the bins of a batch into one table.
+
+	Result files that do not exist (yet) are skipped. Returns the number of result files combined.
+	"""
+	result_files = list(dict.fromkeys(result_file(bin_path, mag_root, result_root, suffix) for bin_path in bin_paths))
+	header = None
+	collected = 0
+	with open(table_file, "w") as outfile:
+		for result in result_files:
+			if not os.path.exists(result):
+				print(f"No CheckM results for {result}", file=sys.stderr)
+				continue
+			with open(result, "r") as infile:
+				result_header = infile.readline()
+				if header is None:
+					header = result_header
+					outfile.write(header)
+				outfile.writelines(infile)
+			collected += 1
+	return collected
+
+
+def main():
+	"""Parse the command line arguments & stage, split or collect a batch."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Stage bins for one CheckM run & split its results.")
+	subparsers = parser.add_subparsers(dest="step", required=True)
+	stage_parser = subparsers.add_parser("stage", help="symlink the bins of a batch into one directory")
+	stage_parser.add_argument("staging_dir", help="directory to create the symlinks in")
+	stage_parser.add_argument("bins", nargs="+", help="bin FASTA files")
+	split_parser = subparsers.add_parser("split", help="split the CheckM table of a batch per sample")
+	collect_parser = subparsers.add_parser("collect", help="combine the per-sample results of a batch into one table")
+	for table_parser in (split_parser, collect_parser):
+		table_parser.add_argument("--mag-root", required=True, help="MAG directory the bins are in")
+		table_parser.add_argument("--result-root", required=True, help="directory of the result files")
+		table_parser.add_argument("--suffix", required=True, help="suffix of the result files")
+		table_parser.add_argument("table", help="combined tab-separated CheckM table of the batch")
+		table_parser.add_argument("bins", nargs="+", help="bin FASTA files of the batch")
+	args = parser.parse_args()
+
+
+	# Part 3: Stage, split or collect the batch
+
+	if args.step == "stage":
+		stage_bins(args.bins, args.staging_dir)
+		print(f"Staged {len(args.bins)} bins in {args.staging_dir}.", file=sys.stderr)
+	elif args.step == "collect":
+		result_count = collect_table(args.table, args.bins, args.mag_root, args.result_root, args.suffix)
+		print(f"Collected the CheckM results of {result_count} files into {args.table}.", file=sys.stderr)
+	else:
+		result_count = split_table(args.table, args.bins, args.mag_root, args.result_root, args.suffix)
+		print(f"Split the CheckM results of {len(args.bins)} bins into {result_count} files.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
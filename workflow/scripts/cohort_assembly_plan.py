@@ -0,0 +1,102 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: cohort_assembly_plan.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This module plans the per-cohort MEGAHIT assemblies of the SPOT-BGC pipeline
+		from the per-sample target file. Each cohort is given exactly one assembly
+		mode: PE (only paired-end samples), SE (only single-end samples) or PEandSE
+		(both), together with the comma-joined lists of normalized read files that
+		MEGAHIT takes as input. The Snakefile creates one assembly job per cohort
+		from the plan, so no cohort is assembled twice.
+	The plan is built from the same rows as the target index (see target_index.py),
+		so the target file is only read once.
+
+List of functions:
+	plan_cohort_assemblies(sample_rows): Builds the assembly plan from the rows of
+		the per-sample target file.
+	write_tracking_files(plan, output_dir): Writes out the MEGAHIT tracking files
+		listing the cohorts of each assembly mode.
+
+List of standard and non-standard modules used:
+	os
+	argparse
+
+Procedure:
+	1. Loading required modules.
+	2. Grouping the normalized read files by cohort & read type, and assigning the
+		assembly mode of each cohort.
+	3. Writing out the tracking files (command line use).
+
+Known bugs and limitations:
+	- All normalized read files of a cohort are assembled together, as before; the
+		per-sample read count filtration does not apply to the per-cohort assembly.
+
+Usage
+	From the Snakefile (via the target index):
+		targets['cohort_assemblies'][cohort_id]
+
+	From the command line, to write out the tracking files:
+		python cohort_assembly_plan.py sample_target_file output_dir
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules
+
+# import necessary modules
+import os # allows access to the operating system
+import argparse # enables parsing of command line arguments
+
+
+# assembly modes, by whether a cohort has PE & SE samples
+ASSEMBLY_MODES = {(True, False): "PE", (False, True): "SE", (True, True): "PEandSE"}
+
+
+# Part 2: Plan the assemblies
+
+def plan_cohort_assemblies(sample_rows):
+	"""Build the assembly plan from the rows of the per-sample target file.
+
+	Returns a dictionary of cohort ID: {mode, r1, r2, se}, where r1, r2 & se are
+	the lists of normalized read files of the cohort, in target file order.
+	"""
+	reads = {}
+	for row in sample_rows:
+		cohort_reads = reads.setdefault(row["Cohort"], {"1": [], "2": [], "SE": []})
+		cohort_reads.setdefault(row["ReadNum"], []).append(row["Location_Norm"])
+	plan = {}
+	for cohort_id, cohort_reads in reads.items():
+		mode = ASSEMBLY_MODES.get((bool(cohort_reads["1"]), bool(cohort_reads["SE"])))
+		if mode is None:
+			# a cohort without forward or single-end reads cannot be assembled
+			continue
+		plan[cohort_id] = {"mode": mode, "r1": cohort_reads["1"], "r2": cohort_reads["2"],
+			"se": cohort_reads["SE"]}
+	return plan
+
+
+# Part 3: Write out the tracking files
+
+def write_tracking_files(plan, output_dir):
+	"""Write out the MEGAHIT tracking files listing the cohorts of each assembly mode."""
+	os.makedirs(output_dir, exist_ok=True)
+	for mode in ASSEMBLY_MODES.values():
+		with open(os.path.join(output_dir, "MEGAHIT_Tracking_" + mode + ".txt"), "w") as outfile:
+			outfile.writelines("results/DataNonHuman/BBNorm_Reads/" + cohort_id + "/\n"
+				for cohort_id, cohort_plan in plan.items() if cohort_plan["mode"] == mode)
+
+
+if __name__ == "__main__":
+	from target_index import read_target_table
+	parser = argparse.ArgumentParser(description="Plan the per-cohort MEGAHIT assemblies.")
+	parser.add_argument("sample_sheet", help="per-sample target file")
+	parser.add_argument("output_dir", help="directory to write the tracking files to")
+	args = parser.parse_args()
+	write_tracking_files(plan_cohort_assemblies(read_target_table(args.sample_sheet)), args.output_dir)
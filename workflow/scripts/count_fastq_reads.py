@@ -0,0 +1,304 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: count_fastq_reads.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program performs the minimum read count filtration of the normalized
+		samples in the SPOT-BGC pipeline. Reads are counted from the FASTQ line
+		structure (4 lines per record) by counting line breaks in large binary
+		buffers, and counting stops as soon as the threshold is reached.
+		Gzip-compressed FASTQ files (.fq.gz, written in the compressed preprocessing
+		mode) are decompressed while they are counted.
+	If the read quality checks (read_qc.py) already summarized a normalized file,
+		its read count is taken from the summary instead, and the file is not read.
+	Both mates of a paired-end sample are counted together, and a paired-end sample
+		only passes if both mates reach the threshold. Samples are counted in
+		parallel on a pool of worker processes.
+	The FASTQ files of passing samples are hard-linked (or, across file systems,
+		symlinked) into the filtered read directory instead of being copied, and a
+		per-sample read count table is written out. Links left over from an earlier
+		run, of samples that no longer pass (or no longer exist), are removed.
+
+List of functions:
+	count_fastq_reads(file_path, read_limit): Counts the reads in a FASTQ file,
+		stopping once read_limit reads have been counted.
+	summary_read_count(file_path, qc_dir): Returns the read count of a FASTQ file
+		from its read quality check summary, if there is one.
+	find_normalized_samples(input_dir): Groups the normalized FASTQ files into
+		paired-end & single-end samples.
+	count_sample(sample, read_limit, qc_dir): Counts the reads of all files of a sample.
+	link_file(source, destination): Hard-links a file, falling back to a symlink.
+	remove_stale_links(output_dir, linked_files): Removes the files of the cohort
+		directories of output_dir that were not linked by this run.
+	read_count_table(table_file): Reads a read count table into a list of row
+		dictionaries.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	gzip
+	json
+	argparse
+	concurrent.futures
+	sample_paths (SPOT-BGC)
+
+Procedure:
+	1. Loading required modules & defining the counting functions.
+	2. Assigning command line arguments.
+	3. Finding the normalized samples & counting their reads in parallel.
+	4. Linking the files of passing samples into the filtered read directory,
+		removing stale links, & writing out the read count table and the list of
+		passing files.
+
+Known bugs and limitations:
+	- Multi-line FASTQ records are not supported; each record must be exactly 4 lines.
+	- Unless --full-count is used, counting stops at the threshold, so the counts of
+		passing files are lower bounds (marked in the Count_Complete column).
+
+Usage
+	./count_fastq_reads.py [--input-dir DIR] [--output-dir DIR] [--min-reads N]
+		[--jobs N] [--table FILE] [--log FILE] [--full-count] [--qc-dir DIR]
+	OR
+	python count_fastq_reads.py [--input-dir DIR] [--output-dir DIR] [--min-reads N]
+		[--jobs N] [--table FILE] [--log FILE] [--full-count] [--qc-dir DIR]
+
+	Note that the default paths assume the script is run from the parent SPOT-BGC/ directory!
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define counting functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import gzip # enables reading of compressed FASTQ files
+import json # enables reading of the read quality check summaries
+import argparse # enables parsing of command line arguments
+from concurrent.futures import ProcessPoolExecutor # enables counting samples in parallel
+from sample_paths import parse_read_paths # derives the IDs of the normalized read files
+
+
+# size of the buffer used to read the FASTQ files
+BUFFER_SIZE = 16 * 1024 * 1024
+
+# columns of the read count table
+COUNT_TABLE_COLUMNS = ["Cohort", "Sample", "Layout", "Reads_R1", "Reads_R2", "Count_Complete", "Passed"]
+
+# extensions of the normalized FASTQ files, uncompressed & compressed
+FASTQ_EXTENSIONS = [".fq", ".fq.gz"]
+
+
+def count_fastq_reads(file_path, read_limit=None):
+	"""Count the reads in a FASTQ file, stopping once read_limit reads have been counted.
+
+	Returns the read count & whether the whole file was counted.
+	"""
+	line_limit = read_limit * 4 if read_limit else None
+	line_count = 0
+	last_byte = b'\n'
+	buffer = bytearray(BUFFER_SIZE)
+	view = memoryview(buffer)
+	if file_path.endswith(".gz"):
+		opened_file = gzip.open(file_path, "rb")
+	else:
+		opened_file = open(file_path, "rb", buffering=0)
+	with opened_file as infile:
+		while True:
+			bytes_read = infile.readinto(buffer)
+			if not bytes_read:
+				break
+			line_count += buffer.count(b'\n', 0, bytes_read)
+			last_byte = bytes(view[bytes_read - 1:bytes_read])
+			if line_limit and line_count >= line_limit:
+				if infile.read(1):
+					# the threshold was reached, so the rest of the file is not read
+					return line_count // 4, False
+	if last_byte != b'\n':
+		# the last line of the file does not end with a line break
+		line_count += 1
+	return line_count // 4, True
+
+
+def summary_read_count(file_path, qc_dir):
+	"""Return the read count of a FASTQ file from its read_qc.py summary, or None if there is none.
+
+	The summary of {cohort}/{name}.fq(.gz) is {qc_dir}/{cohort}/{name}_readqc.json.
+	"""
+	file_name = os.path.basename(file_path)
+	for extension in FASTQ_EXTENSIONS[::-1]:
+		if file_name.endswith(extension):
+			file_name = file_name[:-len(extension)]
+			break
+	cohort_id = os.path.basename(os.path.dirname(file_path))
+	summary_file = os.path.join(qc_dir, cohort_id, file_name + "_readqc.json")
+	try:
+		with open(summary_file, "r") as infile:
+			return int(json.load(infile)["reads"])
+	except (OSError, ValueError, KeyError):
+		return None
+
+
+def find_normalized_samples(input_dir):
+	"""Group the normalized FASTQ files into paired-end & single-end samples.
+
+	Returns a list of (cohort_id, sample_id, layout, [file paths]) tuples.
+	"""
+	file_paths = []
+	for cohort_id in sorted(os.listdir(input_dir)):
+		cohort_dir = os.path.join(input_dir, cohort_id)
+		if not os.path.isdir(cohort_dir):
+			continue
+		file_paths.extend(os.path.join(cohort_dir, file_name) for file_name in sorted(os.listdir(cohort_dir))
+			if "_norm." in file_name and file_name.endswith(tuple(FASTQ_EXTENSIONS)))
+	# derive the cohort, sample & read IDs of all files in one pass
+	read_files = parse_read_paths(file_paths)
+	# mates are paired by cohort, sample & compression
+	reverse_reads = {(read_file.cohort, read_file.sample, read_file.path.endswith(".gz")): read_file.path
+		for read_file in read_files if read_file.read == "2"}
+	samples = []
+	for read_file in read_files:
+		if read_file.read == "1":
+			mate_path = reverse_reads.get((read_file.cohort, read_file.sample, read_file.path.endswith(".gz")))
+			if mate_path:
+				samples.append((read_file.cohort, read_file.sample, "PE", [read_file.path, mate_path]))
+			else:
+				print(f"Skipping {read_file.cohort}/{os.path.basename(read_file.path)}: "
+					"the reverse reads are missing", file=sys.stderr)
+		elif read_file.read == "SE":
+			samples.append((read_file.cohort, read_file.sample, "SE", [read_file.path]))
+	return samples
+
+
+def count_sample(sample, read_limit, qc_dir=None):
+	"""Count the reads of all files of a sample, using the read quality check summaries in qc_dir if given.
+
+	Returns the sample, the read counts per file & whether all files were counted completely.
+	"""
+	counts = []
+	complete = True
+	for file_path in sample[3]:
+		read_count = summary_read_count(file_path, qc_dir) if qc_dir else None
+		if read_count is not None:
+			file_complete = True
+		else:
+			read_count, file_complete = count_fastq_reads(file_path, read_limit)
+		counts.append(read_count)
+		complete = complete and file_complete
+		if read_limit and read_count < read_limit:
+			# a mate below the threshold fails the whole sample
+			break
+	return sample, counts, complete
+
+
+def link_file(source, destination):
+	"""Hard-link a file, falling back to a symlink if both are on different file systems."""
+	if os.path.lexists(destination):
+		os.remove(destination)
+	try:
+		os.link(source, destination)
+	except OSError:
+		os.symlink(os.path.abspath(source), destination)
+
+
+def remove_stale_links(output_dir, linked_files):
+	"""Remove the files of the cohort directories of output_dir that are not in linked_files.
+
+	Returns the number of files removed.
+	"""
+	linked_files = {os.path.normpath(linked_file) for linked_file in linked_files}
+	removed = 0
+	for cohort_dir in os.scandir(output_dir):
+		if not cohort_dir.is_dir(follow_symlinks=False):
+			continue
+		for entry in os.scandir(cohort_dir.path):
+			if not entry.is_dir(follow_symlinks=False) and os.path.normpath(entry.path) not in linked_files:
+				os.remove(entry.path)
+				removed += 1
+	return removed
+
+
+def read_count_table(table_file):
+	"""Read a read count table into a list of row dictionaries."""
+	with open(table_file, "r") as infile:
+		header = infile.readline().rstrip("\n").split("\t")
+		return [dict(zip(header, line.rstrip("\n").split("\t"))) for line in infile if line.strip()]
+
+
+def main():
+	"""Parse the command line arguments & run the filtration."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Filter normalized samples by their read count.")
+	parser.add_argument("--input-dir", default="results/DataNonHuman/BBNorm_Reads",
+		help="directory of normalized reads, one sub-directory per cohort")
+	parser.add_argument("--output-dir", default="results/DataNonHuman/100k_Filt",
+		help="directory the files of passing samples are linked into")
+	parser.add_argument("--min-reads", type=int, default=100000,
+		help="minimum number of reads per file (default: 100000)")
+	parser.add_argument("--jobs", type=int, default=1, help="number of worker processes (default: 1)")
+	parser.add_argument("--table", default="results/DataNonHuman/100k_Filt/100k_read_counts.tsv",
+		help="per-sample read count table")
+	parser.add_argument("--log", default="logs/100k_filt.txt", help="list of the files of passing samples")
+	parser.add_argument("--full-count", action="store_true",
+		help="count all reads instead of stopping at the threshold")
+	parser.add_argument("--qc-dir", default=None,
+		help="directory of read_qc.py summaries of the normalized reads, whose read counts are used if present")
+	args = parser.parse_args()
+
+	read_limit = None if args.full_count else args.min_reads
+
+
+	# Part 3: Find the normalized samples & count their reads
+
+	samples = find_normalized_samples(args.input_dir)
+	if args.jobs > 1:
+		with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+			results = list(pool.map(count_sample, samples, [read_limit] * len(samples),
+				[args.qc_dir] * len(samples)))
+	else:
+		results = [count_sample(sample, read_limit, args.qc_dir) for sample in samples]
+
+
+	# Part 4: Link passing files & write out the results
+
+	passing_files = []
+	linked_files = []
+	table_rows = []
+	for (cohort_id, sample_id, layout, file_paths), counts, complete in results:
+		passed = len(counts) == len(file_paths) and min(counts) >= args.min_reads
+		if passed:
+			os.makedirs(os.path.join(args.output_dir, cohort_id), exist_ok=True)
+			for file_path in file_paths:
+				link_file(file_path, os.path.join(args.output_dir, cohort_id, os.path.basename(file_path)))
+				linked_files.append(os.path.join(args.output_dir, cohort_id, os.path.basename(file_path)))
+				passing_files.append(file_path)
+		# a mate that was not counted is reported as NA
+		counts = [str(count) for count in counts] + ["NA"] * (2 - len(counts))
+		table_rows.append([cohort_id, sample_id, layout, counts[0], counts[1], str(complete), str(passed)])
+
+	if os.path.isdir(args.output_dir):
+		stale_count = remove_stale_links(args.output_dir, linked_files)
+		if stale_count:
+			print(f"Removed {stale_count} stale files from {args.output_dir}.", file=sys.stderr)
+
+	os.makedirs(os.path.dirname(args.table) or ".", exist_ok=True)
+	with open(args.table, "w") as outfile:
+		outfile.write("\t".join(COUNT_TABLE_COLUMNS) + "\n")
+		outfile.writelines("\t".join(row) + "\n" for row in table_rows)
+	os.makedirs(os.path.dirname(args.log) or ".", exist_ok=True)
+	with open(args.log, "w") as outfile:
+		outfile.writelines(file_path + "\n" for file_path in passing_files)
+	passed_count = sum(row[-1] == "True" for row in table_rows)
+	print(f"{passed_count} of {len(table_rows)} samples have at least {args.min_reads} reads.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
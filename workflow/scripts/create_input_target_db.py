@@ -11,21 +11,59 @@ Description:
 		to compile them into a database which can be used to glob wildcards in the
 		SPOT-BGC Snakemake pipeline. This process includes the designation of 
 		intermediate and final target file names.
+	The rows of both tables are collected in plain lists, and each cohort is
+		listed only once in the per-cohort table, so the build time grows linearly
+		with the number of input files.
+	The cohort, sample & read IDs are derived from the file paths by sample_paths.py,
+		which parses the whole file list in one pass.
+	Instead of a file list, the RawData directory can be scanned directly. In
+		incremental mode, a manifest of the processed file list & its SHA-256 hash
+		is kept: if the file list is unchanged, the output files are left untouched,
+		and if files were only added, only the new files are parsed, and their rows
+		are merged with the rows of the existing tables, in the same order as a full
+		rebuild.
+	The tables are only copied to the config/ directory if their contents changed,
+		so that a reordered but otherwise identical file list does not trigger
+		reruns of the Snakemake rules that depend on them.
 
 List of functions:
-	No functions are defined in this script.
+	build_sample_row(read_file): Derives the per-sample target information of one
+		raw read file, given its ReadFile record.
+	build_cohort_row(cohort_id): Derives the per-cohort target information of
+		one cohort.
+	build_target_tables(lines): Builds the per-sample & deduplicated per-cohort
+		rows from a list of RawData-relative file paths.
+	scan_raw_data(raw_data_dir, extension): Lists the RawData-relative paths of
+		the read files in a RawData directory, in cohort/sample/file order.
+	file_list_hash(lines): Returns the SHA-256 hash of a list of file paths.
+	read_manifest(manifest_file): Reads the hash & file list of an earlier run.
+	write_manifest(manifest_file, digest, lines): Writes out the hash & file list
+		of the current run.
+	read_target_table(file_path): Reads the rows of a tab-separated text file,
+		skipping the header.
+	merge_target_tables(lines, sample_rows, cohort_rows): Orders the existing &
+		new rows of the tables as a full rebuild from the file list would.
+	write_target_table(file_path, column_headers, rows): Writes out a list of rows
+		to a tab-separated text file.
+	copy_if_changed(source_file, target_file): Copies a file, unless the target
+		file already has the same contents.
 
 List of standard and non-standard modules used:
 	sys
+	os
 	shutil
-	pandas
+	filecmp
+	hashlib
+	argparse
+	sample_paths (SPOT-BGC)
 
 Procedure:
 	1. Loading required modules & assigning command line arguments.
-	2. Setting up the formatting for the output dataframes. 
-	3. Parsing the FullFileNames.txt file and extracting relevant information, 
-		which is compiled into dataframes.
-	4. Writing out the dataframes to tab-separated text files. 
+	2. Setting up the formatting for the output tables. 
+	3. Parsing the FullFileNames.txt file (or scanning the RawData directory) and 
+		extracting relevant information, which is compiled into lists of rows.
+	4. Writing out the tables to tab-separated text files (in incremental mode, 
+		merging the new rows with those of the existing tables).
 
 Known bugs and limitations:
 	- There is no quality-checking integrated into the code.
@@ -36,6 +74,13 @@ Known bugs and limitations:
 		if that directory does not exist. 
 	- This script assumes that it is run from the resources/ directory, so the copying
 		process of the output file will not work if run from somewhere else.
+	- In incremental mode, the tables are rebuilt from scratch if any previously 
+		processed file is no longer present, or if an output file is missing.
+	- Directory scanning only picks up files with the given extension (".fastq" by
+		default) at the RawData/{COHORT_ID}/{SAMPLE_ID}/ level.
+	- Listed file paths must have the RawData-relative layout Cohort/SampleDir/FileName
+		(see sample_paths.py); other paths raise a ValueError, where earlier versions
+		took the IDs from the first & third path components of any path.
 
 Usage
 	./create_input_target_db.py FullFileNames.txt
@@ -47,6 +92,10 @@ Usage
 			`ls */*/* > FullFileNames.txt`
 	Note that while the FullFileNames.txt file can have a different name or location than
 		recommended, the internal format of the file must be as above!
+	If no file is given, RawData/FullFileNames.txt is used.
+	
+	Alternatively, scan the RawData directory & only update changed tables with: 
+	./create_input_target_db.py --scan RawData --incremental
 
 This script was written for Python 3.9.19, in Spyder 5.5.5. 
 
@@ -57,21 +106,22 @@ This script was written for Python 3.9.19, in Spyder 5.5.5.
 
 # import necessary modules
 import sys #allows execution of script from command line
+import os # allows access to the operating system
 import shutil # enables some bash utilities
-import pandas as pd # enables the handling of dataframes in python
-
+import filecmp # enables comparison of the copied tables
+import hashlib # enables hashing of the file list
+import argparse # enables parsing of command line arguments
+from sample_paths import parse_raw_read_paths # derives the IDs of the raw read files
 
-# load input and output files
-# input file
-sample_name_file = sys.argv[1]
-sample_name_file = "RawData/FullFileNames.txt"
 
 # output files
 output_file_sample = "SPOT-BGC__sample-target_info.txt"
 output_file_cohort = "SPOT-BGC__cohort-target_info.txt"
+# manifest of the file list processed by the last incremental run
+manifest_file_default = "SPOT-BGC__target_manifest.txt"
 
 
-## Part 2: Setting up the database formats
+## Part 2: Setting up the table formats
 
 reads_df_column_headers = ["Cohort", "Sample", "CohortSample", "CohortSampleSample",
 						 # Cohort is the cohort ID, Sample is the sample ID
@@ -153,216 +203,241 @@ assembly_df_column_headers = ["Cohort", # Cohort is the cohort ID
 							   # AntiSMASHCohort_Location is the location of the AntiSMASH results for the per-cohort assembly
 							   "AntiSMASHCohort_Name", "AntiSMASHCohort_Location"]
 
-# create empty dataframes with the above lists for headers
-# the per-sample dataframe
-target_sample_df = pd.DataFrame(columns=reads_df_column_headers)
-# per-cohort assembly df
-target_cohort_df = pd.DataFrame(columns=assembly_df_column_headers)
-
-
-## Part 3: Parse the input data & build dataframes
-
-with open(sample_name_file, "r") as infile: 
-	# open the file for reading
-	for line in infile: 
-		# read through the file line by line
-		line = line.strip()
-		# remove the end-line character
-		string_split_list = line.split('/')
-		# split the string into a list based on forwardslash placement
-		
-		# first, get the basic information
-		cohort_id = string_split_list[0]
-		# save the cohort ID to a variable		
-		sample_id = string_split_list[2].replace('_', '.')
-		sample_id = sample_id.split('.')[0]
-		# save the sample ID to a variable		
-		file_base = string_split_list[2].split(".")[0]
-		# save the name of the file to a variable		
-		cohort_base = string_split_list[0] + "/" + file_base
-		# save the basename including the cohort to a variable		
-		cohort_sample = cohort_id + '/' + sample_id
-		# create a base with the cohort_id/sample_id
-		cohort_sample_sample = cohort_id + '/' + sample_id + '/' + sample_id
-		# create a path cohort/sample/sample
-		file_loc = "resources/RawData/" + line
-		# save the relative file location to a variable		
-		# next save the read type to a variable
-		if "_1" in string_split_list[2]: 
-			# designate the ending type of forward PE reads
-			read_id = "1"
-		elif "_2" in string_split_list[2]: 
-			# designate the ending type of reverse PE reads
-			read_id = "2"
-		else: 
-			# designate if SE instead of PE
-			read_id = "SE"
-		
-		# target data
-		
-		# data for the trimmed files		
-		trim_loc = "results/Trimmomatic/" + cohort_id + "/" + sample_id + "." + read_id + ".fastq"
-		# location of the trimmed file		
-		trim_file_base = sample_id + "." + read_id
-		# basefile name of the trimmed file		
-		trim_cohort_base = cohort_id + "/" + sample_id + "." + read_id
-		# cohort/filebase for the trimmed sample
-		
-		# data for the nonhuman files		
-		nonhuman_loc = "results/DataNonHuman/NonHumanOG/" + cohort_id + "/" + sample_id + "_NON-human_map." + read_id + ".fq"
-		# location of nonhuman fastq file		
-		nonhuman_file_base = sample_id + "_NON-human_map." + read_id
-		# file basename of the nonhuman fastq		
-		nonhuman_cohort_base = cohort_id + "/" + sample_id + "_NON-human_map." + read_id
-		# cohort/filebase for the nonhuman fastq
-		
-		# data for normalization		
-		norm_loc = "results/DataNonHuman/BBNorm_Reads/" + cohort_id + "/" + sample_id + "_norm." + read_id + ".fq"
-		# location of the normalized file
-		norm_file_base = sample_id + "_norm." + read_id
-		# file basename of the normalized file
-		norm_cohort_base = cohort_id + "/" + sample_id + "_norm." + read_id
-		# cohort/filebase for the normalized file
-		
-		# data for 100k filt		
-		filt_loc = "results/DataNonHuman/100k_Filt/" + cohort_id + "/" + sample_id + "_norm." + read_id + ".fq"
-		# location of the 100k filt files
-		filt_file_base = sample_id + "_norm." + read_id
-		# file basename for the 100k file files
-		filt_cohort_base = cohort_id + "/" + sample_id + "_norm." + read_id
-		# cohort/basename for the 100k filt files
-		
-		# assembly data
-		
-		# per-sample assembly information		
-		# data for assembly		
-		assembly_sample_loc = "results/Assembly/PerSample/" + cohort_id + "/" + sample_id + "/" + sample_id + "_scaffolds.fasta"
-		# location of the per-sample assembly		
-		assembly_sample_base = sample_id + "_scaffolds"
-		# basename for the per-sample assembly		
-		assembly_cohort_base = cohort_id + "/" + sample_id + "/" + sample_id + "_scaffolds"
-		# basename including cohort information
-		
-		# data for non-human per-sample assembly filtration
-		filtassembly_sample_loc = "results/AssemblyNonHuman/PerSample/" + cohort_id + "/" + sample_id + "/" + sample_id + "_assemblySample_NON-human_map.fasta"
-		# location of the nonhuman per-sample assembly
-		filtassembly_sample_base = sample_id + "_assemblySample_NON-human_map"
-		# basename of the nonhuman assembly
-		filtassembly_cohort_base = cohort_id + "/" + sample_id + "/" + sample_id + "_assemblySample_NON-human_map"
-		# cohort/filebase for the assembly
-		
-		# data for taxonomic assignment of the per-sample assembly
-		taxa_sample_loc = "results/Taxonomy/PerSample/" + cohort_id + "/" + sample_id + "/" + sample_id + "__SampleTaxa.txt"
-		# location of the taxonomy file
-		taxa_sample_base = sample_id + "__SampleTaxa"
-		# taxonomy report file basename
-		taxa_cohort_base = cohort_id + "/" + sample_id + "/" + sample_id + "__SampleTaxa"
-		# cohort/filebase for the taxonomy report
-		
-		# data for the GECCO assingnment of the per-sample assembly		
-		gecco_sample_loc = "results/BGC_Prediction/GECCO_Results/PerSample/" + cohort_id + "/" + sample_id + "/" + sample_id + "_contigs.clusters.gff"
-		# gecco report location for sample
-		gecco_sample_base = sample_id + "_contigs.clusters"
-		# gecco report basename for file
-		gecco_cohort_base = cohort_id + "/" + sample_id + "/" + sample_id + "_contigs.clusters"
-		# gecco cohort/filebase
-		
-		# data for the AntiSMASH assignment of the per-sample assembly		
-		antis_sample_loc = "results/BGC_Prediction/AntiSMASH_Results/PerSample/" + cohort_id + "/" + sample_id + "/" + sample_id + "_persample_AntiSMASH.json"
-		# location of AntiSMASH output
-		antis_sample_base = sample_id + "_persample_AntiSMASH"
-		# file basename for the AntiSMASH output file
-		antis_cohort_base = cohort_id + "/" + sample_id + "/" + sample_id + "_persample_AntiSMASH"
-		# cohort/filebasename for the AntiSMASH output
-		
-		# per-cohort assembly information
-		
-		# data for the per-cohort assembly
-		cohortassembly_name = cohort_id + "_final.contigs"
-		# file basename of per-cohort assembly
-		cohortassembly_loc = "results/Assembly/PerCohort/" + cohort_id + "/" + cohort_id + "_final.contigs.fa"
-		# location of per-cohort assembly
-		
-		# data for non-human per-cohort assembly filtration		
-		filtcohortassembly_name = cohort_id + "_assemblyCohort_NON-human_map"
-		# file basename for non-human assembly
-		filtcohortassembly_loc = "results/AssemblyNonHuman/PerCohort/" + cohort_id + "/" + cohort_id + "_assemblyCohort_NON-human_map.fasta"
-		# location of non-human per-cohort assembly
-		
-		# data for taxonomic assignment of the per-cohort assembly		
-		cohorttaxa_name = cohort_id + "__CohortTaxa"
-		# basename for taxanomic results file
-		cohorttaxa_loc = "results/Taxonomy/PerCohort/" + cohort_id + "/" + cohort_id + "__CohortTaxa.txt"
-		# location of the taxanomic profiling results file
-		
-		# data for the GECCO assignment of the per-cohort assembly		
-		cohortgecco_name = cohort_id + "_contigs.clusters"
-		# file basename for GECCO results
-		cohortgecco_loc = "results/BGC_Prediction/GECCO_Results/PerCohort/" + cohort_id + "/" + cohort_id + "_contigs.clusters.gff"
-		# location of the GECCO results file
-		
-		# data for the AntiSMASH assignment of the per-cohort assembly		
-		cohortantis_name = cohort_id + "_percohort_AntiSMASH"
-		# basename for the AntiSMASH results
-		cohortantis_loc = "results/BGC_Prediction/AntiSMASH_Results/PerCohort/" + cohort_id + "/" + cohort_id + "_percohort_AntiSMASH.json"
-		# location of the main AntiSMASH results file
-		
-		# summarize the information
-		# put the variables that will be written out into a list
-		# per-sample list
-		outfile_sample_content_list = [cohort_id, sample_id, cohort_sample, cohort_sample_sample, # "Cohort", "Sample", "CohortSample", "CohortSampleSample"
-						  
-						  file_loc, file_base, cohort_base, # "Location_Raw", "FileBase_Raw", "CohortBase_Raw"
-						  
-						  trim_loc, trim_file_base, trim_cohort_base, # "Location_Trim", "FileBase_Trim", "CohortBase_Trim"
-						  
-						  nonhuman_loc, nonhuman_file_base, nonhuman_cohort_base, # "Location_NonHuman", "FileBase_NonHuman", "CohortBase_NonHuman"
-						  
-						  norm_loc, norm_file_base, norm_cohort_base, # "Location_Norm", "FileBase_Norm", "CohortBase_Norm"
-						  
-						  filt_loc, filt_file_base, filt_cohort_base, # "Location_100k", "FileBase_100k", "CohortBase_100k"
-						  
-						  assembly_sample_loc, assembly_sample_base, assembly_cohort_base, # "AssemblySample_Location", "AssemblySample_FileBase", "AssemblySample_CohortBase"
-						  
-						  filtassembly_sample_loc, filtassembly_sample_base, filtassembly_cohort_base, # "FiltAssemblySample_Location", "FiltAssemblySample_FileBase", "FiltAssemblySample_CohortBase"
-						  
-						  taxa_sample_loc, taxa_sample_base, taxa_cohort_base, # "TaxaSample_Location", "TaxaSample_FileBase", "TaxaSample_CohortBase"
-						  
-						  gecco_sample_loc, gecco_sample_base, gecco_cohort_base,# "GECCOSample_Location", "GECCOSample_FileBase", "GECCO_CohortBase"
-						  
-						  antis_sample_loc, antis_sample_base, antis_cohort_base,# "AntiSMASH_Location", "AntiSMASH_Base", "AntiSMASH_CohortBase"
-						  
-						  # "ReadNum"
-						  read_id]
-		# per-cohort list
-		outfile_cohort_content_list = [cohort_id, # "Cohort"
-								 
-								 cohortassembly_name, cohortassembly_loc, # "AssemblyCohort_Name", "AssemblyCohort_Location"
-								 
-								 filtcohortassembly_name, filtcohortassembly_loc, # "FiltAssemblyCohort_Name", "FiltAssemblyCohort_Location"
-								 
-								 cohorttaxa_name, cohorttaxa_loc, # "TaxaCohort_Name", "TaxaCohort_Location" 
-								 
-								 cohortgecco_name, cohortgecco_loc, # "GECCOCohort_Name", "GECCOCohort_Location"
-								 
-								 # "AntiSMASHCohort_Name", "AntiSMASHCohort_Location"
-								 cohortantis_name, cohortantis_loc]
-
-		# FINALLY compile into dataframes! 
-		# first the per-sample list
-		target_sample_df.loc[len(target_sample_df)] = outfile_sample_content_list
-		# then the per-cohort assembly df list
-		target_cohort_df.loc[len(target_cohort_df)] = outfile_cohort_content_list
+
+## Part 3: Parse the input data & build the tables
+
+def build_sample_row(read_file):
+	"""Derive the per-sample target information of one raw read file, given its ReadFile record."""
+	# first, get the basic information (parsed from the RawData-relative path by sample_paths.py)
+	cohort_id = read_file.cohort
+	sample_id = read_file.sample
+	file_base = read_file.file_base
+	read_id = read_file.read
+	
+	# path prefixes shared by several columns
+	cohort_sample = cohort_id + '/' + sample_id
+	# create a base with the cohort_id/sample_id
+	cohort_sample_sample = cohort_sample + '/' + sample_id
+	# create a path cohort/sample/sample
+	sample_read = sample_id + "." + read_id
+	# sample_id.read_id, the basename of the trimmed file
+	nonhuman_file_base = sample_id + "_NON-human_map." + read_id
+	# file basename of the nonhuman fastq		
+	norm_file_base = sample_id + "_norm." + read_id
+	# file basename of the normalized & 100k filtered files
+	
+	# the row follows the order of reads_df_column_headers
+	return [cohort_id, sample_id, cohort_sample, cohort_sample_sample,
+		# "Location_Raw", "FileBase_Raw", "CohortBase_Raw"
+		"resources/RawData/" + read_file.path, file_base, cohort_id + "/" + file_base,
+		# "Location_Trim", "FileBase_Trim", "CohortBase_Trim"
+		"results/Trimmomatic/" + cohort_id + "/" + sample_read + ".fastq", sample_read, cohort_id + "/" + sample_read,
+		# "Location_NonHuman", "FileBase_NonHuman", "CohortBase_NonHuman"
+		"results/DataNonHuman/NonHumanOG/" + cohort_id + "/" + nonhuman_file_base + ".fq", nonhuman_file_base,
+		cohort_id + "/" + nonhuman_file_base,
+		# "Location_Norm", "FileBase_Norm", "CohortBase_Norm"
+		"results/DataNonHuman/BBNorm_Reads/" + cohort_id + "/" + norm_file_base + ".fq", norm_file_base,
+		cohort_id + "/" + norm_file_base,
+		# "Location_100k", "FileBase_100k", "CohortBase_100k"
+		"results/DataNonHuman/100k_Filt/" + cohort_id + "/" + norm_file_base + ".fq", norm_file_base,
+		cohort_id + "/" + norm_file_base,
+		# "AssemblySample_Location", "AssemblySample_FileBase", "AssemblySample_CohortBase"
+		"results/Assembly/PerSample/" + cohort_sample_sample + "_scaffolds.fasta", sample_id + "_scaffolds",
+		cohort_sample_sample + "_scaffolds",
+		# "FiltAssemblySample_Location", "FiltAssemblySample_FileBase", "FiltAssemblySample_CohortBase"
+		"results/AssemblyNonHuman/PerSample/" + cohort_sample_sample + "_assemblySample_NON-human_map.fasta",
+		sample_id + "_assemblySample_NON-human_map", cohort_sample_sample + "_assemblySample_NON-human_map",
+		# "TaxaSample_Location", "TaxaSample_FileBase", "TaxaSample_CohortBase"
+		"results/Taxonomy/PerSample/" + cohort_sample_sample + "__SampleTaxa.txt", sample_id + "__SampleTaxa",
+		cohort_sample_sample + "__SampleTaxa",
+		# "GECCOSample_Location", "GECCOSample_FileBase", "GECCO_CohortBase"
+		"results/BGC_Prediction/GECCO_Results/PerSample/" + cohort_sample_sample + "_contigs.clusters.gff",
+		sample_id + "_contigs.clusters", cohort_sample_sample + "_contigs.clusters",
+		# "AntiSMASH_Location", "AntiSMASH_Base", "AntiSMASH_CohortBase"
+		"results/BGC_Prediction/AntiSMASH_Results/PerSample/" + cohort_sample_sample + "_persample_AntiSMASH.json",
+		sample_id + "_persample_AntiSMASH", cohort_sample_sample + "_persample_AntiSMASH",
+		# "ReadNum"
+		read_id]
+
+
+def build_cohort_row(cohort_id):
+	"""Derive the per-cohort target information of one cohort."""
+	cohort_base = cohort_id + "/" + cohort_id
+	# the row follows the order of assembly_df_column_headers
+	return [cohort_id,
+		# "AssemblyCohort_Name", "AssemblyCohort_Location"
+		cohort_id + "_final.contigs", "results/Assembly/PerCohort/" + cohort_base + "_final.contigs.fa",
+		# "FiltAssemblyCohort_Name", "FiltAssemblyCohort_Location"
+		cohort_id + "_assemblyCohort_NON-human_map",
+		"results/AssemblyNonHuman/PerCohort/" + cohort_base + "_assemblyCohort_NON-human_map.fasta",
+		# "TaxaCohort_Name", "TaxaCohort_Location" 
+		cohort_id + "__CohortTaxa", "results/Taxonomy/PerCohort/" + cohort_base + "__CohortTaxa.txt",
+		# "GECCOCohort_Name", "GECCOCohort_Location"
+		cohort_id + "_contigs.clusters", "results/BGC_Prediction/GECCO_Results/PerCohort/" + cohort_base + "_contigs.clusters.gff",
+		# "AntiSMASHCohort_Name", "AntiSMASHCohort_Location"
+		cohort_id + "_percohort_AntiSMASH",
+		"results/BGC_Prediction/AntiSMASH_Results/PerCohort/" + cohort_base + "_percohort_AntiSMASH.json"]
+
+
+def build_target_tables(lines):
+	"""Build the per-sample & deduplicated per-cohort rows from a list of file paths."""
+	sample_rows = []
+	# dictionaries keep insertion order, so cohorts are listed in order of first appearance
+	cohort_rows = {}
+	# derive the cohort, sample & read IDs of all files in one pass, skipping empty lines
+	read_files = parse_raw_read_paths([line.strip() for line in lines if line.strip()])
+	for read_file in read_files: 
+		# read through the parsed files one by one
+		sample_row = build_sample_row(read_file)
+		sample_rows.append(sample_row)
+		cohort_id = sample_row[0]
+		if cohort_id not in cohort_rows: 
+			# each cohort is only listed once
+			cohort_rows[cohort_id] = build_cohort_row(cohort_id)
+	return sample_rows, list(cohort_rows.values())
+
+
+def scan_raw_data(raw_data_dir, extension=".fastq"):
+	"""List the RawData-relative paths of the read files in a RawData directory."""
+	lines = []
+	# ref: https://docs.python.org/3/library/os.html#os.scandir
+	with os.scandir(raw_data_dir) as cohort_entries:
+		cohort_dirs = sorted(entry.name for entry in cohort_entries if entry.is_dir())
+	for cohort_id in cohort_dirs:
+		cohort_dir = os.path.join(raw_data_dir, cohort_id)
+		with os.scandir(cohort_dir) as sample_entries:
+			sample_dirs = sorted(entry.name for entry in sample_entries if entry.is_dir())
+		for sample_id in sample_dirs:
+			with os.scandir(os.path.join(cohort_dir, sample_id)) as file_entries:
+				file_names = sorted(entry.name for entry in file_entries
+					if entry.name.endswith(extension) and entry.is_file())
+			lines.extend(cohort_id + "/" + sample_id + "/" + file_name for file_name in file_names)
+	return lines
+
+
+def file_list_hash(lines):
+	"""Return the SHA-256 hash of a list of file paths."""
+	return hashlib.sha256("\n".join(lines).encode()).hexdigest()
+
+
+def read_manifest(manifest_file):
+	"""Read the hash & file list of an earlier run, or (None, []) if there is none."""
+	if not os.path.exists(manifest_file):
+		return None, []
+	with open(manifest_file, "r") as infile:
+		digest = infile.readline().rstrip("\n").split("\t")[-1]
+		lines = [line.rstrip("\n") for line in infile]
+	return digest, lines
+
+
+def write_manifest(manifest_file, digest, lines):
+	"""Write out the hash & file list of the current run."""
+	with open(manifest_file + ".tmp", "w") as outfile:
+		outfile.write("#sha256\t" + digest + "\n")
+		outfile.writelines(line + "\n" for line in lines)
+	# replace the old manifest only once the new one is complete
+	os.replace(manifest_file + ".tmp", manifest_file)
+
+
+def read_target_table(file_path):
+	"""Read the rows of a tab-separated text file, skipping the header."""
+	with open(file_path, "r") as infile:
+		next(infile, None)
+		return [line.rstrip("\n").split("\t") for line in infile if line.strip()]
+
+
+def merge_target_tables(lines, sample_rows, cohort_rows):
+	"""Order the existing & new rows of the tables as a full rebuild from the file list would.
+
+	Each sample row is derived from its file path alone, so the rows are put in the order
+	of the file list, and the cohorts in order of their first appearance in it.
+	"""
+	location_column = reads_df_column_headers.index("Location_Raw")
+	rows_by_location = {row[location_column]: row for row in sample_rows}
+	rows_by_cohort = {row[0]: row for row in cohort_rows}
+	merged_sample_rows = [rows_by_location["resources/RawData/" + line] for line in lines]
+	cohort_ids = dict.fromkeys(row[0] for row in merged_sample_rows)
+	return merged_sample_rows, [rows_by_cohort[cohort_id] for cohort_id in cohort_ids]
 
 
 ## Part 4: Writing out the output files
 
-#write out to tab-separated text files
-# first the per-sample file
-target_sample_df.to_csv(output_file_sample, sep='\t', index=False)
-# then the per-cohort assembly file
-target_cohort_df.to_csv(output_file_cohort, sep='\t', index=False)
+def write_target_table(file_path, column_headers, rows):
+	"""Write out a list of rows to a tab-separated text file."""
+	with open(file_path, "w") as outfile:
+		outfile.write("\t".join(column_headers) + "\n")
+		outfile.writelines("\t".join(row) + "\n" for row in rows)
+
+
+def copy_if_changed(source_file, target_file):
+	"""Copy a file, unless the target file already has the same contents (keeping its modification time).
 
-# ref: https://stackoverflow.com/questions/123198/how-to-copy-files
-shutil.copyfile(output_file_sample, "../config/SPOT-BGC__sample-target_info.txt")
-shutil.copyfile(output_file_cohort, "../config/SPOT-BGC__cohort-target_info.txt")
+	Returns True if the file was copied.
+	"""
+	if os.path.exists(target_file) and filecmp.cmp(source_file, target_file, shallow=False):
+		return False
+	shutil.copyfile(source_file, target_file)
+	return True
+
+
+if __name__ == "__main__":
+	# load command line arguments
+	parser = argparse.ArgumentParser(description="Create the SPOT-BGC sample & cohort target tables.")
+	parser.add_argument("sample_name_file", nargs="?", default="RawData/FullFileNames.txt",
+		help="list of RawData-relative read file paths (default: RawData/FullFileNames.txt)")
+	parser.add_argument("--scan", metavar="RAW_DATA_DIR",
+		help="scan this RawData directory instead of reading a file list")
+	parser.add_argument("--extension", default=".fastq",
+		help="extension of the read files picked up by --scan (default: .fastq)")
+	parser.add_argument("--incremental", action="store_true",
+		help="only update the tables if the file list changed, appending rows for new files")
+	parser.add_argument("--manifest", default=manifest_file_default,
+		help=f"manifest file used by --incremental (default: {manifest_file_default})")
+	args = parser.parse_args()
+	
+	# load the list of read file paths
+	if args.scan:
+		file_lines = scan_raw_data(args.scan, args.extension)
+	else:
+		with open(args.sample_name_file, "r") as infile: 
+			file_lines = [line.strip() for line in infile if line.strip()]
+	digest = file_list_hash(file_lines)
+	
+	previous_digest, previous_lines = None, []
+	if args.incremental:
+		previous_digest, previous_lines = read_manifest(args.manifest)
+	outputs_exist = os.path.exists(output_file_sample) and os.path.exists(output_file_cohort)
+	
+	if args.incremental and outputs_exist and previous_digest == digest: 
+		# nothing changed, so the outputs are left untouched for Snakemake
+		print("File list unchanged: the target tables were not modified.")
+		sys.exit(0)
+	
+	previous_set = set(previous_lines)
+	if args.incremental and outputs_exist and previous_lines and previous_set.issubset(file_lines): 
+		# files were only added, so only the new files are parsed
+		new_lines = [line for line in file_lines if line not in previous_set]
+		new_sample_rows, new_cohort_rows = build_target_tables(new_lines)
+		# the rows are merged in the order of a full rebuild, so the tables do not depend on the run history
+		previous_cohort_rows = read_target_table(output_file_cohort)
+		target_sample_rows, target_cohort_rows = merge_target_tables(file_lines,
+			read_target_table(output_file_sample) + new_sample_rows, previous_cohort_rows + new_cohort_rows)
+		print(f"Added {len(new_sample_rows)} sample rows & {len(target_cohort_rows) - len(previous_cohort_rows)} "
+			f"cohort rows.")
+	else: 
+		# parse all file paths in one pass
+		target_sample_rows, target_cohort_rows = build_target_tables(file_lines)
+	#write out to tab-separated text files
+	# first the per-sample file
+	write_target_table(output_file_sample, reads_df_column_headers, target_sample_rows)
+	# then the per-cohort assembly file
+	write_target_table(output_file_cohort, assembly_df_column_headers, target_cohort_rows)
+	
+	if args.incremental:
+		# record the processed file list for the next run
+		write_manifest(args.manifest, digest, file_lines)
+	
+	# ref: https://stackoverflow.com/questions/123198/how-to-copy-files
+	# unchanged tables are not copied, so Snakemake does not rerun the rules that use them
+	copy_if_changed(output_file_sample, "../config/SPOT-BGC__sample-target_info.txt")
+	copy_if_changed(output_file_cohort, "../config/SPOT-BGC__cohort-target_info.txt")
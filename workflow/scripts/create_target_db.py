@@ -10,13 +10,15 @@ Description:
 	This program parses a list of target files created by Snakemake, in order
 		to compile them into a database which can be used to glob wildcards in the
 		SPOT-BGC Snakemake pipeline.
+	The IDs are derived from the file paths by sample_paths.py, in one pass over
+		the whole list, so they match those of the other SPOT-BGC scripts.
 
 List of functions:
 	No functions are defined in this script.
 
 List of standard and non-standard modules used:
 	sys
-	re
+	sample_paths (SPOT-BGC)
 
 Procedure:
 	1. Loading required module & assigning command line arguments.
@@ -24,7 +26,13 @@ Procedure:
 		parsed results. 
 
 Known bugs and limitations:
-	- There is no quality-checking integrated into the code.
+	- File paths that do not end in .fq or .fastq (optionally .gz) raise a ValueError;
+		earlier versions wrote a row for any file.
+	- The FileBase column is the file name without its whole .fq/.fastq(.gz) suffix,
+		e.g. S1_norm.1 for S1_norm.1.fq.gz, where earlier versions only removed the
+		last extension (S1_norm.1.fq). The Sample column is the file name up to the
+		first "_" or ".", e.g. S1 for the trimmed reads S1.1.fastq, where earlier
+		versions only split on "_" (S1.1.fastq).
 	- The output file name should match one of the target file creation rules 
 		required by Snakemake for the SPOT-BGC workflow.
 
@@ -47,7 +55,7 @@ This script was written for Python 3.9.19, in Spyder 5.5.5.
 
 # import necessary modules
 import sys # allows execution of script from command line
-import re # enables regex handling
+from sample_paths import exclude_paths, parse_read_paths # derives the IDs of the read files
 
 
 # load input and output files
@@ -63,53 +71,23 @@ exclusion_terms_list = sys.argv[3].split(',')
 
 # read the input file into a list
 with open(input_target_file, "r") as infile:
-	lines = [line.rstrip() for line in infile]
+	lines = [line.strip() for line in infile if line.strip()]
 
 # remove files from the list based on exlusion criteria
-if len(exclusion_terms_list) >= 1:
-	# assuming that there are exclusion terms provided
-	lines = [word for word in lines if not any(bad in word for bad in exclusion_terms_list)]
+# (the terms are combined into one pattern, so each line is only searched once)
+lines = exclude_paths(lines, exclusion_terms_list)
+
+# derive the cohort, sample & read IDs of all files in one pass
+read_files = parse_read_paths(lines)
 
 
 with open(output_file, "w") as outfile: 
 	# open the output file for writing
 	# create the column headers for the file
 	outfile.write("Cohort\tSample\tLocation\tCohortSample\tFileBase\tCohortBase\tReadNum\n")
-	for line in lines: 
-		# iterate over the elements in the list
-		line = line.strip()
-		# strip the end-line character from the line
-		file_loc = line
-		# save the file location to a variable
-		new_target_list = line.split('/')
-		# save the file path to a list based on forwardslash placement
-		cohort_id = new_target_list[-2]
-		# save the cohort ID to a variable
-		sample_id = new_target_list[-1]
-		sample_id = re.split('. |- |_', sample_id)[0]
-		#sample_id = sample_id.split('.')[0]
-		# save the sample ID to a variable
-		cohort_sample = cohort_id + '/' + sample_id
-		# create a base with the cohort_id/sample_id
-		file_base = new_target_list[-1].rpartition(".")[0]
-		# save the name of the file to a variable
-		cohort_base = new_target_list[-2] + "/" + file_base
-		# save the basename including the cohort to a variable
-		# next save the read type to a variable
-		if ".1" in new_target_list[-1]: 
-			# designate the ending type of forward PE reads
-			read_id = "1"
-		elif ".2" in new_target_list[-1]: 
-			# designate the ending type of reverse PE reads
-			read_id = "2"
-		else: 
-			# designate if SE instead of PE
-			read_id = "SE"
-		# put the variables that will be written out into a list
-		outfile_content_list = [cohort_id, sample_id, file_loc, cohort_sample, file_base, cohort_base, read_id]
-		# finally write variables out to output file in a loop
-		for i in outfile_content_list[0:-1]: 
-			# iterated over the elements in the list and write them out in tab-separated format
-			outfile.write(i + '\t')
-		# write the last element of the list out to the outfile
-		outfile.write(outfile_content_list[-1] + '\n')
+	for read_file in read_files: 
+		# iterate over the parsed read files
+		# the columns are: Cohort, Sample, Location, Cohort/Sample, FileBase, Cohort/FileBase, ReadNum
+		outfile.write("\t".join([read_file.cohort, read_file.sample, read_file.path,
+			read_file.cohort + "/" + read_file.sample, read_file.file_base,
+			read_file.cohort + "/" + read_file.file_base, read_file.read]) + "\n")
@@ -0,0 +1,148 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: disk_usage_report.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program reports the largest disk usage of the read preprocessing stages of the
+		SPOT-BGC pipeline, so that the scratch space of a project can be sized.
+	At the end of every trimming, human read filtration, normalization & 100k
+		filtration job, snakemake_disk_usage.sh records the size of all preprocessing
+		directories (du -sk) in logs/DiskUsage/. The report lists the largest of these
+		end-of-job sizes per directory (Max_End_Of_Job_GB), and the largest sum over
+		the directories of one record for the preprocessing as a whole, together with
+		the job that recorded them (Max_Job).
+
+List of functions:
+	read_disk_usage(usage_dir): Reads the disk usage records of all jobs.
+	peak_disk_usage(records): Finds the largest end-of-job disk usage per stage & in total.
+	write_report(peaks, report_file): Writes out the per-stage disk usage table.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	argparse
+
+Procedure:
+	1. Loading required modules & defining the stage directories.
+	2. Assigning command line arguments.
+	3. Reading the disk usage records & writing out the largest disk usage per stage.
+
+Known bugs and limitations:
+	- The sizes are snapshots taken at the end of preprocessing jobs, not the true
+		peak disk usage: files written & removed while a job runs (e.g., the temporary
+		files of BBNorm) are not included, and the disk usage between two job ends is
+		not seen, so the actual peak can be higher.
+	- Temporary intermediates are removed by Snakemake after the job that records
+		their directory, so a directory's largest size may be higher than it is at any
+		later point of the run.
+	- Hard-linked files are only counted in the first directory they are found in,
+		so the normalized reads linked into 100k_Filt/ are counted in BBNorm_Reads/.
+
+Usage
+	./disk_usage_report.py [--usage-dir DIR] [--report FILE]
+	OR
+	python disk_usage_report.py [--usage-dir DIR] [--report FILE]
+
+	Note that the default paths assume the script is run from the parent SPOT-BGC/ directory!
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the stage directories
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import argparse # enables parsing of command line arguments
+
+
+# preprocessing stages, by the directory their outputs are written to
+STAGE_DIRS = {
+	"results/Trimmomatic": "trimming",
+	"results/DataNonHuman/NonHumanOG": "human_read_filtration",
+	"results/DataNonHuman/BBNorm_Reads": "normalization",
+	"results/DataNonHuman/100k_Filt": "read_count_filtration",
+}
+
+# columns of the report
+REPORT_COLUMNS = ["Stage", "Directory", "Max_End_Of_Job_GB", "Max_Job"]
+
+
+def read_disk_usage(usage_dir):
+	"""Read the disk usage records of all jobs.
+
+	Returns a dictionary of job label: {directory: size in KB}.
+	"""
+	records = {}
+	for file_name in sorted(os.listdir(usage_dir)):
+		if not file_name.endswith(".tsv"):
+			continue
+		with open(os.path.join(usage_dir, file_name), "r") as infile:
+			for line in infile:
+				fields = line.rstrip("\n").split("\t")
+				if len(fields) != 4:
+					continue
+				records.setdefault(fields[1], {})[fields[2]] = int(fields[3])
+	return records
+
+
+def peak_disk_usage(records):
+	"""Find the largest end-of-job disk usage per stage directory & in total.
+
+	Returns a list of (stage, directory, largest size in KB, job label) tuples, the
+	last of which is the total over all directories.
+	"""
+	peaks = {stage_dir: (0, "NA") for stage_dir in STAGE_DIRS}
+	total_peak = (0, "NA")
+	for label, dir_sizes in records.items():
+		for stage_dir, size_kb in dir_sizes.items():
+			if size_kb > peaks.setdefault(stage_dir, (0, "NA"))[0]:
+				peaks[stage_dir] = (size_kb, label)
+		if sum(dir_sizes.values()) > total_peak[0]:
+			total_peak = (sum(dir_sizes.values()), label)
+	rows = [(STAGE_DIRS.get(stage_dir, "other"), stage_dir, size_kb, label)
+		for stage_dir, (size_kb, label) in peaks.items()]
+	rows.append(("total", "all", total_peak[0], total_peak[1]))
+	return rows
+
+
+def write_report(peaks, report_file):
+	"""Write out the per-stage disk usage table."""
+	if os.path.dirname(report_file):
+		os.makedirs(os.path.dirname(report_file), exist_ok=True)
+	with open(report_file, "w") as outfile:
+		outfile.write("\t".join(REPORT_COLUMNS) + "\n")
+		for stage, stage_dir, size_kb, label in peaks:
+			outfile.write(f"{stage}\t{stage_dir}\t{size_kb / 1024 ** 2:.2f}\t{label}\n")
+
+
+def main():
+	"""Parse the command line arguments & write out the disk usage report."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Report the largest end-of-job disk usage of the read preprocessing stages.")
+	parser.add_argument("--usage-dir", default="logs/DiskUsage",
+		help="directory of the disk usage records written by snakemake_disk_usage.sh")
+	parser.add_argument("--report", default="results/DataNonHuman/disk_usage_per_stage.tsv",
+		help="per-stage disk usage table")
+	args = parser.parse_args()
+
+
+	# Part 3: Read the records & write out the largest disk usage
+
+	records = read_disk_usage(args.usage_dir) if os.path.isdir(args.usage_dir) else {}
+	peaks = peak_disk_usage(records)
+	write_report(peaks, args.report)
+	print(f"Largest end-of-job disk usage of the read preprocessing, from {len(records)} jobs: "
+		f"{peaks[-1][2] / 1024 ** 2:.2f} GB.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,179 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: filter_contigs.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program removes short contigs from the assemblies of the SPOT-BGC pipeline
+		before human contig removal with Kraken2 & binning with MetaBAT2, which
+		discards contigs shorter than 1500 bp anyway.
+	Each assembly is streamed once: contigs at or above the minimum length are
+		written to the filtered assembly, and the length, N50 & GC statistics of
+		both the full & the filtered assembly are collected on the way. Memory use
+		does not depend on the size of the assembly, as only one contig is held at
+		a time and the N50 is computed from a table of contig length counts.
+	Assemblies are filtered in parallel on a pool of worker processes, and the
+		statistics are written to one tab-separated table.
+
+List of functions:
+	filtered_path(assembly, suffix): Returns the path of the filtered assembly.
+	n50(length_counts, total_length): Computes the N50 from a table of contig
+		length counts.
+	filter_assembly(assembly, min_length, suffix): Writes the filtered assembly &
+		returns its statistics row.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	argparse
+	collections.Counter
+	concurrent.futures
+
+Procedure:
+	1. Loading required modules & defining the filtering functions.
+	2. Assigning command line arguments.
+	3. Filtering the assemblies in parallel.
+	4. Writing out the statistics table.
+
+Known bugs and limitations:
+	- The memory for the length counts grows with the number of distinct contig
+		lengths, which is bounded by the length of the longest contig.
+	- GC content ignores ambiguous bases (N) in both the numerator & denominator.
+
+Usage
+	./filter_contigs.py [--min-length N] [--jobs N] [--suffix SUFFIX] --stats FILE assembly [assembly ...]
+	OR
+	python filter_contigs.py [--min-length N] [--jobs N] [--suffix SUFFIX] --stats FILE assembly [assembly ...]
+
+	The filtered assembly is written next to the input, with the suffix added before
+	the file extension (e.g., S1_scaffolds.fasta -> S1_scaffolds_filtered.fasta).
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the filtering functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import argparse # enables parsing of command line arguments
+from collections import Counter # enables counting of contig lengths
+from concurrent.futures import ProcessPoolExecutor # enables filtering assemblies in parallel
+
+
+# size of the file buffers, as the assemblies are streamed
+BUFFER_SIZE = 4 * 1024 * 1024
+
+# columns of the statistics table
+STATS_COLUMNS = ["Assembly", "Contigs", "Total_Length", "N50", "GC", "Min_Length",
+	"Kept_Contigs", "Kept_Length", "Kept_N50", "Kept_GC"]
+
+
+def filtered_path(assembly, suffix="_filtered"):
+	"""Return the path of the filtered assembly, with suffix added before the file extension."""
+	base, extension = os.path.splitext(assembly)
+	return base + suffix + extension
+
+
+def n50(length_counts, total_length):
+	"""Compute the N50 from a table of contig length counts."""
+	running_length = 0
+	for length in sorted(length_counts, reverse=True):
+		running_length += length * length_counts[length]
+		if running_length * 2 >= total_length:
+			return length
+	return 0
+
+
+def filter_assembly(assembly, min_length, suffix="_filtered"):
+	"""Write the contigs of at least min_length to the filtered assembly & return its statistics row."""
+	all_lengths = Counter()
+	kept_lengths = Counter()
+	# [A/T count, G/C count] of all & kept contigs
+	all_bases = [0, 0]
+	kept_bases = [0, 0]
+
+	def finish_contig(header, sequence_lines, outfile):
+		"""Record the statistics of one contig, and write it out if it is long enough."""
+		sequence = "".join(sequence_lines)
+		length = len(sequence)
+		gc_count = sequence.count("G") + sequence.count("C") + sequence.count("g") + sequence.count("c")
+		at_count = sequence.count("A") + sequence.count("T") + sequence.count("a") + sequence.count("t")
+		all_lengths[length] += 1
+		all_bases[0] += at_count
+		all_bases[1] += gc_count
+		if length >= min_length:
+			kept_lengths[length] += 1
+			kept_bases[0] += at_count
+			kept_bases[1] += gc_count
+			outfile.write(header)
+			outfile.writelines(line + "\n" for line in sequence_lines)
+
+	with open(assembly, "r", buffering=BUFFER_SIZE) as infile, \
+		open(filtered_path(assembly, suffix), "w", buffering=BUFFER_SIZE) as outfile:
+		header = None
+		sequence_lines = []
+		for line in infile:
+			if line.startswith(">"):
+				if header is not None:
+					finish_contig(header, sequence_lines, outfile)
+				header = line
+				sequence_lines = []
+			else:
+				sequence_lines.append(line.rstrip("\n"))
+		if header is not None:
+			finish_contig(header, sequence_lines, outfile)
+
+	def summarize(length_counts, bases):
+		total_length = sum(length * count for length, count in length_counts.items())
+		gc = bases[1] / sum(bases) if sum(bases) else 0
+		return [sum(length_counts.values()), total_length, n50(length_counts, total_length), round(gc, 4)]
+
+	return [assembly] + summarize(all_lengths, all_bases) + [min_length] + summarize(kept_lengths, kept_bases)
+
+
+def main():
+	"""Parse the command line arguments & run the filtration."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Remove short contigs from assemblies & summarize them.")
+	parser.add_argument("assemblies", nargs="+", help="assembly FASTA files")
+	parser.add_argument("--min-length", type=int, default=1500,
+		help="minimum contig length to keep (default: 1500)")
+	parser.add_argument("--jobs", type=int, default=1, help="number of worker processes (default: 1)")
+	parser.add_argument("--suffix", default="_filtered",
+		help="suffix added to the filtered assemblies (default: _filtered)")
+	parser.add_argument("--stats", required=True, help="statistics table to write")
+	args = parser.parse_args()
+
+
+	# Part 3: Filter the assemblies in parallel
+
+	if args.jobs > 1 and len(args.assemblies) > 1:
+		with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+			rows = list(pool.map(filter_assembly, args.assemblies, [args.min_length] * len(args.assemblies),
+				[args.suffix] * len(args.assemblies)))
+	else:
+		rows = [filter_assembly(assembly, args.min_length, args.suffix) for assembly in args.assemblies]
+
+
+	# Part 4: Write out the statistics table
+
+	os.makedirs(os.path.dirname(args.stats) or ".", exist_ok=True)
+	with open(args.stats, "w") as outfile:
+		outfile.write("\t".join(STATS_COLUMNS) + "\n")
+		outfile.writelines("\t".join(str(value) for value in row) + "\n" for row in rows)
+	kept_contigs = sum(row[6] for row in rows)
+	all_contigs = sum(row[1] for row in rows)
+	print(f"Kept {kept_contigs} of {all_contigs} contigs of at least {args.min_length} bp "
+		f"from {len(rows)} assemblies.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
@@ -7,70 +7,257 @@ Date: 2024.03.12
 Author: Vi Varga
 
 Description:
-	This program parses a soft-masked FASTA file and hard-masks the soft-masked 
+	This program parses a soft-masked FASTA file and hard-masks the soft-masked
 		portions by replacing all lowercase characters in sequence lines with 'N'.
+	The FASTA file is read in large binary blocks that always end on a line break.
+		Blocks are masked on a pool of worker processes with a precomputed byte
+		translation table, and are written out in input order. Only a fixed number
+		of blocks is held in memory at any time, so memory usage does not depend
+		on the size of the largest chromosome.
+	The number of masked bases is reported for every FASTA record.
 
 List of functions:
-	No functions are defined in this script.
+	open_fasta(file_path, mode, compress_level): Opens a plain or gzip-compressed
+		FASTA file in binary mode, based on the file extension.
+	read_fasta_blocks(infile, block_size): Yields blocks of roughly block_size
+		bytes from the FASTA file, each ending on a line break.
+	mask_block(block): Hard-masks the sequence lines of a block, and counts the
+		bases and masked bases per record segment in the block.
+	add_block_counts(record_stats, block_counts): Merges the per-segment counts of
+		a block into the per-record statistics.
+	write_mask_report(report_file, record_stats): Writes out the per-record masked
+		base counts to a tab-separated text file.
+	main(): Parses the command line arguments & runs the masking.
 
 List of standard and non-standard modules used:
 	sys
 	os
-	re
+	gzip
+	argparse
+	collections
+	concurrent.futures
 
 Procedure:
-	1. Loading required modules & assigning command line arguments.
-    2. Parsing FASTA file & writing out hard-masked version.
+	1. Loading required modules & defining the masking functions.
+	2. Assigning command line arguments.
+	3. Reading the FASTA file in blocks, masking the blocks in parallel &
+		writing out the hard-masked version.
+	4. Writing out the per-record masked base counts.
 
 Known bugs and limitations:
 	- There is no quality-checking integrated into the code.
-	- The output file name is not user-defined, but is instead simply the input
-		file basename with a "_hardMask.fasta" file extension. 
+	- The default output file name is the input file basename with a
+		"_hardMask.fasta" file extension; use -o to choose a different name.
+		Output file names ending in ".gz" are written gzip-compressed.
+	- The per-record report uses the first word of each header line as
+		the record name.
+	- Compressed output is written from the main process, so writing gzip output
+		is limited by single-core compression speed.
 
 Usage
-	./hard_mask_genome.py input_fasta
+	./hard_mask_genome.py input_fasta [-o OUTPUT] [-t THREADS] [--report REPORT]
+		[--block-size MB] [--compress-level LEVEL]
 	OR
-	python hard_mask_genome.py input_fasta
+	python hard_mask_genome.py input_fasta [-o OUTPUT] [-t THREADS] [--report REPORT]
+		[--block-size MB] [--compress-level LEVEL]
 
-This script was written for Python 3.9.18, in Spyder 5.4.5. 
+	Where input_fasta may be plain text or gzip-compressed (".gz").
+
+This script was written for Python 3.9.18, in Spyder 5.4.5.
 
 """
 
 
-# Part 1: Import modules & assign command line arguments
+# Part 1: Import modules & define masking functions
 
 # import necessary modules
 import sys # allows execution of script from command line
 import os # allows access to the operating system
-import re # enable regex pattern matching in Python
-
-
-# load input file
-input_fasta = sys.argv[1]
-
-# load output file
-base = os.path.basename(input_fasta)
-output_base = os.path.splitext(base)[0]
-output_fasta = output_base + '_hardMask.fasta'
-
-
-# Part 2: Parse FASTA file & write out hard-masked version
-
-with open(input_fasta, "r") as infile, open(output_fasta, "w") as outfile:
-	# open the input file for reading & output file for writing
-	for line in infile: 
-		# parse through the input file line by line
-		if not line.startswith(">"): 
-			# identify lines that aren't headers
-			sequence = line
-			# save the line to a variable
-			sequence_edit = re.sub('[a-z]', 'N', sequence)
-			# replace all lowercase characters with N characters
-			# and write out to the output file
-			outfile.write(sequence_edit)
-		else: 
-			# for the sequence header lines
-			header = line
-			# save the line content to a variable 
-			# and write it out to the outfile
-			outfile.write(header)
+import gzip # enables reading & writing gzip-compressed files
+import argparse # enables parsing of command line arguments
+from collections import deque # bounded queue of blocks being masked
+from concurrent.futures import ProcessPoolExecutor # enables multi-core masking
+
+
+# translation table that replaces all lowercase characters with N
+# ref: https://docs.python.org/3/library/stdtypes.html#bytes.maketrans
+LOWERCASE = bytes(range(ord('a'), ord('z') + 1))
+MASK_TABLE = bytes.maketrans(LOWERCASE, b'N' * len(LOWERCASE))
+
+
+def open_fasta(file_path, mode, compress_level=6):
+	"""Open a plain or gzip-compressed FASTA file in binary mode."""
+	if file_path.endswith(".gz"):
+		# gzip-compressed files are recognized by their file extension
+		if "w" in mode:
+			return gzip.open(file_path, mode, compresslevel=compress_level)
+		return gzip.open(file_path, mode)
+	# large buffer to reduce the number of system calls
+	return open(file_path, mode, buffering=1024 * 1024)
+
+
+def read_fasta_blocks(infile, block_size):
+	"""Yield blocks of roughly block_size bytes, each ending on a line break."""
+	remainder = b''
+	while True:
+		data = infile.read(block_size)
+		if not data:
+			# end of the file
+			break
+		data = remainder + data
+		# cut the block at the last line break, so no line is split across blocks
+		cut = data.rfind(b'\n') + 1
+		if cut == 0:
+			# a single line longer than the block size, keep reading
+			remainder = data
+			continue
+		remainder = data[cut:]
+		yield data[:cut]
+	if remainder:
+		# the last line of the file may not end with a line break
+		yield remainder
+
+
+def mask_block(block):
+	"""Hard-mask the sequence lines of a block & count masked bases per record segment.
+
+	Returns the masked block, and a list of (record_name, bases, masked_bases) tuples,
+	one per record segment in the block. The record name is None for the segment at
+	the start of a block that continues a record begun in an earlier block.
+	"""
+	masked_parts = []
+	block_counts = []
+	record_name = None
+	position = 0
+	block_length = len(block)
+	while position < block_length:
+		if block.startswith(b'>', position):
+			# header lines are copied without masking
+			line_end = block.find(b'\n', position)
+			line_end = block_length if line_end == -1 else line_end + 1
+			masked_parts.append(block[position:line_end])
+			header_words = block[position + 1:line_end].split()
+			record_name = header_words[0].decode(errors="replace") if header_words else ""
+			position = line_end
+		# the sequence runs until the next header line or the end of the block
+		seq_end = block.find(b'\n>', max(position - 1, 0))
+		seq_end = block_length if seq_end == -1 else seq_end + 1
+		sequence = block[position:seq_end]
+		masked_parts.append(sequence.translate(MASK_TABLE))
+		# count the lowercase characters by deleting them & comparing lengths
+		masked_bases = len(sequence) - len(sequence.translate(None, LOWERCASE))
+		bases = len(sequence) - sequence.count(b'\n') - sequence.count(b'\r')
+		block_counts.append((record_name, bases, masked_bases))
+		position = seq_end
+	return b''.join(masked_parts), block_counts
+
+
+def add_block_counts(record_stats, block_counts):
+	"""Merge the per-segment counts of a block into the per-record statistics."""
+	for record_name, bases, masked_bases in block_counts:
+		if record_name is None:
+			if not record_stats:
+				# sequence data before the first header line
+				record_stats.append(["", 0, 0])
+			# continuation of the last record of the previous block
+			record_stats[-1][1] += bases
+			record_stats[-1][2] += masked_bases
+		else:
+			record_stats.append([record_name, bases, masked_bases])
+
+
+def write_mask_report(report_file, record_stats):
+	"""Write out the per-record masked base counts to a tab-separated text file."""
+	with open(report_file, "w") as outfile:
+		outfile.write("Record\tLength\tMasked_Bases\tMasked_Fraction\n")
+		for record_name, bases, masked_bases in record_stats:
+			masked_fraction = masked_bases / bases if bases else 0.0
+			outfile.write(f"{record_name}\t{bases}\t{masked_bases}\t{masked_fraction:.4f}\n")
+
+
+def main():
+	"""Parse the command line arguments & run the masking."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Hard-mask the soft-masked regions of a FASTA file.")
+	parser.add_argument("input_fasta", help="soft-masked FASTA file (plain or .gz)")
+	parser.add_argument("-o", "--output", help="output FASTA file; a .gz extension enables gzip compression "
+		"(default: input basename with a _hardMask.fasta extension)")
+	parser.add_argument("-t", "--threads", type=int, default=os.cpu_count() or 1,
+		help="number of worker processes used for masking (default: all cores)")
+	parser.add_argument("--report", help="per-record masked base count report "
+		"(default: output basename with a _maskReport.txt extension)")
+	parser.add_argument("--block-size", type=int, default=64,
+		help="size of the blocks read from the input file, in MB (default: 64)")
+	parser.add_argument("--compress-level", type=int, default=6,
+		help="gzip compression level used for .gz output (default: 6)")
+	args = parser.parse_args()
+
+	# load input file
+	input_fasta = args.input_fasta
+
+	# load output file
+	if args.output:
+		output_fasta = args.output
+	else:
+		base = os.path.basename(input_fasta)
+		if base.endswith(".gz"):
+			# remove the compression extension before the FASTA extension
+			base = base[:-3]
+		output_base = os.path.splitext(base)[0]
+		output_fasta = output_base + '_hardMask.fasta'
+	# load report file
+	if args.report:
+		report_file = args.report
+	else:
+		report_base = output_fasta[:-3] if output_fasta.endswith(".gz") else output_fasta
+		report_file = os.path.splitext(report_base)[0] + '_maskReport.txt'
+
+	threads = max(args.threads, 1)
+	block_size = args.block_size * 1024 * 1024
+	# at most two blocks per worker are in memory at once
+	max_pending = threads * 2
+
+
+	# Part 3: Parse FASTA file & write out hard-masked version
+
+	record_stats = []
+	with open_fasta(input_fasta, "rb") as infile, \
+		open_fasta(output_fasta, "wb", args.compress_level) as outfile:
+		# open the input file for reading & output file for writing
+		if threads == 1:
+			# mask in the main process, without the overhead of a process pool
+			for block in read_fasta_blocks(infile, block_size):
+				masked_block, block_counts = mask_block(block)
+				outfile.write(masked_block)
+				add_block_counts(record_stats, block_counts)
+		else:
+			with ProcessPoolExecutor(max_workers=threads) as pool:
+				pending = deque()
+				for block in read_fasta_blocks(infile, block_size):
+					# submit blocks to the worker processes in input order
+					pending.append(pool.submit(mask_block, block))
+					if len(pending) >= max_pending:
+						# write out the oldest block before reading more of the input
+						masked_block, block_counts = pending.popleft().result()
+						outfile.write(masked_block)
+						add_block_counts(record_stats, block_counts)
+				while pending:
+					# write out the remaining blocks
+					masked_block, block_counts = pending.popleft().result()
+					outfile.write(masked_block)
+					add_block_counts(record_stats, block_counts)
+
+
+	# Part 4: Write out the per-record masked base counts
+
+	write_mask_report(report_file, record_stats)
+	total_bases = sum(bases for _, bases, _ in record_stats)
+	total_masked = sum(masked_bases for _, _, masked_bases in record_stats)
+	print(f"Hard-masked {total_masked} of {total_bases} bases in {len(record_stats)} records; "
+		f"output written to {output_fasta}, per-record counts written to {report_file}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
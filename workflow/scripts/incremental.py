@@ -0,0 +1,366 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: incremental.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program lets the stage scripts of the SPOT-BGC pipeline process only the
+		samples (or cohorts) whose inputs are new or changed, so that adding samples
+		to a study does not rerun Kraken2, MetaBAT2 & CheckM on all existing samples.
+	Each processed sample (or cohort) of a stage gets a manifest, in
+		results/Manifests/{stage}/{cohort}/{sample}.json (or {stage}/{cohort}.json),
+		which records the SHA-256 checksum, size & modification time of each of its
+		input files, the output files it produced, and when it was processed.
+		Checksums are only recomputed for files whose size or modification time
+		changed, so a rewritten but identical input (e.g., by filter_contigs.py)
+		does not cause a rerun.
+	A sample is pending if it has no manifest yet, if its input files or their
+		checksums changed, or if one of its recorded outputs is missing. The stage
+		scripts list the pending input files of a stage in one call, process only
+		those, and record the manifests of the processed samples afterwards.
+	The report lists what the next run of each stage will recompute: the pending
+		samples of each stage, and the samples that are pending upstream (e.g., a
+		new assembly will also be binned & quality checked). With --since, the
+		samples processed since a given time are listed as well.
+	The sample & cohort IDs are derived from the file paths by sample_paths.py.
+
+List of functions:
+	sha256_file(file_path): Returns the SHA-256 checksum of a file.
+	file_fingerprint(file_path, previous): Returns the size, modification time &
+		checksum of a file, reusing an earlier checksum if the file is unchanged.
+	stage_inputs(stage): Lists the current input files of a stage.
+	group_units(stage, file_paths): Groups the input files of a stage by sample (or cohort).
+	manifest_file(manifest_dir, stage, unit): Returns the manifest file of a sample (or cohort).
+	read_manifest(file_path): Reads a manifest, or returns None.
+	unit_status(stage, unit, file_paths, manifest_dir): Compares the inputs & outputs
+		of a sample (or cohort) with its manifest.
+	pending_units(stage, file_paths, manifest_dir): Returns the pending samples (or cohorts) of a stage.
+	record_units(stage, file_paths, manifest_dir): Writes the manifests of processed samples (or cohorts).
+	stage_report(stages, manifest_dir, since): Lists the pending & recently processed
+		samples (or cohorts) of each stage.
+	parse_time(value): Parses a time given as seconds since the epoch or as an ISO date.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	glob
+	json
+	time
+	hashlib
+	argparse
+	datetime
+	sample_paths (SPOT-BGC)
+
+Procedure:
+	1. Loading required modules & defining the stages.
+	2. Assigning command line arguments.
+	3. Listing the pending input files of a stage, recording processed samples, or
+		reporting what the next run will recompute.
+
+Known bugs and limitations:
+	- The per-sample & per-cohort assemblies are run by Snakemake itself; their
+		manifests are only recorded for the report, which shows new samples from the
+		moment their reads have passed the read count filtration.
+	- Results produced before manifests were introduced are pending until they are
+		recorded; run the record step of each stage without files once to adopt them.
+	- Samples whose inputs are removed keep their manifests & outputs.
+
+Usage
+	./incremental.py [--manifest-dir DIR] pending --stage STAGE [--file-list FILE] [file ...]
+	./incremental.py [--manifest-dir DIR] record --stage STAGE [--file-list FILE] [file ...]
+	./incremental.py [--manifest-dir DIR] report [--since TIME] [--stage STAGE ...]
+	OR
+	python incremental.py ...
+
+	Where the files default to all current input files of the stage (unless a file
+		list is given, which may be empty), and TIME is an ISO date (e.g., 2026-10-17
+		or 2026-10-17T12:00) or seconds since the epoch.
+	The pending step prints one pending input file per line.
+
+	Note that the default paths assume the script is run from the parent SPOT-BGC/ directory!
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the stages
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import glob # enables listing of the stage inputs
+import json # enables reading & writing the manifests
+import time # enables recording of the processing time
+import hashlib # enables checksums of the input files
+import argparse # enables parsing of command line arguments
+from datetime import datetime # enables parsing of the --since time
+from sample_paths import parse_read_paths, parse_result_paths # derives the sample & cohort IDs
+
+
+# default directory of the manifests
+MANIFEST_DIR = "results/Manifests"
+
+# size of the blocks the input files are hashed in
+BUFFER_SIZE = 4 * 1024 * 1024
+
+# stages whose samples (or cohorts) are tracked, in pipeline order:
+# inputs: glob of the current input files
+# per_cohort: whether a unit is a cohort (True) or a sample
+# reads: whether the inputs are read files (parsed with parse_read_paths) or result files
+# outputs: glob of the outputs of one unit, with {cohort} & {sample} placeholders
+# after: upstream stage, whose pending units are also pending in this stage
+STAGES = {
+	"assembly_perSample": {"inputs": "results/DataNonHuman/100k_Filt/*/*_norm.*.fq*",
+		"per_cohort": False, "reads": True, "after": None,
+		"outputs": "results/Assembly/PerSample/{cohort}/{sample}/{sample}_scaffolds.fasta"},
+	"kraken_perSample": {"inputs": "results/Assembly/PerSample/*/*/*_scaffolds_filtered.fasta",
+		"per_cohort": False, "reads": False, "after": "assembly_perSample",
+		"outputs": "results/AssemblyNonHuman/PerSample/{cohort}/{sample}/{sample}_final.contigs_nonHuman.fasta"},
+	"metabat_perSample": {"inputs": "results/AssemblyNonHuman/PerSample/*/[A-Z]*/*_nonHuman.fasta",
+		"per_cohort": False, "reads": False, "after": "kraken_perSample",
+		"outputs": "results/MAGs/PerSample/{cohort}/{sample}/{sample}_metabat2_minContig1500.*.fa"},
+	"checkm_lineage_perSample": {"inputs": "results/MAGs/PerSample/*/*/*_metabat2_minContig1500.*.fa",
+		"per_cohort": False, "reads": False, "after": "metabat_perSample",
+		"outputs": "results/MAG_QC/PerSample/{cohort}/{sample}/{sample}_CheckM_results.txt"},
+	"checkm_taxonomy_perSample": {"inputs": "results/MAGs/PerSample/*/*/*_metabat2_minContig1500.*.fa",
+		"per_cohort": False, "reads": False, "after": "metabat_perSample",
+		"outputs": "results/Taxonomy/PerSample/{cohort}/{sample}/{sample}_CheckM_taxonomy.txt"},
+	"assembly_perCohort": {"inputs": "results/DataNonHuman/BBNorm_Reads/*/*_norm.*.fq*",
+		"per_cohort": True, "reads": True, "after": None,
+		"outputs": "results/Assembly/PerCohort/{cohort}/{cohort}_final.contigs.fa"},
+	"kraken_perCohort": {"inputs": "results/Assembly/PerCohort/*/*_final.contigs_filtered.fa",
+		"per_cohort": True, "reads": False, "after": "assembly_perCohort",
+		"outputs": "results/AssemblyNonHuman/PerCohort/{cohort}/{cohort}_final.contigs_nonHuman.fasta"},
+	"metabat_perCohort": {"inputs": "results/AssemblyNonHuman/PerCohort/[A-Z]*/*_nonHuman.fasta",
+		"per_cohort": True, "reads": False, "after": "kraken_perCohort",
+		"outputs": "results/MAGs/PerCohort/{cohort}/{cohort}_metabat2_minContig1500.*.fa"},
+	"checkm_lineage_perCohort": {"inputs": "results/MAGs/PerCohort/*/*_metabat2_minContig1500.*.fa",
+		"per_cohort": True, "reads": False, "after": "metabat_perCohort",
+		"outputs": "results/MAG_QC/PerCohort/{cohort}/{cohort}_CheckM_results.txt"},
+	"checkm_taxonomy_perCohort": {"inputs": "results/MAGs/PerCohort/*/*_metabat2_minContig1500.*.fa",
+		"per_cohort": True, "reads": False, "after": "metabat_perCohort",
+		"outputs": "results/Taxonomy/PerCohort/{cohort}/{cohort}_CheckM_taxonomy.txt"},
+}
+
+# columns of the report
+REPORT_COLUMNS = ["Stage", "Unit", "Status", "Processed"]
+
+
+def sha256_file(file_path):
+	"""Return the SHA-256 checksum of a file."""
+	digest = hashlib.sha256()
+	with open(file_path, "rb") as infile:
+		for chunk in iter(lambda: infile.read(BUFFER_SIZE), b''):
+			digest.update(chunk)
+	return digest.hexdigest()
+
+
+def file_fingerprint(file_path, previous=None):
+	"""Return the size, modification time & checksum of a file.
+
+	The checksum of an earlier fingerprint is reused if the size & modification
+	time of the file are unchanged.
+	"""
+	status = os.stat(file_path)
+	fingerprint = {"size": status.st_size, "mtime_ns": status.st_mtime_ns}
+	if previous and previous.get("size") == fingerprint["size"] and previous.get("mtime_ns") == fingerprint["mtime_ns"]:
+		fingerprint["sha256"] = previous["sha256"]
+	else:
+		fingerprint["sha256"] = sha256_file(file_path)
+	return fingerprint
+
+
+def stage_inputs(stage):
+	"""List the current input files of a stage."""
+	return sorted(glob.glob(STAGES[stage]["inputs"]))
+
+
+def group_units(stage, file_paths):
+	"""Group the input files of a stage by sample ('Cohort/Sample') or cohort ('Cohort')."""
+	settings = STAGES[stage]
+	if settings["reads"]:
+		records = parse_read_paths(file_paths)
+	else:
+		records = parse_result_paths(file_paths, per_cohort=settings["per_cohort"])
+	units = {}
+	for record in records:
+		unit = record.cohort if settings["per_cohort"] else record.cohort + "/" + record.sample
+		units.setdefault(unit, []).append(record.path)
+	return units
+
+
+def manifest_file(manifest_dir, stage, unit):
+	"""Return the manifest file of a sample (or cohort) of a stage."""
+	return os.path.join(manifest_dir, stage, unit + ".json")
+
+
+def read_manifest(file_path):
+	"""Read a manifest (or the fingerprints left by the pending step), or return None."""
+	try:
+		with open(file_path, "r") as infile:
+			return json.load(infile)
+	except (OSError, ValueError):
+		return None
+
+
+def unit_status(stage, unit, file_paths, manifest_dir):
+	"""Compare the inputs & outputs of a sample (or cohort) with its manifest.
+
+	Returns the status ('new', 'changed', 'outputs_missing' or 'current'), the
+	current input fingerprints & the manifest.
+	"""
+	manifest = read_manifest(manifest_file(manifest_dir, stage, unit))
+	previous_inputs = manifest["inputs"] if manifest else {}
+	fingerprints = {file_path: file_fingerprint(file_path, previous_inputs.get(file_path))
+		for file_path in sorted(file_paths)}
+	if manifest is None:
+		return "new", fingerprints, manifest
+	if fingerprints.keys() != previous_inputs.keys() or any(fingerprint["sha256"] != previous_inputs[file_path]["sha256"]
+			for file_path, fingerprint in fingerprints.items()):
+		return "changed", fingerprints, manifest
+	if not all(os.path.exists(output) for output in manifest["outputs"]):
+		return "outputs_missing", fingerprints, manifest
+	return "current", fingerprints, manifest
+
+
+def pending_units(stage, file_paths, manifest_dir):
+	"""Return the pending samples (or cohorts) of a stage, as a list of (unit, status, input files).
+
+	The fingerprints of pending units are kept next to their manifests, so the record
+	step does not hash the same inputs again.
+	"""
+	pending = []
+	for unit, unit_paths in group_units(stage, file_paths).items():
+		status, fingerprints, _ = unit_status(stage, unit, unit_paths, manifest_dir)
+		if status == "current":
+			continue
+		pending.append((unit, status, unit_paths))
+		fingerprint_file = manifest_file(manifest_dir, stage, unit) + ".pending"
+		os.makedirs(os.path.dirname(fingerprint_file), exist_ok=True)
+		with open(fingerprint_file, "w") as outfile:
+			json.dump(fingerprints, outfile)
+	return pending
+
+
+def record_units(stage, file_paths, manifest_dir):
+	"""Write the manifests of the processed samples (or cohorts) of a stage.
+
+	Returns the number of manifests written.
+	"""
+	output_pattern = STAGES[stage]["outputs"]
+	units = group_units(stage, file_paths)
+	for unit, unit_paths in units.items():
+		file_path = manifest_file(manifest_dir, stage, unit)
+		previous_inputs = dict((read_manifest(file_path) or {}).get("inputs", {}))
+		previous_inputs.update(read_manifest(file_path + ".pending") or {})
+		cohort_id, _, sample_id = unit.partition("/")
+		manifest = {"stage": stage, "unit": unit, "time": int(time.time()),
+			"inputs": {input_path: file_fingerprint(input_path, previous_inputs.get(input_path))
+				for input_path in sorted(unit_paths)},
+			"outputs": sorted(glob.glob(output_pattern.format(cohort=cohort_id, sample=sample_id or cohort_id)))}
+		os.makedirs(os.path.dirname(file_path), exist_ok=True)
+		# replace the old manifest only once the new one is complete
+		with open(file_path + ".tmp", "w") as outfile:
+			json.dump(manifest, outfile)
+		os.replace(file_path + ".tmp", file_path)
+		if os.path.exists(file_path + ".pending"):
+			os.remove(file_path + ".pending")
+	return len(units)
+
+
+def stage_report(stages, manifest_dir, since=None):
+	"""List the pending & recently processed samples (or cohorts) of each stage.
+
+	Returns a list of (stage, unit, status, processed time) rows. Units pending in an
+	upstream stage are listed as 'upstream' in the stages after it; with since, the
+	units processed since that time (in seconds since the epoch) are listed as 'processed'.
+	"""
+	rows = []
+	pending_by_stage = {}
+	for stage in STAGES:
+		units = group_units(stage, stage_inputs(stage))
+		upstream = pending_by_stage.get(STAGES[stage]["after"], set())
+		pending = set()
+		for unit in sorted(units.keys() | upstream):
+			if unit in units:
+				status, _, manifest = unit_status(stage, unit, units[unit], manifest_dir)
+			else:
+				status, manifest = "upstream", None
+			if status == "current" and unit in upstream:
+				status = "upstream"
+			processed = manifest["time"] if manifest else None
+			if status != "current":
+				pending.add(unit)
+			elif since is None or processed < since:
+				continue
+			else:
+				status = "processed"
+			if stage in stages:
+				processed_time = datetime.fromtimestamp(processed).isoformat(timespec="seconds") if processed else "NA"
+				rows.append((stage, unit, status, processed_time))
+		pending_by_stage[stage] = pending
+	return rows
+
+
+def parse_time(value):
+	"""Parse a time given as seconds since the epoch or as an ISO date."""
+	try:
+		return float(value)
+	except ValueError:
+		return datetime.fromisoformat(value).timestamp()
+
+
+def main():
+	"""Parse the command line arguments & run the pending, record or report step."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Track the processed samples of the SPOT-BGC stages.")
+	parser.add_argument("--manifest-dir", default=MANIFEST_DIR, help=f"manifest directory (default: {MANIFEST_DIR})")
+	subparsers = parser.add_subparsers(dest="step", required=True)
+	pending_parser = subparsers.add_parser("pending", help="print the pending input files of a stage")
+	record_parser = subparsers.add_parser("record", help="record the manifests of processed samples")
+	for step_parser in (pending_parser, record_parser):
+		step_parser.add_argument("--stage", required=True, choices=list(STAGES), help="pipeline stage")
+		step_parser.add_argument("--file-list", help="file listing the input files, one per line (may be empty)")
+		step_parser.add_argument("files", nargs="*", help="input files (default: all current inputs of the stage)")
+	report_parser = subparsers.add_parser("report", help="report what the next run will recompute")
+	report_parser.add_argument("--since", help="also list the samples processed since this time")
+	report_parser.add_argument("--stage", action="append", choices=list(STAGES),
+		help="only report this stage (can be repeated; default: all stages)")
+	args = parser.parse_args()
+
+
+	# Part 3: Run the step
+
+	if args.step == "report":
+		since = parse_time(args.since) if args.since else None
+		rows = stage_report(args.stage or list(STAGES), args.manifest_dir, since)
+		sys.stdout.write("\t".join(REPORT_COLUMNS) + "\n")
+		sys.stdout.writelines("\t".join(row) + "\n" for row in rows)
+		pending_count = sum(1 for row in rows if row[2] != "processed")
+		print(f"{pending_count} samples or cohorts will be recomputed.", file=sys.stderr)
+		return
+
+	if args.file_list:
+		with open(args.file_list, "r") as infile:
+			file_paths = [line.strip() for line in infile if line.strip()]
+	else:
+		file_paths = [file_path for file_path in args.files if file_path] or stage_inputs(args.stage)
+	if args.step == "pending":
+		pending = pending_units(args.stage, file_paths, args.manifest_dir)
+		for _, _, unit_paths in pending:
+			sys.stdout.writelines(file_path + "\n" for file_path in unit_paths)
+		print(f"{args.stage}: {len(pending)} of {len(group_units(args.stage, file_paths))} "
+			"samples or cohorts are new or changed.", file=sys.stderr)
+	else:
+		unit_count = record_units(args.stage, file_paths, args.manifest_dir)
+		print(f"{args.stage}: recorded {unit_count} samples or cohorts.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,240 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: instrument.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program runs one tool invocation of the SPOT-BGC pipeline (e.g., one MetaBAT2
+		run inside the loop of a shell script) and records its performance, so that
+		the time spent inside the loop scripts can be broken down per tool & sample.
+		Snakemake's own benchmark files only cover a rule as a whole.
+	The wall time, CPU time (user & system), peak resident memory, bytes read &
+		written, and the size of the input files are appended as one JSON line to a
+		structured log (by default logs/Performance/tool_runs.jsonl), which is locked
+		while it is written to, so parallel jobs can share it. CPU time & peak memory
+		are taken from the resource usage of the finished command (including the
+		processes it waited for), & the bytes read & written from the I/O counters
+		of this process, which the counters of the reaped command are added to.
+	A forked process starts from the peak resident memory of its parent, so other
+		scripts measure a command through a separate, small instrument.py process
+		(see run_instrumented()), & the memory they hold does not count towards the
+		peak memory of the command.
+	The exit code of the command is passed on, so wrapping a command does not
+		change how its failures are handled.
+	The records are aggregated by performance_report.py.
+
+List of functions:
+	io_counters(): Reads the I/O counters of this process (and its reaped children).
+	tool_name(command): Returns the name of the tool run by a command.
+	measure_command(command, cwd, stdout): Runs a command as a child of this process &
+		measures its resource usage.
+	run_instrumented(command, cwd, stdout, stderr): Runs a command through a separate
+		instrument.py process & measures its resource usage.
+	append_record(record, log_file): Appends a record to the performance log.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	json
+	time
+	fcntl
+	socket
+	argparse
+	subprocess
+
+Procedure:
+	1. Loading required modules & defining the measuring functions.
+	2. Assigning command line arguments.
+	3. Running the command & appending its performance record to the log.
+
+Known bugs and limitations:
+	- The I/O counters are only available on Linux; elsewhere the block I/O of the
+		resource usage (512-byte blocks) is used, which misses reads from the page cache.
+	- Processes that the command leaves running in the background are not measured.
+	- Peak memory is that of the largest single process, not the sum over the
+		processes of the command.
+	- Peak memory can not be lower than the resident memory of the process that starts
+		the command (about 13 MB for instrument.py), as a forked process starts from
+		the peak memory of its parent.
+
+Usage
+	./instrument.py [--log FILE] --stage STAGE [--sample ID] [--inputs FILE [FILE ...]] -- command [args ...]
+	OR
+	python instrument.py [--log FILE] --stage STAGE [--sample ID] [--inputs FILE [FILE ...]] -- command [args ...]
+
+	The log can also be set with the SPOT_BGC_PERFORMANCE_LOG environment variable.
+	With --measure-fd FD, the exit code & measurements are written as JSON to the file
+		descriptor FD instead of being logged (this is used by run_instrumented()).
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the measuring functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import json # enables writing of the performance records
+import time # enables measurement of the wall time
+import fcntl # enables locking of the shared log
+import socket # enables recording of the host name
+import argparse # enables parsing of command line arguments
+import subprocess # enables running the command
+
+
+# default structured log of the tool invocations
+DEFAULT_LOG = "logs/Performance/tool_runs.jsonl"
+
+# wrappers whose tool is given by a later argument of the command
+WRAPPER_COMMANDS = {"timeout": 2, "apptainer": 3, "singularity": 3}
+
+
+def io_counters():
+	"""Read the I/O counters of this process, which include the counters of its reaped children.
+
+	Returns a dictionary of the counters (rchar, wchar, read_bytes, write_bytes, ...),
+	or None if they are not available.
+	"""
+	try:
+		with open("/proc/self/io", "r") as infile:
+			return {key: int(value) for key, value in (line.split(": ") for line in infile)}
+	except (OSError, ValueError):
+		return None
+
+
+def tool_name(command):
+	"""Return the name of the tool run by a command, looking past timeout & apptainer exec."""
+	position = 0
+	while position < len(command) and os.path.basename(command[position]) in WRAPPER_COMMANDS:
+		position += WRAPPER_COMMANDS[os.path.basename(command[position])]
+	return os.path.basename(command[min(position, len(command) - 1)])
+
+
+def measure_command(command, cwd=None, stdout=None):
+	"""Run a command as a child of this process & measure its wall time, CPU time, peak memory & I/O.
+
+	The command is run in the directory cwd (default: the current directory), with its
+	standard output sent to stdout (default: inherited). Returns the exit code of the
+	command & the dictionary of measurements.
+	The peak memory is floored at the resident memory of this process when the command
+	is started, so this is only used by the small instrument.py process itself.
+	"""
+	io_before = io_counters()
+	start = time.perf_counter()
+	process = subprocess.Popen(command, cwd=cwd, stdout=stdout)
+	_, status, usage = os.wait4(process.pid, 0)
+	wall_time = time.perf_counter() - start
+	# the process was reaped by wait4, so Popen must not wait for it again
+	process.returncode = os.waitstatus_to_exitcode(status)
+	io_after = io_counters()
+	measurements = {
+		"wall_s": round(wall_time, 3),
+		"cpu_user_s": round(usage.ru_utime, 3),
+		"cpu_system_s": round(usage.ru_stime, 3),
+		# ru_maxrss is in kilobytes on Linux
+		"max_rss_mb": round(usage.ru_maxrss / 1024, 1),
+	}
+	if io_before and io_after:
+		measurements["read_bytes"] = io_after["rchar"] - io_before["rchar"]
+		measurements["write_bytes"] = io_after["wchar"] - io_before["wchar"]
+	else:
+		measurements["read_bytes"] = usage.ru_inblock * 512
+		measurements["write_bytes"] = usage.ru_oublock * 512
+	return process.returncode, measurements
+
+
+def run_instrumented(command, cwd=None, stdout=None, stderr=None):
+	"""Run a command through a separate instrument.py process & measure its wall time, CPU time, peak memory & I/O.
+
+	The arguments & return values are those of measure_command(), but the peak memory of
+	the command does not include the memory held by the calling process. stderr is passed
+	on to the instrument.py process, like stdout.
+	A command that can not be started raises an OSError.
+	"""
+	read_fd, write_fd = os.pipe()
+	try:
+		helper = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--measure-fd", str(write_fd),
+			"--", *command], cwd=cwd, stdout=stdout, stderr=stderr, pass_fds=(write_fd,))
+	finally:
+		os.close(write_fd)
+	with os.fdopen(read_fd, "r") as infile:
+		result = infile.read()
+	helper.wait()
+	if not result:
+		raise OSError(f"Could not run {command[0]} (exit code {helper.returncode})")
+	result = json.loads(result)
+	return result["exit_code"], result["measurements"]
+
+
+def append_record(record, log_file):
+	"""Append a record as one JSON line to the performance log, holding a lock on the log."""
+	if os.path.dirname(log_file):
+		os.makedirs(os.path.dirname(log_file), exist_ok=True)
+	with open(log_file, "a") as outfile:
+		fcntl.flock(outfile, fcntl.LOCK_EX)
+		try:
+			outfile.write(json.dumps(record) + "\n")
+			outfile.flush()
+		finally:
+			fcntl.flock(outfile, fcntl.LOCK_UN)
+
+
+def main():
+	"""Parse the command line arguments, run the command & record its performance."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Run a command & record its runtime, memory & I/O.")
+	parser.add_argument("--log", default=os.environ.get("SPOT_BGC_PERFORMANCE_LOG", DEFAULT_LOG),
+		help=f"structured performance log to append to (default: {DEFAULT_LOG})")
+	parser.add_argument("--stage", help="pipeline stage of the command (e.g., metabat_perSample)")
+	parser.add_argument("--sample", default="NA", help="sample, cohort or batch the command processes")
+	parser.add_argument("--inputs", nargs="*", default=[], help="input files, whose total size is recorded")
+	parser.add_argument("--measure-fd", type=int,
+		help="write the exit code & measurements as JSON to this file descriptor instead of the log")
+	parser.add_argument("command", nargs=argparse.REMAINDER, help="command to run, after --")
+	args = parser.parse_args()
+	command = args.command[1:] if args.command[:1] == ["--"] else args.command
+	if not command:
+		parser.error("no command given")
+	if args.stage is None and args.measure_fd is None:
+		parser.error("the following arguments are required: --stage")
+
+
+	# Part 3: Run the command & record its performance
+
+	if args.measure_fd is not None:
+		# measure the command for run_instrumented(), which reports a command that could not be started
+		try:
+			exit_code, measurements = measure_command(command)
+		except OSError as error:
+			print(f"Could not run {command[0]}: {error}", file=sys.stderr)
+			sys.exit(127)
+		with os.fdopen(args.measure_fd, "w") as outfile:
+			json.dump({"exit_code": exit_code, "measurements": measurements}, outfile)
+		sys.exit(0)
+	record = {"time": int(time.time()), "host": socket.gethostname(), "stage": args.stage,
+		"sample": args.sample, "tool": tool_name(command),
+		"input_bytes": sum(os.path.getsize(file_path) for file_path in args.inputs if os.path.exists(file_path))}
+	try:
+		exit_code, measurements = measure_command(command)
+	except OSError as error:
+		print(f"Could not run {command[0]}: {error}", file=sys.stderr)
+		sys.exit(127)
+	record.update(measurements)
+	record["exit_code"] = exit_code
+	try:
+		append_record(record, args.log)
+	except OSError as error:
+		# a failure to record the performance does not fail the pipeline step
+		print(f"Could not write the performance record to {args.log}: {error}", file=sys.stderr)
+	sys.exit(exit_code if exit_code >= 0 else 128 - exit_code)
+
+
+if __name__ == "__main__":
+	main()
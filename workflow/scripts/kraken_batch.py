@@ -0,0 +1,259 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: kraken_batch.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program batches the Kraken2 human contig removal of the SPOT-BGC pipeline,
+		so that Kraken2 (and its container) is started, and the human database
+		loaded, only once for many assemblies instead of once per assembly.
+	The merge step streams all assemblies listed in a manifest into one FASTA file,
+		prefixing each contig ID with the label of its assembly. After Kraken2 has
+		classified the merged file, the split step streams the Kraken2 output & the
+		unclassified contigs back out into the per-assembly files, removing the
+		label prefix again, and writes a per-assembly classification summary.
+	Kraken2 writes one report for the whole batch, so the per-assembly Kraken2
+		reports are rebuilt in the split step: the taxonomy tree (order, depth,
+		rank & name of each taxon) is read from the batch report, and the contigs
+		of each assembly are counted per taxon from its split Kraken2 output, and
+		summed up the tree into clade counts.
+
+List of functions:
+	read_manifest(manifest_file): Reads a batch manifest into a list of
+		(label, assembly, output_prefix) tuples.
+	merge_assemblies(batch, merged_fasta): Writes the contigs of all assemblies of a
+		batch into one FASTA file, with labelled contig IDs.
+	read_kraken_report(report_file): Reads the taxonomy tree of a Kraken2 report.
+	write_kraken_report(report_file, taxa, parents, taxon_counts): Writes a Kraken2
+		report of the contigs of one assembly.
+	split_results(batch, kraken_output, unclassified_fasta, kraken_report): Splits the
+		Kraken2 output, unclassified contigs & report of a batch back out per assembly.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	argparse
+	collections.Counter
+
+Procedure:
+	1. Loading required modules & defining the merge & split functions.
+	2. Assigning command line arguments.
+	3. Running the merge or split step.
+
+Known bugs and limitations:
+	- Labels must be unique within a batch and must not contain whitespace or the
+		LABEL_SEPARATOR character.
+	- The per-assembly Kraken2 reports only list the taxa of the batch report, and
+		are rebuilt without the minimizer columns of --report-minimizer-data.
+
+Usage
+	./kraken_batch.py merge manifest_file merged_fasta
+	./kraken_batch.py split [--report kraken_report] manifest_file kraken_output unclassified_fasta
+	OR
+	python kraken_batch.py merge manifest_file merged_fasta
+	python kraken_batch.py split [--report kraken_report] manifest_file kraken_output unclassified_fasta
+
+	Where manifest_file is a tab-separated file with the columns label, assembly
+	& output_prefix (no header). For each assembly, the split step writes
+	{output_prefix}__kraken2_out.txt, {output_prefix}_final.contigs_nonHuman.fasta
+	& {output_prefix}__kraken2_summary.txt, and with the --report of the batch,
+	{output_prefix}__kraken2_report.txt.
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the merge & split functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import argparse # enables parsing of command line arguments
+from collections import Counter # enables counting of the contigs per taxon
+
+
+# separates the assembly label from the original contig ID in the merged FASTA file
+LABEL_SEPARATOR = "|"
+
+# size of the file buffers, as the assemblies are streamed
+BUFFER_SIZE = 4 * 1024 * 1024
+
+
+def read_manifest(manifest_file):
+	"""Read a batch manifest into a list of (label, assembly, output_prefix) tuples."""
+	batch = []
+	with open(manifest_file, "r") as infile:
+		for line in infile:
+			if not line.strip():
+				continue
+			label, assembly, output_prefix = line.rstrip("\n").split("\t")
+			if LABEL_SEPARATOR in label or label != "".join(label.split()):
+				raise ValueError(f"Invalid batch label: {label}")
+			batch.append((label, assembly, output_prefix))
+	labels = [label for label, _, _ in batch]
+	if len(set(labels)) != len(labels):
+		raise ValueError(f"Batch labels in {manifest_file} are not unique")
+	return batch
+
+
+def merge_assemblies(batch, merged_fasta):
+	"""Write the contigs of all assemblies of a batch into one FASTA file, with labelled contig IDs.
+
+	Returns the number of contigs written.
+	"""
+	contig_count = 0
+	with open(merged_fasta, "w", buffering=BUFFER_SIZE) as outfile:
+		for label, assembly, _ in batch:
+			with open(assembly, "r", buffering=BUFFER_SIZE) as infile:
+				for line in infile:
+					if line.startswith(">"):
+						outfile.write(">" + label + LABEL_SEPARATOR + line[1:])
+						contig_count += 1
+					else:
+						outfile.write(line)
+	return contig_count
+
+
+def read_kraken_report(report_file):
+	"""Read the taxonomy tree of a Kraken2 report.
+
+	Returns the list of taxa in report order, as (rank, taxon ID, name, depth) tuples,
+	& the dictionary of taxon ID: parent taxon ID (0 for the root).
+	"""
+	taxa = []
+	parents = {}
+	lineage = []
+	with open(report_file, "r") as infile:
+		for line in infile:
+			if not line.strip():
+				continue
+			columns = line.rstrip("\n").split("\t")
+			rank, taxon_id, indented_name = columns[-3], int(columns[-2]), columns[-1]
+			if taxon_id == 0:
+				# the unclassified contigs are not part of the tree
+				continue
+			name = indented_name.lstrip(" ")
+			# names are indented by two spaces per level of the tree
+			depth = (len(indented_name) - len(name)) // 2
+			del lineage[depth:]
+			parents[taxon_id] = lineage[-1] if lineage else 0
+			lineage.append(taxon_id)
+			taxa.append((rank, taxon_id, name, depth))
+	return taxa, parents
+
+
+def write_kraken_report(report_file, taxa, parents, taxon_counts):
+	"""Write a Kraken2 report of the contigs of one assembly.
+
+	taxon_counts is the Counter of taxon ID: contigs assigned to the taxon (0 for the
+	unclassified contigs). As in Kraken2 reports, taxa without contigs are left out.
+	"""
+	total = sum(taxon_counts.values())
+	clade_counts = Counter()
+	for taxon_id, count in taxon_counts.items():
+		while taxon_id:
+			clade_counts[taxon_id] += count
+			taxon_id = parents.get(taxon_id, 0)
+	percent = lambda count: 100 * count / total if total else 0
+	with open(report_file, "w") as outfile:
+		if taxon_counts[0]:
+			outfile.write(f"{percent(taxon_counts[0]):6.2f}\t{taxon_counts[0]}\t{taxon_counts[0]}\tU\t0\tunclassified\n")
+		for rank, taxon_id, name, depth in taxa:
+			if clade_counts[taxon_id]:
+				outfile.write(f"{percent(clade_counts[taxon_id]):6.2f}\t{clade_counts[taxon_id]}\t"
+					f"{taxon_counts[taxon_id]}\t{rank}\t{taxon_id}\t{'  ' * depth}{name}\n")
+
+
+def split_results(batch, kraken_output, unclassified_fasta, kraken_report=None):
+	"""Split the Kraken2 output, unclassified contigs & (if given) report of a batch back out per assembly.
+
+	Returns a dictionary of label: [contigs, classified contigs, unclassified contigs].
+	"""
+	prefixes = {label: output_prefix for label, _, output_prefix in batch}
+	counts = {label: [0, 0, 0] for label in prefixes}
+	taxon_counts = {label: Counter() for label in prefixes}
+	for output_prefix in prefixes.values():
+		os.makedirs(os.path.dirname(output_prefix) or ".", exist_ok=True)
+
+	# the Kraken2 output has one line per contig: C/U, contig ID, taxon ID, length, LCA mapping
+	out_files = {label: open(prefix + "__kraken2_out.txt", "w", buffering=BUFFER_SIZE)
+		for label, prefix in prefixes.items()}
+	try:
+		with open(kraken_output, "r", buffering=BUFFER_SIZE) as infile:
+			for line in infile:
+				status, contig_id, taxon_id = line.split("\t", 3)[:3]
+				label, original_id = contig_id.split(LABEL_SEPARATOR, 1)
+				out_files[label].write(status + "\t" + original_id + line[len(status) + len(contig_id) + 1:])
+				counts[label][0] += 1
+				counts[label][1 if status == "C" else 2] += 1
+				taxon_counts[label][int(taxon_id) if status == "C" else 0] += 1
+	finally:
+		for outfile in out_files.values():
+			outfile.close()
+
+	# every assembly gets a (possibly empty) file of non-human contigs
+	fasta_files = {label: open(prefix + "_final.contigs_nonHuman.fasta", "w", buffering=BUFFER_SIZE)
+		for label, prefix in prefixes.items()}
+	try:
+		with open(unclassified_fasta, "r", buffering=BUFFER_SIZE) as infile:
+			outfile = None
+			for line in infile:
+				if line.startswith(">"):
+					label, original_header = line[1:].split(LABEL_SEPARATOR, 1)
+					outfile = fasta_files[label]
+					outfile.write(">" + original_header)
+				else:
+					outfile.write(line)
+	finally:
+		for outfile in fasta_files.values():
+			outfile.close()
+
+	for label, prefix in prefixes.items():
+		with open(prefix + "__kraken2_summary.txt", "w") as outfile:
+			outfile.write("Contigs\tClassified\tUnclassified\n")
+			outfile.write("\t".join(str(count) for count in counts[label]) + "\n")
+
+	if kraken_report:
+		taxa, parents = read_kraken_report(kraken_report)
+		for label, prefix in prefixes.items():
+			write_kraken_report(prefix + "__kraken2_report.txt", taxa, parents, taxon_counts[label])
+	return counts
+
+
+def main():
+	"""Parse the command line arguments & run the merge or split step."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Merge assemblies for one Kraken2 run & split the results.")
+	subparsers = parser.add_subparsers(dest="step", required=True)
+	merge_parser = subparsers.add_parser("merge", help="merge the assemblies of a batch into one FASTA file")
+	merge_parser.add_argument("manifest", help="tab-separated manifest: label, assembly, output_prefix")
+	merge_parser.add_argument("merged_fasta", help="merged FASTA file to write")
+	split_parser = subparsers.add_parser("split", help="split the Kraken2 results of a batch per assembly")
+	split_parser.add_argument("manifest", help="tab-separated manifest: label, assembly, output_prefix")
+	split_parser.add_argument("kraken_output", help="Kraken2 --output file of the merged FASTA file")
+	split_parser.add_argument("unclassified_fasta", help="Kraken2 --unclassified-out file of the merged FASTA file")
+	split_parser.add_argument("--report", help="Kraken2 --report file of the merged FASTA file, to rebuild per assembly")
+	args = parser.parse_args()
+
+
+	# Part 3: Run the merge or split step
+
+	batch = read_manifest(args.manifest)
+	if args.step == "merge":
+		contig_count = merge_assemblies(batch, args.merged_fasta)
+		print(f"Merged {contig_count} contigs from {len(batch)} assemblies.", file=sys.stderr)
+	else:
+		counts = split_results(batch, args.kraken_output, args.unclassified_fasta, args.report)
+		classified = sum(label_counts[1] for label_counts in counts.values())
+		print(f"Split the results of {len(batch)} assemblies: {classified} human contigs removed.",
+			file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,305 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: performance_report.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program aggregates the performance measurements of the SPOT-BGC pipeline
+		into per-stage & per-sample tables, so that it can be seen which stage, tool
+		& sample the runtime, memory & I/O of a project go to.
+	Two sources are combined: the Snakemake benchmark files of the rules
+		(benchmarks/{rule}/{wildcards}.tsv), and the per-tool records written by
+		instrument.py for the tool invocations inside the loop scripts
+		(logs/Performance/tool_runs.jsonl).
+	Runs are flagged as outliers if their wall time (per MB of input, where the
+		input size is known) or peak memory lies far above the median of their
+		stage, measured in median absolute deviations. The wall time of the tool
+		invocations is plotted against their input size, one panel per stage, as
+		an SVG file (no plotting library is needed).
+
+List of functions:
+	read_benchmarks(benchmark_dir): Reads the Snakemake benchmark files.
+	read_tool_runs(log_file): Reads the instrument.py records.
+	median(values): Returns the median of a list of numbers.
+	flag_outliers(runs): Flags the runs whose wall time or peak memory is an outlier
+		within their stage.
+	stage_table(runs): Aggregates the runs per stage.
+	write_table(rows, columns, table_file): Writes out a tab-separated table.
+	scaling_plot(runs, plot_file): Plots the wall time against the input size per stage.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	csv
+	json
+	math
+	argparse
+
+Procedure:
+	1. Loading required modules & defining the aggregation functions.
+	2. Assigning command line arguments.
+	3. Reading the benchmark files & tool records.
+	4. Flagging outliers & writing out the per-sample & per-stage tables & the scaling plot.
+
+Known bugs and limitations:
+	- Snakemake benchmark files do not record the input size, so only the
+		instrument.py records are plotted against input size, & the wall time of
+		rules is not normalized by input size for the outlier flags.
+	- Stages with fewer than MIN_OUTLIER_RUNS runs are not checked for outliers.
+	- The per-stage totals of a rule & of the tool invocations inside it overlap;
+		they are reported as separate sources ("rule" & "tool").
+
+Usage
+	./performance_report.py [--benchmark-dir DIR] [--tool-log FILE] [--output-dir DIR]
+	OR
+	python performance_report.py [--benchmark-dir DIR] [--tool-log FILE] [--output-dir DIR]
+
+	Note that the default paths assume the script is run from the parent SPOT-BGC/ directory!
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the aggregation functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import csv # enables parsing of the benchmark files
+import json # enables parsing of the tool records
+import math # enables log scaling of the plot axes
+import argparse # enables parsing of command line arguments
+
+
+# minimum number of runs of a stage needed to look for outliers
+MIN_OUTLIER_RUNS = 5
+
+# runs more than this many (scaled) median absolute deviations above the median are outliers
+OUTLIER_MADS = 3.5
+
+# scale the median (& mean) absolute deviation to the standard deviation of a normal distribution
+MAD_SCALE = 1.4826
+MEAN_AD_SCALE = 1.2533
+
+# columns of the per-sample & per-stage tables
+SAMPLE_COLUMNS = ["Source", "Stage", "Tool", "Sample", "Wall_s", "CPU_s", "Max_RSS_MB",
+	"Read_MB", "Written_MB", "Input_MB", "Exit_Code", "Outlier"]
+STAGE_COLUMNS = ["Source", "Stage", "Runs", "Total_Wall_h", "Median_Wall_s", "Max_Wall_s",
+	"Total_CPU_h", "Max_RSS_MB", "Read_GB", "Written_GB", "Input_GB", "Outliers"]
+
+# size of one panel of the scaling plot, in pixels
+PANEL_WIDTH = 320
+PANEL_HEIGHT = 240
+PANEL_MARGIN = 50
+PANELS_PER_ROW = 3
+
+
+def read_benchmarks(benchmark_dir):
+	"""Read the Snakemake benchmark files into a list of run dictionaries.
+
+	The stage is the rule (the first directory below benchmark_dir), & the sample is
+	the rest of the path without the extension.
+	"""
+	runs = []
+	for root, _, file_names in os.walk(benchmark_dir):
+		for file_name in sorted(file_names):
+			if not file_name.endswith(".tsv"):
+				continue
+			relative_path = os.path.relpath(os.path.join(root, file_name), benchmark_dir)[:-len(".tsv")]
+			stage, _, sample = relative_path.partition(os.sep)
+			with open(os.path.join(root, file_name), "r", newline="") as infile:
+				for row in csv.DictReader(infile, delimiter="\t"):
+					cpu_time = row.get("cpu_time", "NA")
+					try:
+						runs.append({"Source": "rule", "Stage": stage, "Tool": stage, "Sample": sample or "NA",
+							"Wall_s": float(row["s"]),
+							"CPU_s": float(cpu_time) if cpu_time not in ("NA", "") else math.nan,
+							"Max_RSS_MB": float(row["max_rss"]), "Read_MB": float(row["io_in"]),
+							"Written_MB": float(row["io_out"]), "Input_MB": None, "Exit_Code": 0})
+					except (KeyError, ValueError):
+						# benchmarks of jobs that ended too quickly to be measured contain NA
+						continue
+	return runs
+
+
+def read_tool_runs(log_file):
+	"""Read the instrument.py records into a list of run dictionaries."""
+	runs = []
+	with open(log_file, "r") as infile:
+		for line in infile:
+			try:
+				record = json.loads(line)
+				runs.append({"Source": "tool", "Stage": record["stage"], "Tool": record["tool"],
+					"Sample": record["sample"], "Wall_s": float(record["wall_s"]),
+					"CPU_s": record["cpu_user_s"] + record["cpu_system_s"],
+					"Max_RSS_MB": float(record["max_rss_mb"]), "Read_MB": record["read_bytes"] / 1024 ** 2,
+					"Written_MB": record["write_bytes"] / 1024 ** 2,
+					"Input_MB": record["input_bytes"] / 1024 ** 2 if record["input_bytes"] else None,
+					"Exit_Code": record["exit_code"]})
+			except (ValueError, KeyError, TypeError):
+				# a line cut off by an interrupted write is skipped
+				continue
+	return runs
+
+
+def median(values):
+	"""Return the median of a non-empty list of numbers."""
+	values = sorted(values)
+	middle = len(values) // 2
+	return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def flag_outliers(runs):
+	"""Flag the runs whose wall time or peak memory is an outlier within their stage.
+
+	Wall time is compared per MB of input if the input size of all runs of the stage
+	is known. The flags are written to the Outlier column of each run.
+	"""
+	runs_by_stage = {}
+	for run in runs:
+		run["Outlier"] = []
+		runs_by_stage.setdefault((run["Source"], run["Stage"]), []).append(run)
+	for stage_runs in runs_by_stage.values():
+		if len(stage_runs) < MIN_OUTLIER_RUNS:
+			continue
+		per_input = all(run["Input_MB"] for run in stage_runs)
+		metrics = {
+			"wall_time_per_MB" if per_input else "wall_time":
+				[run["Wall_s"] / run["Input_MB"] if per_input else run["Wall_s"] for run in stage_runs],
+			"max_rss": [run["Max_RSS_MB"] for run in stage_runs],
+		}
+		for flag, values in metrics.items():
+			center = median(values)
+			deviations = [abs(value - center) for value in values]
+			# if most runs are identical, the median absolute deviation is 0, so the mean is used
+			spread = MAD_SCALE * median(deviations) or MEAN_AD_SCALE * sum(deviations) / len(deviations)
+			if not spread:
+				continue
+			for run, value in zip(stage_runs, values):
+				if (value - center) / spread > OUTLIER_MADS:
+					run["Outlier"].append(flag)
+	for run in runs:
+		run["Outlier"] = ",".join(run["Outlier"]) or "NA"
+	return runs
+
+
+def stage_table(runs):
+	"""Aggregate the runs per source & stage into the rows of the per-stage table."""
+	runs_by_stage = {}
+	for run in runs:
+		runs_by_stage.setdefault((run["Source"], run["Stage"]), []).append(run)
+	rows = []
+	for (source, stage), stage_runs in sorted(runs_by_stage.items(),
+			key=lambda item: -sum(run["Wall_s"] for run in item[1])):
+		wall_times = [run["Wall_s"] for run in stage_runs]
+		cpu_times = [run["CPU_s"] for run in stage_runs if not math.isnan(run["CPU_s"])]
+		input_sizes = [run["Input_MB"] for run in stage_runs if run["Input_MB"]]
+		rows.append({"Source": source, "Stage": stage, "Runs": len(stage_runs),
+			"Total_Wall_h": sum(wall_times) / 3600, "Median_Wall_s": median(wall_times),
+			"Max_Wall_s": max(wall_times), "Total_CPU_h": sum(cpu_times) / 3600,
+			"Max_RSS_MB": max(run["Max_RSS_MB"] for run in stage_runs),
+			"Read_GB": sum(run["Read_MB"] for run in stage_runs) / 1024,
+			"Written_GB": sum(run["Written_MB"] for run in stage_runs) / 1024,
+			"Input_GB": sum(input_sizes) / 1024 if input_sizes else None,
+			"Outliers": sum(run["Outlier"] != "NA" for run in stage_runs)})
+	return rows
+
+
+def write_table(rows, columns, table_file):
+	"""Write out a list of row dictionaries as a tab-separated table."""
+	with open(table_file, "w") as outfile:
+		outfile.write("\t".join(columns) + "\n")
+		for row in rows:
+			values = []
+			for column in columns:
+				value = row[column]
+				if value is None:
+					values.append("NA")
+				elif isinstance(value, float):
+					values.append(f"{value:.3f}")
+				else:
+					values.append(str(value))
+			outfile.write("\t".join(values) + "\n")
+
+
+def scaling_plot(runs, plot_file):
+	"""Plot the wall time against the input size of the tool invocations, one panel per stage (log-log).
+
+	Returns the number of panels drawn.
+	"""
+	points_by_stage = {}
+	for run in runs:
+		if run["Input_MB"] and run["Wall_s"] > 0:
+			points_by_stage.setdefault(run["Stage"], []).append(
+				(math.log10(run["Input_MB"]), math.log10(run["Wall_s"]), run["Outlier"] != "NA"))
+	rows = max(1, math.ceil(len(points_by_stage) / PANELS_PER_ROW))
+	width = PANELS_PER_ROW * (PANEL_WIDTH + PANEL_MARGIN) + PANEL_MARGIN
+	height = rows * (PANEL_HEIGHT + 2 * PANEL_MARGIN) + PANEL_MARGIN
+	elements = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+		'font-family="sans-serif" font-size="11">',
+		f'<rect width="{width}" height="{height}" fill="white"/>']
+	for panel, (stage, points) in enumerate(sorted(points_by_stage.items())):
+		left = PANEL_MARGIN + (panel % PANELS_PER_ROW) * (PANEL_WIDTH + PANEL_MARGIN)
+		top = PANEL_MARGIN + (panel // PANELS_PER_ROW) * (PANEL_HEIGHT + 2 * PANEL_MARGIN)
+		x_min, x_max = min(point[0] for point in points), max(point[0] for point in points)
+		y_min, y_max = min(point[1] for point in points), max(point[1] for point in points)
+		x_range, y_range = (x_max - x_min) or 1, (y_max - y_min) or 1
+		elements.append(f'<text x="{left}" y="{top - 8}" font-weight="bold">{stage}</text>')
+		elements.append(f'<rect x="{left}" y="{top}" width="{PANEL_WIDTH}" height="{PANEL_HEIGHT}" '
+			'fill="none" stroke="black"/>')
+		elements.append(f'<text x="{left}" y="{top + PANEL_HEIGHT + 15}">{10 ** x_min:.3g} MB</text>')
+		elements.append(f'<text x="{left + PANEL_WIDTH}" y="{top + PANEL_HEIGHT + 15}" '
+			f'text-anchor="end">{10 ** x_max:.3g} MB input</text>')
+		elements.append(f'<text x="{left - 4}" y="{top + PANEL_HEIGHT}" text-anchor="end">{10 ** y_min:.3g} s</text>')
+		elements.append(f'<text x="{left - 4}" y="{top + 10}" text-anchor="end">{10 ** y_max:.3g} s</text>')
+		for x, y, outlier in points:
+			cx = left + 5 + (x - x_min) / x_range * (PANEL_WIDTH - 10)
+			cy = top + PANEL_HEIGHT - 5 - (y - y_min) / y_range * (PANEL_HEIGHT - 10)
+			colour = "red" if outlier else "steelblue"
+			elements.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="3" fill="{colour}" fill-opacity="0.7"/>')
+	elements.append("</svg>")
+	with open(plot_file, "w") as outfile:
+		outfile.write("\n".join(elements) + "\n")
+	return len(points_by_stage)
+
+
+def main():
+	"""Parse the command line arguments & write out the performance report."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Aggregate the SPOT-BGC performance measurements.")
+	parser.add_argument("--benchmark-dir", default="benchmarks", help="directory of the Snakemake benchmark files")
+	parser.add_argument("--tool-log", default="logs/Performance/tool_runs.jsonl",
+		help="performance log written by instrument.py")
+	parser.add_argument("--output-dir", default="results/Performance", help="directory to write the report to")
+	args = parser.parse_args()
+
+
+	# Part 3: Read the benchmark files & tool records
+
+	runs = read_benchmarks(args.benchmark_dir) if os.path.isdir(args.benchmark_dir) else []
+	if os.path.exists(args.tool_log):
+		runs += read_tool_runs(args.tool_log)
+
+
+	# Part 4: Flag outliers & write out the report
+
+	flag_outliers(runs)
+	os.makedirs(args.output_dir, exist_ok=True)
+	write_table(sorted(runs, key=lambda run: (run["Source"], run["Stage"], run["Sample"])),
+		SAMPLE_COLUMNS, os.path.join(args.output_dir, "performance_per_sample.tsv"))
+	stage_rows = stage_table(runs)
+	write_table(stage_rows, STAGE_COLUMNS, os.path.join(args.output_dir, "performance_per_stage.tsv"))
+	panel_count = scaling_plot(runs, os.path.join(args.output_dir, "performance_scaling.svg"))
+	outlier_count = sum(run["Outlier"] != "NA" for run in runs)
+	print(f"Aggregated {len(runs)} runs of {len(stage_rows)} stages; {outlier_count} outliers flagged, "
+		f"{panel_count} stages plotted against input size.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
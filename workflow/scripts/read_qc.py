@@ -0,0 +1,271 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: read_qc.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program performs the read quality checks of the SPOT-BGC pipeline, as a
+		lightweight alternative to FastQC & MultiQC.
+	Each FASTQ file (plain or gzip-compressed) is streamed once in large blocks,
+		and the complete records of each block are parsed with vectorized numpy
+		operations, collecting the read count, the read length distribution, the
+		per-position quality sums, and the GC & N base counts. These are written
+		to a small per-file JSON summary.
+	The summaries of one cohort are then merged into a per-cohort report table,
+		so a cohort report only reads the summaries of its own files. The read
+		counts of the summaries of the normalized reads are reused by the read
+		count filtration (count_fastq_reads.py --qc-dir), so the normalized reads
+		are not read a second time to count them.
+
+List of functions:
+	open_fastq(file_path): Opens a plain or gzip-compressed FASTQ file for reading.
+	add_counts(totals, counts): Adds an array of counts to a running total of any length.
+	summarize_block(block): Collects the statistics of a block of complete FASTQ records.
+	summarize_fastq(file_path): Collects the statistics of a FASTQ file in one pass.
+	write_summary(summary, summary_file): Writes out the summary of a FASTQ file.
+	report_row(name, summary): Turns a summary into a row of the cohort report.
+	merge_summaries(summaries): Adds up the summaries of several files.
+	write_report(summary_files, report_file): Writes out the report of one cohort.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	gzip
+	json
+	argparse
+	numpy
+
+Procedure:
+	1. Loading required modules & defining the parsing functions.
+	2. Assigning command line arguments.
+	3. Summarizing one FASTQ file, or merging the summaries of a cohort into its report.
+
+Known bugs and limitations:
+	- Multi-line FASTQ records are not supported; each record must be exactly 4 lines.
+	- Quality scores are assumed to be Phred+33 encoded.
+	- Windows (CRLF) line endings are counted as part of the sequence & quality lines.
+	- Blank lines between records are not supported, as records are found by
+		counting line breaks.
+
+Usage
+	./read_qc.py summary fastq_file summary_file
+	./read_qc.py report report_file summary_file [summary_file ...]
+	OR
+	python read_qc.py summary fastq_file summary_file
+	python read_qc.py report report_file summary_file [summary_file ...]
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the parsing functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import gzip # enables reading of compressed FASTQ files
+import json # enables reading & writing the summary files
+import argparse # enables parsing of command line arguments
+import numpy as np # enables vectorized parsing of the FASTQ records
+
+
+# size of the blocks the FASTQ files are read in
+BUFFER_SIZE = 16 * 1024 * 1024
+
+# offset of the Phred quality scores in the FASTQ quality lines
+PHRED_OFFSET = 33
+
+# columns of the cohort report
+REPORT_COLUMNS = ["File", "Reads", "Bases", "Mean_Length", "Min_Length", "Max_Length",
+	"GC_Percent", "N_Percent", "Mean_Quality", "Min_Position_Quality"]
+
+
+def open_fastq(file_path):
+	"""Open a plain or gzip-compressed FASTQ file for binary reading."""
+	if file_path.endswith(".gz"):
+		return gzip.open(file_path, "rb")
+	return open(file_path, "rb")
+
+
+def add_counts(totals, counts):
+	"""Add an array of counts to a running total, extending the total if needed."""
+	if len(counts) > len(totals):
+		totals = np.concatenate([totals, np.zeros(len(counts) - len(totals), dtype=np.int64)])
+	totals[:len(counts)] += counts
+	return totals
+
+
+def summarize_block(block):
+	"""Collect the statistics of a block of complete FASTQ records.
+
+	Returns the read count, the read length counts, the per-position quality sums &
+	counts, and the GC & N base counts of the block.
+	"""
+	data = np.frombuffer(block, dtype=np.uint8)
+	line_ends = np.flatnonzero(data == ord("\n")).reshape(-1, 4)
+	line_starts = np.empty_like(line_ends)
+	line_starts[:, 0] = np.concatenate([[0], line_ends[:-1, 3] + 1])
+	line_starts[:, 1:] = line_ends[:, :3] + 1
+	read_lengths = line_ends[:, 1] - line_starts[:, 1]
+	quality_lengths = line_ends[:, 3] - line_starts[:, 3]
+	if np.any(read_lengths != quality_lengths):
+		raise ValueError("FASTQ record with a sequence & quality line of different lengths")
+
+	# mark the bytes of the sequence & quality lines
+	in_line = np.zeros(len(data) + 1, dtype=np.int32)
+	in_line[line_starts[:, 1]] += 1
+	in_line[line_ends[:, 1]] -= 1
+	in_line[line_starts[:, 3]] += 2
+	in_line[line_ends[:, 3]] -= 2
+	in_line = np.cumsum(in_line[:-1])
+
+	# base composition, case-insensitive
+	bases = data[in_line == 1] & 0xDF
+	gc_bases = int(np.count_nonzero((bases == ord("G")) | (bases == ord("C"))))
+	n_bases = int(np.count_nonzero(bases == ord("N")))
+
+	# position of each quality byte within its read
+	qualities = data[in_line == 2].astype(np.int64) - PHRED_OFFSET
+	line_offsets = np.repeat(np.cumsum(quality_lengths) - quality_lengths, quality_lengths)
+	positions = np.arange(len(qualities)) - line_offsets
+	quality_sums = np.bincount(positions, weights=qualities).astype(np.int64)
+	quality_counts = np.bincount(positions).astype(np.int64)
+	length_counts = np.bincount(read_lengths).astype(np.int64)
+	return len(line_ends), length_counts, quality_sums, quality_counts, gc_bases, n_bases
+
+
+def summarize_fastq(file_path):
+	"""Collect the statistics of a FASTQ file in one pass.
+
+	The file is read in blocks; the records cut off at the end of a block are
+	carried over to the next block.
+	"""
+	summary = {"file": file_path, "reads": 0, "gc_bases": 0, "n_bases": 0}
+	length_counts = np.zeros(0, dtype=np.int64)
+	quality_sums = np.zeros(0, dtype=np.int64)
+	quality_counts = np.zeros(0, dtype=np.int64)
+	carry = b''
+	with open_fastq(file_path) as infile:
+		while True:
+			chunk = infile.read(BUFFER_SIZE)
+			if chunk:
+				block = carry + chunk
+				# cut the block after the last complete record (every 4th line break)
+				line_breaks = block.count(b'\n')
+				if line_breaks < 4:
+					carry = block
+					continue
+				cut = len(block)
+				for _ in range(line_breaks % 4 + 1):
+					cut = block.rindex(b'\n', 0, cut)
+				cut += 1
+				block, carry = block[:cut], block[cut:]
+			elif carry.strip():
+				# the last line of the file does not end with a line break
+				block, carry = carry + b'\n', b''
+				if block.count(b'\n') % 4:
+					raise ValueError(f"{file_path} ends with an incomplete FASTQ record")
+			else:
+				break
+			reads, block_lengths, block_sums, block_counts, gc_bases, n_bases = summarize_block(block)
+			summary["reads"] += reads
+			summary["gc_bases"] += gc_bases
+			summary["n_bases"] += n_bases
+			length_counts = add_counts(length_counts, block_lengths)
+			quality_sums = add_counts(quality_sums, block_sums)
+			quality_counts = add_counts(quality_counts, block_counts)
+	summary["bases"] = int(np.dot(np.arange(len(length_counts)), length_counts))
+	summary["length_counts"] = length_counts.tolist()
+	summary["quality_sums"] = quality_sums.tolist()
+	summary["quality_counts"] = quality_counts.tolist()
+	return summary
+
+
+def write_summary(summary, summary_file):
+	"""Write out the summary of a FASTQ file as JSON."""
+	if os.path.dirname(summary_file):
+		os.makedirs(os.path.dirname(summary_file), exist_ok=True)
+	with open(summary_file, "w") as outfile:
+		json.dump(summary, outfile)
+
+
+def report_row(name, summary):
+	"""Turn a summary into a row of the cohort report."""
+	reads = summary["reads"]
+	bases = summary["bases"]
+	lengths = [length for length, count in enumerate(summary["length_counts"]) if count]
+	position_qualities = [quality_sum / count for quality_sum, count
+		in zip(summary["quality_sums"], summary["quality_counts"]) if count]
+	return [name, str(reads), str(bases),
+		f"{bases / reads:.1f}" if reads else "NA",
+		str(lengths[0]) if lengths else "NA",
+		str(lengths[-1]) if lengths else "NA",
+		f"{100 * summary['gc_bases'] / bases:.2f}" if bases else "NA",
+		f"{100 * summary['n_bases'] / bases:.4f}" if bases else "NA",
+		f"{sum(summary['quality_sums']) / bases:.2f}" if bases else "NA",
+		f"{min(position_qualities):.2f}" if position_qualities else "NA"]
+
+
+def merge_summaries(summaries):
+	"""Add up the summaries of several files into one summary."""
+	merged = {"reads": 0, "bases": 0, "gc_bases": 0, "n_bases": 0,
+		"length_counts": [], "quality_sums": [], "quality_counts": []}
+	for summary in summaries:
+		for key in ("reads", "bases", "gc_bases", "n_bases"):
+			merged[key] += summary[key]
+		for key in ("length_counts", "quality_sums", "quality_counts"):
+			merged[key] = [total + count for total, count in zip(
+				merged[key] + [0] * (len(summary[key]) - len(merged[key])),
+				summary[key] + [0] * (len(merged[key]) - len(summary[key])))]
+	return merged
+
+
+def write_report(summary_files, report_file):
+	"""Write out the report of one cohort: one row per file, and a total row."""
+	summaries = []
+	for summary_file in summary_files:
+		with open(summary_file, "r") as infile:
+			summaries.append(json.load(infile))
+	if os.path.dirname(report_file):
+		os.makedirs(os.path.dirname(report_file), exist_ok=True)
+	with open(report_file, "w") as outfile:
+		outfile.write("\t".join(REPORT_COLUMNS) + "\n")
+		for summary in summaries:
+			outfile.write("\t".join(report_row(os.path.basename(summary["file"]), summary)) + "\n")
+		outfile.write("\t".join(report_row("Total", merge_summaries(summaries))) + "\n")
+	return len(summaries)
+
+
+def main():
+	"""Parse the command line arguments & summarize a file, or report a cohort."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Single-pass read quality checks of FASTQ files.")
+	subparsers = parser.add_subparsers(dest="step", required=True)
+	summary_parser = subparsers.add_parser("summary", help="summarize one FASTQ file")
+	summary_parser.add_argument("fastq_file", help="FASTQ file (plain or .gz)")
+	summary_parser.add_argument("summary_file", help="JSON summary file to write")
+	report_parser = subparsers.add_parser("report", help="merge the summaries of a cohort into its report")
+	report_parser.add_argument("report_file", help="tab-separated cohort report to write")
+	report_parser.add_argument("summary_files", nargs="+", help="JSON summary files of the cohort")
+	args = parser.parse_args()
+
+
+	# Part 3: Summarize the file, or report the cohort
+
+	if args.step == "summary":
+		summary = summarize_fastq(args.fastq_file)
+		write_summary(summary, args.summary_file)
+		print(f"{args.fastq_file}: {summary['reads']} reads, {summary['bases']} bases.", file=sys.stderr)
+	else:
+		file_count = write_report(args.summary_files, args.report_file)
+		print(f"Merged the summaries of {file_count} files into {args.report_file}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
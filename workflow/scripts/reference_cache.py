@@ -0,0 +1,361 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: reference_cache.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program keeps a content-addressed cache of the prepared reference files of
+		the SPOT-BGC pipeline (the hard-masked human genome & its Bowtie2 index) in
+		a shared directory, so that a new project directory does not spend hours
+		of CPU time rebuilding identical files.
+	Each cache entry is keyed by the SHA-256 checksum of the input file(s), the name
+		of the preparation step, its parameters & the version of the tools that run
+		it (the SHA-256 checksum of a script, or the output of a version command, so
+		that an updated tool does not reuse files built by the old one). On a cache hit, the cached files
+		are hard-linked into the project (or symlinked, if the cache is on another
+		filesystem). On a miss, the build command is run, and its outputs are copied
+		into a temporary entry directory that is renamed into place, so that an
+		entry is published atomically & never seen half-written. An exclusive lock
+		per entry makes concurrent projects wait for one build instead of each
+		building the same files.
+	The checksum of an input file is remembered in the cache (by path, size &
+		modification time), so large inputs are only read again when they change.
+
+	Subcommands:
+		fetch: link the outputs of a step from the cache, or build & publish them
+		verify: recompute the checksums of the cached files & report broken entries
+		gc: remove entries not used for a number of days & leftover temporary entries
+
+List of functions:
+	file_sha256(path): Returns the SHA-256 checksum of a file.
+	input_sha256(cache_dir, path): Returns the checksum of an input file, using the
+		remembered checksum if the file did not change.
+	tool_version(version_command): Returns the output of a tool version command.
+	entry_key(step, params, input_checksums, tool_ids): Returns the cache key of a step.
+	link_outputs(entry_dir, outputs): Links the cached files into the project.
+	publish(entry_dir, step, params, inputs, outputs, tools): Copies the outputs
+		into the cache & renames the entry into place.
+	fetch(cache_dir, step, params, inputs, outputs, command, tool_files, version_command):
+		Links the outputs from the cache, or runs the command & publishes its outputs.
+	verify(cache_dir, remove): Checks the cached files against their checksums.
+	collect_garbage(cache_dir, max_age_days): Removes stale entries.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	time
+	json
+	fcntl
+	shutil
+	socket
+	shlex
+	hashlib
+	argparse
+	subprocess
+
+Procedure:
+	1. Loading required modules & defining the cache functions.
+	2. Assigning command line arguments.
+	3. Running the fetch, verify or gc subcommand.
+
+Known bugs and limitations:
+	- The entry locks use flock, which requires a shared filesystem with working
+		file locks (e.g., NFSv4, Lustre or BeeGFS mounted with locking).
+	- Symlinked outputs (used if the cache is on another filesystem than the project)
+		break if the entry is removed by gc; hard-linked outputs do not.
+	- The build command must write exactly the files given with --outputs.
+	- Cached files are read-only, as the project outputs are hard links to them.
+
+Usage
+	./reference_cache.py fetch [--cache-dir DIR] --step STEP [--params PARAMS] [--tool-files FILE ...]
+		[--version-command COMMAND] --inputs FILE [FILE ...] --outputs FILE [FILE ...] -- command [arg ...]
+	./reference_cache.py verify --cache-dir DIR [--remove]
+	./reference_cache.py gc --cache-dir DIR [--max-age-days N]
+	OR
+	python reference_cache.py ...
+
+	Without a cache directory, fetch simply runs the command.
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the cache functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import time # enables timing & ageing of cache entries
+import json # enables reading & writing the entry descriptions
+import fcntl # enables file locking
+import shutil # enables copying & removal of cached files
+import socket # enables naming temporary entries after the host
+import shlex # enables splitting the tool version command
+import hashlib # enables SHA-256 checksums
+import argparse # enables parsing of command line arguments
+import subprocess # enables running the build command
+
+
+# size of the blocks files are checksummed & copied in
+BLOCK_SIZE = 8 * 1024 * 1024
+
+# description of a cache entry, written last when publishing
+ENTRY_NAME = "ENTRY.json"
+
+# touched whenever an entry is used, for gc
+LAST_USED_NAME = ".last_used"
+
+# temporary entries older than this are removed by gc
+TEMPORARY_MAX_AGE_DAYS = 1
+
+
+def file_sha256(path):
+	"""Return the SHA-256 checksum of a file."""
+	checksum = hashlib.sha256()
+	with open(path, "rb") as infile:
+		for block in iter(lambda: infile.read(BLOCK_SIZE), b""):
+			checksum.update(block)
+	return checksum.hexdigest()
+
+
+def input_sha256(cache_dir, path):
+	"""Return the checksum of an input file, using the remembered checksum if the file did not change."""
+	stat = os.stat(path)
+	memo_dir = os.path.join(cache_dir, "inputs")
+	memo_file = os.path.join(memo_dir, hashlib.sha256(os.path.realpath(path).encode()).hexdigest() + ".json")
+	try:
+		with open(memo_file, "r") as infile:
+			memo = json.load(infile)
+		if memo["size"] == stat.st_size and memo["mtime"] == stat.st_mtime:
+			return memo["sha256"]
+	except (OSError, ValueError, KeyError):
+		pass
+	checksum = file_sha256(path)
+	os.makedirs(memo_dir, exist_ok=True)
+	with open(memo_file + f".{os.getpid()}", "w") as outfile:
+		json.dump({"path": os.path.realpath(path), "size": stat.st_size, "mtime": stat.st_mtime,
+			"sha256": checksum}, outfile)
+	os.replace(memo_file + f".{os.getpid()}", memo_file)
+	return checksum
+
+
+def tool_version(version_command):
+	"""Return the output of a tool version command (e.g., bowtie2-build --version)."""
+	result = subprocess.run(shlex.split(version_command), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+		universal_newlines=True, check=True)
+	return result.stdout.strip()
+
+
+def entry_key(step, params, input_checksums, tool_ids=()):
+	"""Return the cache key of a step, from its name, parameters, input checksums & tool versions."""
+	return hashlib.sha256("\n".join([step, params] + list(input_checksums) + list(tool_ids)).encode()).hexdigest()[:24]
+
+
+def link_outputs(entry_dir, outputs):
+	"""Hard-link (or symlink, across filesystems) the cached files into the project outputs."""
+	for output in outputs:
+		cached_file = os.path.join(entry_dir, os.path.basename(output))
+		os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+		if os.path.lexists(output):
+			os.remove(output)
+		try:
+			os.link(cached_file, output)
+			os.utime(output)
+		except OSError:
+			os.symlink(os.path.abspath(cached_file), output)
+			os.utime(output, follow_symlinks=False)
+
+
+def _entry_valid(entry_dir, outputs):
+	"""Return True if the entry is published & holds all outputs."""
+	return os.path.exists(os.path.join(entry_dir, ENTRY_NAME)) and all(
+		os.path.exists(os.path.join(entry_dir, os.path.basename(output))) for output in outputs)
+
+
+def publish(entry_dir, step, params, inputs, outputs, tools=None):
+	"""Copy the outputs into a temporary entry with their checksums, and rename it into place."""
+	temporary_dir = f"{entry_dir}.tmp-{socket.gethostname()}-{os.getpid()}"
+	os.makedirs(temporary_dir)
+	try:
+		files = {}
+		for output in outputs:
+			shutil.copyfile(output, os.path.join(temporary_dir, os.path.basename(output)))
+			files[os.path.basename(output)] = file_sha256(os.path.join(temporary_dir, os.path.basename(output)))
+			# the cached files are shared by hard links, so they must not be written to
+			os.chmod(os.path.join(temporary_dir, os.path.basename(output)), 0o444)
+		with open(os.path.join(temporary_dir, ENTRY_NAME), "w") as outfile:
+			json.dump({"step": step, "params": params, "inputs": inputs, "tools": tools or {}, "files": files,
+				"created": time.strftime("%Y-%m-%d %H:%M:%S")}, outfile, indent=1)
+		open(os.path.join(temporary_dir, LAST_USED_NAME), "w").close()
+		os.rename(temporary_dir, entry_dir)
+	except OSError:
+		# e.g., the entry was published by another host in the meantime
+		shutil.rmtree(temporary_dir, ignore_errors=True)
+		if not os.path.exists(os.path.join(entry_dir, ENTRY_NAME)):
+			raise
+
+
+def fetch(cache_dir, step, params, inputs, outputs, command, tool_files=(), version_command=""):
+	"""Link the outputs of a step from the cache, or run the command & publish its outputs.
+
+	The checksums of the tool_files (e.g., the script run by the command) & the output of
+	the version_command are part of the cache key. Returns the exit code of the command
+	(0 on a cache hit).
+	"""
+	input_checksums = [input_sha256(cache_dir, path) for path in inputs]
+	tools = {path: file_sha256(path) for path in tool_files}
+	if version_command:
+		tools[version_command] = tool_version(version_command)
+	key = entry_key(step, params, input_checksums, tools.values())
+	entry_dir = os.path.join(cache_dir, step, key)
+	os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+	with open(entry_dir + ".lock", "a") as lock_file:
+		# wait for another project building the same entry
+		fcntl.flock(lock_file, fcntl.LOCK_EX)
+		if _entry_valid(entry_dir, outputs):
+			link_outputs(entry_dir, outputs)
+			os.utime(os.path.join(entry_dir, LAST_USED_NAME))
+			print(f"Reference cache hit: linked {len(outputs)} {step} files from {entry_dir}.", file=sys.stderr)
+			return 0
+		# remove what is left of a broken entry
+		shutil.rmtree(entry_dir, ignore_errors=True)
+		print(f"Reference cache miss: building {step} ({entry_dir}).", file=sys.stderr)
+		return_code = subprocess.call(command)
+		if return_code != 0:
+			return return_code
+		missing = [output for output in outputs if not os.path.exists(output)]
+		if missing:
+			print(f"Not publishing {step}: missing outputs {missing}", file=sys.stderr)
+			return 1
+		publish(entry_dir, step, params, dict(zip(inputs, input_checksums)), outputs, tools)
+		print(f"Published {step} to {entry_dir}.", file=sys.stderr)
+	return 0
+
+
+def _entries(cache_dir):
+	"""Yield the directories of the published entries of the cache."""
+	for step in sorted(os.listdir(cache_dir)):
+		step_dir = os.path.join(cache_dir, step)
+		if not os.path.isdir(step_dir) or step == "inputs":
+			continue
+		for name in sorted(os.listdir(step_dir)):
+			entry_dir = os.path.join(step_dir, name)
+			if os.path.isdir(entry_dir) and ".tmp-" not in name:
+				yield entry_dir
+
+
+def verify(cache_dir, remove=False):
+	"""Check the cached files against their checksums, optionally removing broken entries.
+
+	Returns the number of broken entries.
+	"""
+	broken = 0
+	for entry_dir in _entries(cache_dir):
+		try:
+			with open(os.path.join(entry_dir, ENTRY_NAME), "r") as infile:
+				files = json.load(infile)["files"]
+			bad_files = [name for name, checksum in files.items()
+				if not os.path.exists(os.path.join(entry_dir, name))
+				or file_sha256(os.path.join(entry_dir, name)) != checksum]
+		except (OSError, ValueError, KeyError):
+			bad_files = [ENTRY_NAME]
+		if bad_files:
+			broken += 1
+			print(f"BROKEN\t{entry_dir}\t{','.join(bad_files)}")
+			if remove:
+				with open(entry_dir + ".lock", "a") as lock_file:
+					fcntl.flock(lock_file, fcntl.LOCK_EX)
+					shutil.rmtree(entry_dir, ignore_errors=True)
+		else:
+			print(f"OK\t{entry_dir}")
+	return broken
+
+
+def collect_garbage(cache_dir, max_age_days):
+	"""Remove entries not used for max_age_days, and leftover temporary entries.
+
+	Returns the number of bytes freed.
+	"""
+	now = time.time()
+	freed = 0
+	for step in sorted(os.listdir(cache_dir)):
+		step_dir = os.path.join(cache_dir, step)
+		if not os.path.isdir(step_dir) or step == "inputs":
+			continue
+		for name in sorted(os.listdir(step_dir)):
+			entry_dir = os.path.join(step_dir, name)
+			if not os.path.isdir(entry_dir):
+				continue
+			if ".tmp-" in name:
+				stale = now - os.path.getmtime(entry_dir) > TEMPORARY_MAX_AGE_DAYS * 86400
+			else:
+				last_used_file = os.path.join(entry_dir, LAST_USED_NAME)
+				last_used = os.path.getmtime(last_used_file) if os.path.exists(last_used_file) else 0
+				stale = now - last_used > max_age_days * 86400
+			if not stale:
+				continue
+			with open(os.path.join(step_dir, name.split(".tmp-")[0] + ".lock"), "a") as lock_file:
+				try:
+					fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+				except OSError:
+					# the entry is being built or used
+					continue
+				size = sum(os.path.getsize(os.path.join(root, file_name))
+					for root, _, file_names in os.walk(entry_dir) for file_name in file_names)
+				shutil.rmtree(entry_dir, ignore_errors=True)
+			freed += size
+			print(f"Removed {entry_dir} ({size / 1e9:.2f} GB).")
+	return freed
+
+
+def main():
+	"""Parse the command line arguments & run the subcommand."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Content-addressed cache of the prepared reference files.")
+	subparsers = parser.add_subparsers(dest="subcommand", required=True)
+	fetch_parser = subparsers.add_parser("fetch", help="link the outputs from the cache, or build & publish them")
+	fetch_parser.add_argument("--cache-dir", default="", help="shared cache directory (default: no cache)")
+	fetch_parser.add_argument("--step", required=True, help="name of the preparation step")
+	fetch_parser.add_argument("--params", default="", help="parameters that change the outputs of the step")
+	fetch_parser.add_argument("--tool-files", nargs="+", default=[],
+		help="scripts run by the step, whose checksums are part of the cache key")
+	fetch_parser.add_argument("--version-command", default="",
+		help="command printing the version of the tool run by the step, e.g. 'bowtie2-build --version'")
+	fetch_parser.add_argument("--inputs", nargs="+", required=True, help="input files of the step")
+	fetch_parser.add_argument("--outputs", nargs="+", required=True, help="output files of the step")
+	fetch_parser.add_argument("command", nargs=argparse.REMAINDER, help="build command, after --")
+	verify_parser = subparsers.add_parser("verify", help="check the cached files against their checksums")
+	verify_parser.add_argument("--cache-dir", required=True, help="shared cache directory")
+	verify_parser.add_argument("--remove", action="store_true", help="remove broken entries")
+	gc_parser = subparsers.add_parser("gc", help="remove entries that have not been used recently")
+	gc_parser.add_argument("--cache-dir", required=True, help="shared cache directory")
+	gc_parser.add_argument("--max-age-days", type=float, default=90,
+		help="remove entries not used for this many days (default: 90)")
+	args = parser.parse_args()
+
+
+	# Part 3: Run the subcommand
+
+	if args.subcommand == "fetch":
+		command = args.command[1:] if args.command[:1] == ["--"] else args.command
+		if not command:
+			parser.error("no build command given")
+		if not args.cache_dir:
+			sys.exit(subprocess.call(command))
+		sys.exit(fetch(args.cache_dir, args.step, args.params, args.inputs, args.outputs, command,
+			args.tool_files, args.version_command))
+	elif args.subcommand == "verify":
+		sys.exit(1 if verify(args.cache_dir, args.remove) else 0)
+	else:
+		freed = collect_garbage(args.cache_dir, args.max_age_days)
+		print(f"Freed {freed / 1e9:.2f} GB.")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,271 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: resource_estimation.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This module predicts the memory, thread & runtime requirements of the SPOT-BGC
+		assembly, Kraken2 & CheckM jobs from the data they will process, so that
+		the Snakefile can request per-job resources instead of the same flat
+		allocation for every job.
+	Per-sample assembly memory is predicted from the number of distinct solid
+		k-mers (depth >= 2) in the BBNorm output k-mer histogram, which tracks the
+		size of the de Bruijn graph MetaSPAdes has to build. Threads & runtime are
+		predicted from the read volume, estimated from the size of the normalized
+		FASTQ files. Samples predicted to exceed the memory maximum or the MetaSPAdes
+		time limit are sent straight to MEGAHIT.
+	Kraken2 memory is predicted from the size of the database (which Kraken2 loads
+		into memory), CheckM runtime from the number of bins, & GECCO/antiSMASH
+		runtime from the size of the bin.
+
+List of functions:
+	timeout_minutes(time_limit): Converts a `timeout` duration (e.g., 6h) to minutes.
+	read_kmer_histogram(hist_file, min_depth): Counts the distinct k-mers at or above
+		min_depth in a BBNorm k-mer histogram.
+	fastq_gigabases(file_paths): Estimates the read volume of FASTQ files in gigabases.
+	estimate_assembly(read_files, hist_file, config, attempt): Predicts the assembler,
+		memory, threads & runtime of a per-sample assembly.
+	estimate_kraken(db_dir, assemblies, config, attempt): Predicts the memory &
+		runtime of a Kraken2 contig classification job.
+	estimate_checkm(bins, config, attempt): Predicts the memory & runtime of a
+		CheckM job.
+	estimate_bgc_prediction(bin_files, tool, config, attempt): Predicts the memory &
+		runtime of a GECCO or antiSMASH run on one bin, or one batch of bins.
+
+List of standard and non-standard modules used:
+	os
+	re
+	math
+	glob
+	yaml (command line use only)
+
+Procedure:
+	1. Loading required modules & defining the prediction constants.
+	2. Measuring the input data (k-mer histograms, read volume, database & bin sizes).
+	3. Turning the measurements into resource requests, capped by the config settings.
+
+Known bugs and limitations:
+	- The prediction constants are rough, conservative fits for MetaSPAdes on
+		normalized gut metagenomes, and may need tuning for other sample types
+		(see assembly_mb_per_million_kmers in the config file).
+	- The read volume is estimated from the uncompressed FASTQ file sizes, so it
+		assumes short read headers; long headers inflate the estimate.
+	- The size of gzip-compressed FASTQ files is scaled by a typical compression
+		ratio, so their read volume is a rougher estimate.
+	- If the k-mer histogram is missing or unreadable, the memory maximum is requested.
+
+Usage
+	From the Snakefile:
+		from resource_estimation import estimate_assembly
+		resources:
+			mem_mb = lambda wildcards, input, attempt:
+				estimate_assembly(input.reads, input.kmer_hist, config, attempt)['mem_mb']
+
+	From the command line, to print the prediction for one sample:
+		python resource_estimation.py kmer_histogram reads_1 [reads_2]
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the prediction constants
+
+# import necessary modules
+import os # allows access to the operating system
+import re # enables parsing of time limits
+import math # enables rounding up of thread counts
+import glob # enables finding the assemblies & bins of aggregate jobs
+
+
+# fraction of the bytes of an uncompressed FASTQ file that are bases
+# (the sequence line, next to the header, '+' & quality lines)
+BASES_PER_BYTE = 0.45
+
+# typical gzip compression ratio of FASTQ files, used to estimate the uncompressed size of .gz reads
+GZIP_FASTQ_RATIO = 4.0
+
+# k-mers below this depth are mostly sequencing errors, which the assemblers discard
+MIN_KMER_DEPTH = 2
+
+# fixed memory overhead of an assembler process, in MB
+ASSEMBLY_BASE_MB = 2000
+
+# read volume (in gigabases) that justifies one additional assembly thread
+GBASES_PER_THREAD = 0.25
+
+# MetaSPAdes runtime, in thread-minutes per gigabase, & its fixed start-up time in minutes
+ASSEMBLY_THREAD_MINUTES_PER_GBASE = 600
+ASSEMBLY_BASE_MINUTES = 30
+
+# MEGAHIT is considerably faster than MetaSPAdes on the same data
+MEGAHIT_RUNTIME_FACTOR = 0.3
+
+# Kraken2 memory overhead on top of the database, in MB, & runtime per GB of contigs
+KRAKEN_BASE_MB = 1000
+KRAKEN_MINUTES_PER_GB = 10
+
+# CheckM lineage_wf memory (pplacer on the full reference tree), in MB, & runtime per bin
+CHECKM_MB = 40000
+CHECKM_MINUTES_PER_BIN = 5
+
+# fixed start-up time of the aggregate Kraken2 & CheckM jobs, in minutes
+AGGREGATE_BASE_MINUTES = 15
+
+# per-bin BGC prediction: memory in MB, start-up time in minutes & runtime per Mb of bin
+BGC_PREDICTION = {
+	"gecco": {"mem_mb": 4000, "base_minutes": 5, "minutes_per_mb": 5},
+	"antismash": {"mem_mb": 8000, "base_minutes": 10, "minutes_per_mb": 30}
+}
+
+# units accepted by `timeout`, in minutes
+TIME_UNITS = {"s": 1 / 60, "m": 1, "h": 60, "d": 1440}
+
+
+def timeout_minutes(time_limit):
+	"""Convert a `timeout` duration (e.g., 6h, 90m or 3600) to minutes."""
+	match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", str(time_limit))
+	if not match:
+		raise ValueError(f"Invalid time limit: {time_limit}")
+	return float(match.group(1)) * TIME_UNITS[match.group(2) or "s"]
+
+
+# Part 2: Measure the input data
+
+def read_kmer_histogram(hist_file, min_depth=MIN_KMER_DEPTH):
+	"""Count the distinct k-mers at or above min_depth in a BBNorm k-mer histogram.
+
+	BBNorm writes the histogram as tab-separated text (#Depth, Raw_Count, Unique_Kmers)
+	regardless of the file extension. Returns None if the histogram cannot be read.
+	"""
+	distinct_kmers = 0
+	try:
+		with open(hist_file, "r") as infile:
+			for line in infile:
+				if line.startswith("#") or not line.strip():
+					continue
+				columns = line.split("\t")
+				if int(columns[0]) >= min_depth:
+					distinct_kmers += int(columns[2])
+	except (OSError, ValueError, IndexError, UnicodeDecodeError):
+		return None
+	return distinct_kmers
+
+
+def fastq_gigabases(file_paths):
+	"""Estimate the read volume of FASTQ files in gigabases (gzip-compressed files are scaled up)."""
+	total_bytes = 0
+	for file_path in file_paths:
+		if os.path.exists(file_path):
+			file_bytes = os.path.getsize(file_path)
+			total_bytes += file_bytes * GZIP_FASTQ_RATIO if file_path.endswith(".gz") else file_bytes
+	return total_bytes * BASES_PER_BYTE / 1e9
+
+
+# Part 3: Turn the measurements into resource requests
+
+def _clamp(value, minimum, maximum):
+	"""Limit value to the range [minimum, maximum]."""
+	return max(minimum, min(value, maximum))
+
+
+def estimate_assembly(read_files, hist_file, config, attempt=1):
+	"""Predict the assembler, memory, threads & runtime of a per-sample assembly.
+
+	Memory is scaled up with each retry (attempt), up to config['memory_maximum'].
+	Returns a dictionary with the keys assembler ('MetaSPAdes' or 'MEGAHIT'), mem_mb,
+	threads & runtime (in minutes).
+	"""
+	if isinstance(read_files, str):
+		read_files = [read_files]
+	memory_maximum = config["memory_maximum"]
+	gigabases = fastq_gigabases(read_files)
+	distinct_kmers = read_kmer_histogram(hist_file) if hist_file else None
+
+	# memory follows the size of the de Bruijn graph
+	if distinct_kmers is None:
+		predicted_mb = memory_maximum
+	else:
+		predicted_mb = ASSEMBLY_BASE_MB + distinct_kmers / 1e6 * config["assembly_mb_per_million_kmers"]
+	mem_mb = int(_clamp(predicted_mb * attempt, config["memory_minimum"], memory_maximum))
+
+	# threads & runtime follow the read volume
+	threads = _clamp(math.ceil(gigabases / GBASES_PER_THREAD), config["threads_minimum"],
+		config["threads_metaspades"])
+	metaspades_minutes = ASSEMBLY_BASE_MINUTES + gigabases * ASSEMBLY_THREAD_MINUTES_PER_GBASE / threads
+
+	# samples that would run out of memory or time with MetaSPAdes go straight to MEGAHIT
+	too_complex = predicted_mb > memory_maximum or \
+		metaspades_minutes > timeout_minutes(config["metaspades_timeout"])
+	if too_complex and config["predict_megahit"]:
+		assembler = "MEGAHIT"
+		runtime = ASSEMBLY_BASE_MINUTES + (metaspades_minutes - ASSEMBLY_BASE_MINUTES) * MEGAHIT_RUNTIME_FACTOR
+	else:
+		assembler = "MetaSPAdes"
+		# leave room for the MEGAHIT fallback after a MetaSPAdes time-out
+		runtime = min(metaspades_minutes, timeout_minutes(config["metaspades_timeout"])) + \
+			(metaspades_minutes - ASSEMBLY_BASE_MINUTES) * MEGAHIT_RUNTIME_FACTOR + ASSEMBLY_BASE_MINUTES
+	return {"assembler": assembler, "mem_mb": mem_mb, "threads": int(threads),
+		"runtime": int(math.ceil(runtime * attempt))}
+
+
+def estimate_kraken(db_dir, assemblies, config, attempt=1):
+	"""Predict the memory & runtime of a Kraken2 contig classification job.
+
+	Kraken2 loads its database (the .k2d files in db_dir) into memory. The runtime
+	follows the total size of the assemblies, which are either a list of assembly
+	files (the input of the job), or a glob pattern matching them.
+	Returns a dictionary with the keys mem_mb & runtime (in minutes).
+	"""
+	db_files = glob.glob(os.path.join(db_dir, "*.k2d"))
+	if db_files:
+		db_mb = sum(os.path.getsize(db_file) for db_file in db_files) / 1e6
+		mem_mb = int(_clamp((KRAKEN_BASE_MB + db_mb) * attempt, config["memory_minimum"],
+			config["memory_maximum"]))
+	else:
+		# the database has not been copied yet, so its size is unknown
+		mem_mb = config["memory_maximum"]
+	assembly_files = glob.glob(assemblies) if isinstance(assemblies, str) else assemblies
+	assembly_gb = sum(os.path.getsize(assembly) for assembly in assembly_files if os.path.exists(assembly)) / 1e9
+	runtime = AGGREGATE_BASE_MINUTES + assembly_gb * KRAKEN_MINUTES_PER_GB
+	return {"mem_mb": mem_mb, "runtime": int(math.ceil(runtime * attempt))}
+
+
+def estimate_checkm(bins, config, attempt=1):
+	"""Predict the memory & runtime of a CheckM job from its number of bins.
+
+	bins is either a list of bin files (one CheckM batch), or a glob pattern matching them.
+	Memory & runtime are scaled up with each retry (attempt), memory up to config['memory_maximum'].
+	Returns a dictionary with the keys mem_mb & runtime (in minutes).
+	"""
+	bin_count = len(glob.glob(bins) if isinstance(bins, str) else bins)
+	mem_mb = int(_clamp(CHECKM_MB * attempt, config["memory_minimum"], config["memory_maximum"]))
+	runtime = AGGREGATE_BASE_MINUTES + bin_count * CHECKM_MINUTES_PER_BIN
+	return {"mem_mb": mem_mb, "runtime": int(math.ceil(runtime * attempt))}
+
+
+def estimate_bgc_prediction(bin_files, tool, config, attempt=1):
+	"""Predict the memory & runtime of a GECCO or antiSMASH (tool) run on one bin, or one batch of bins.
+
+	bin_files is either one bin file, or a list of bin files (one packed batch).
+
+	Returns a dictionary with the keys mem_mb & runtime (in minutes).
+	"""
+	settings = BGC_PREDICTION[tool]
+	bin_files = [bin_files] if isinstance(bin_files, str) else bin_files
+	bin_mb = sum(os.path.getsize(bin_file) for bin_file in bin_files if os.path.exists(bin_file)) / 1e6
+	mem_mb = int(_clamp(settings["mem_mb"] * attempt, config["memory_minimum"], config["memory_maximum"]))
+	runtime = settings["base_minutes"] + bin_mb * settings["minutes_per_mb"]
+	return {"mem_mb": mem_mb, "runtime": int(math.ceil(runtime * attempt))}
+
+
+if __name__ == "__main__":
+	import sys # allows execution of script from command line
+	import yaml # enables reading the config file (installed with Snakemake)
+	config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../config/config.yaml")
+	with open(config_file, "r") as infile:
+		default_config = yaml.safe_load(infile)
+	print(estimate_assembly(sys.argv[2:], sys.argv[1], default_config))
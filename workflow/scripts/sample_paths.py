@@ -0,0 +1,205 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: sample_paths.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program derives the cohort, sample & read IDs of the files of the SPOT-BGC
+		pipeline from their paths, so that the target table scripts, the stage scripts
+		& the Snakefile all derive them the same way.
+	A whole list of paths is parsed in one call with precompiled patterns, and turned
+		into typed records: ReadFile records for raw & pipeline read files, and
+		ResultFile records for per-sample & per-cohort result files (e.g., assemblies).
+		Paths can be excluded with a set of terms, which are combined into a single
+		pattern, so each path is searched once instead of once per term.
+	The stage scripts use the command line interface, which prints one tab-separated
+		line per path, so a loop over the files of a stage needs no dirname, basename
+		or cut subshells per file.
+
+List of functions:
+	exclusion_matcher(terms): Combines a list of exclusion terms into one pattern.
+	exclude_paths(paths, terms): Removes the paths containing any of the exclusion terms.
+	match_paths(pattern, paths, kind): Matches a list of paths against a path pattern.
+	parse_raw_read_paths(paths): Parses RawData-relative raw read file paths.
+	parse_read_paths(paths): Parses the paths of the read files written by the pipeline.
+	parse_result_paths(paths, per_cohort): Parses the paths of per-sample or per-cohort
+		result files.
+	split_cohort_sample(cohort_sample): Splits a Cohort/Sample ID into its two IDs.
+
+List of standard and non-standard modules used:
+	sys
+	re
+	argparse
+	typing
+
+Procedure:
+	1. Loading required modules & compiling the path patterns.
+	2. Assigning command line arguments.
+	3. Parsing the paths & printing one tab-separated record per path.
+
+Known bugs and limitations:
+	- Sample IDs are the start of the file name, up to the first "_" or ".", so
+		sample IDs themselves cannot contain these characters.
+	- Paths that do not match the expected layout raise a ValueError.
+	- The read number of raw read files is taken from a "_1" or "_2" anywhere in the
+		file name, as the RawData file names are not standardized.
+
+Usage
+	./sample_paths.py {raw,reads,sample-results,cohort-results} [--exclude TERMS] [path ...]
+	OR
+	python sample_paths.py {raw,reads,sample-results,cohort-results} [--exclude TERMS] [path ...]
+
+	Where the paths are read from standard input (one per line) if none are given,
+	and TERMS is a comma-separated list of exclusion terms.
+	Each path is printed as a tab-separated line of its record fields, in the order:
+		raw, reads: path, cohort, sample, file_base, read
+		sample-results, cohort-results: path, cohort, sample, file_base
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & compile the path patterns
+
+# import necessary modules
+import sys # allows execution of script from command line
+import re # enables regex handling
+import argparse # enables parsing of command line arguments
+from typing import NamedTuple # enables typed records
+
+
+# raw read files: RawData-relative Cohort/SampleDir/FileName
+# the sample ID & file base are the file name up to the first "_" or "." & the first ".", respectively
+RAW_READ_PATH = re.compile(r"^(?P<cohort>[^/]+)/[^/]+/(?P<name>(?P<file_base>(?P<sample>[^/._]*)[^/.]*)[^/]*)$")
+
+# read files written by the pipeline: .../Cohort/FileBase.fq(.gz), e.g. C1/S1_norm.1.fq.gz,
+# where the file base ends with the read number (1, 2 or SE)
+PIPELINE_READ_PATH = re.compile(r"(?:^|/)(?P<cohort>[^/]+)/(?P<file_base>(?P<sample>[^/._]+)[^/]*?"
+	r"(?:\.(?P<read>1|2|SE))?)\.(?:fq|fastq)(?:\.gz)?$")
+
+# per-sample result files: .../Cohort/Sample/FileBase.ext, e.g. C1/S1/S1_scaffolds_filtered.fasta
+SAMPLE_RESULT_PATH = re.compile(r"(?:^|/)(?P<cohort>[^/]+)/[^/]+/(?P<file_base>(?P<sample>[^/._]+)[^/]*?)(?:\.[^/.]*)?$")
+
+# per-cohort result files: .../Cohort/FileBase.ext, e.g. C1/C1_final.contigs_filtered.fa
+COHORT_RESULT_PATH = re.compile(r"(?:^|/)(?P<cohort>[^/]+)/(?P<file_base>[^/]+?)(?:\.[^/.]*)?$")
+
+
+class ReadFile(NamedTuple):
+	"""A read file, with the IDs derived from its path."""
+	path: str
+	cohort: str
+	sample: str
+	file_base: str
+	# "1" or "2" for the forward & reverse reads of PE samples, "SE" for SE samples
+	read: str
+
+
+class ResultFile(NamedTuple):
+	"""A per-sample or per-cohort result file, with the IDs derived from its path."""
+	path: str
+	cohort: str
+	# the cohort ID for per-cohort result files
+	sample: str
+	file_base: str
+
+
+def exclusion_matcher(terms):
+	"""Combine a list of exclusion terms into one compiled pattern, or None if there are no terms."""
+	terms = [term for term in terms if term]
+	if not terms:
+		return None
+	# longer terms first, so a term is never shadowed by one of its own prefixes
+	return re.compile("|".join(re.escape(term) for term in sorted(set(terms), key=len, reverse=True)))
+
+
+def exclude_paths(paths, terms):
+	"""Remove the paths that contain any of the exclusion terms."""
+	matcher = exclusion_matcher(terms)
+	if matcher is None:
+		return list(paths)
+	return [path for path in paths if not matcher.search(path)]
+
+
+def match_paths(pattern, paths, kind):
+	"""Match every path against a pattern, raising a ValueError for the first path that does not fit."""
+	matches = []
+	for path in paths:
+		match = pattern.search(path)
+		if match is None:
+			raise ValueError(f"Not a valid {kind} path: {path}")
+		matches.append(match)
+	return matches
+
+
+def parse_raw_read_paths(paths):
+	"""Parse RawData-relative raw read file paths (Cohort/SampleDir/FileName) into ReadFile records."""
+	records = []
+	for match in match_paths(RAW_READ_PATH, paths, "raw read file"):
+		name = match.group("name")
+		if "_1" in name:
+			# forward PE reads
+			read = "1"
+		elif "_2" in name:
+			# reverse PE reads
+			read = "2"
+		else:
+			# SE reads
+			read = "SE"
+		records.append(ReadFile(match.string, match.group("cohort"), match.group("sample"),
+			match.group("file_base"), read))
+	return records
+
+
+def parse_read_paths(paths):
+	"""Parse the paths of read files written by the pipeline (.../Cohort/FileBase.fq) into ReadFile records."""
+	return [ReadFile(match.string, match.group("cohort"), match.group("sample"), match.group("file_base"),
+		match.group("read") or "SE") for match in match_paths(PIPELINE_READ_PATH, paths, "read file")]
+
+
+def parse_result_paths(paths, per_cohort=False):
+	"""Parse the paths of per-sample (.../Cohort/Sample/File) or per-cohort (.../Cohort/File) result files."""
+	if per_cohort:
+		return [ResultFile(match.string, match.group("cohort"), match.group("cohort"), match.group("file_base"))
+			for match in match_paths(COHORT_RESULT_PATH, paths, "per-cohort result file")]
+	return [ResultFile(match.string, match.group("cohort"), match.group("sample"), match.group("file_base"))
+		for match in match_paths(SAMPLE_RESULT_PATH, paths, "per-sample result file")]
+
+
+def split_cohort_sample(cohort_sample):
+	"""Split a Cohort/Sample ID into the cohort & sample IDs."""
+	cohort_id, _, sample_id = cohort_sample.partition("/")
+	return cohort_id, sample_id
+
+
+def main():
+	"""Parse the command line arguments & print one tab-separated record per path."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Derive the cohort, sample & read IDs of SPOT-BGC file paths.")
+	parser.add_argument("kind", choices=["raw", "reads", "sample-results", "cohort-results"],
+		help="layout of the paths")
+	parser.add_argument("--exclude", default="", help="comma-separated terms; paths containing any are skipped")
+	parser.add_argument("paths", nargs="*", help="paths to parse (default: read from standard input)")
+	args = parser.parse_args()
+
+
+	# Part 3: Parse the paths & print the records
+
+	paths = args.paths if args.paths else [line.strip() for line in sys.stdin if line.strip()]
+	paths = exclude_paths(paths, args.exclude.split(","))
+	if args.kind == "raw":
+		records = parse_raw_read_paths(paths)
+	elif args.kind == "reads":
+		records = parse_read_paths(paths)
+	else:
+		records = parse_result_paths(paths, per_cohort=(args.kind == "cohort-results"))
+	sys.stdout.writelines("\t".join(record) + "\n" for record in records)
+
+
+if __name__ == "__main__":
+	main()
@@ -9,35 +9,39 @@
 # This script will perform the 100k reads filtration of normalized samples
 # as part of the SPOT-BGC pipeline. 
 # 
+# Reads are counted with count_fastq_reads.py, which stops counting once the
+# threshold is reached, handles both mates of PE samples together, and hard-links
+# passing files into 100k_Filt/ instead of copying them, removing the links left 
+# over from earlier runs of samples that no longer pass. 
+# The read counts of the read quality checks of the normalized reads
+# (results/QualityChecks/Metagenome_Norm/) are used where present. 
+# The per-sample read counts are written to 
+# results/DataNonHuman/100k_Filt/100k_read_counts.tsv
+# 
 # Usage: 
-# 	./snakemake_100k_filt.sh
+# 	./snakemake_100k_filt.sh threads min_reads
 # 	OR
-# 	bash snakemake_100k_filt.sh
+# 	bash snakemake_100k_filt.sh threads min_reads
 # 
 # 	Note that this script is intended to be run from the parent SPOT-BGC/ directory!
 # 
 ###
 
 
-# run the filtration in a loop
-ls results/DataNonHuman/BBNorm_Reads/*/*.fq | while read file; do 
-	parentname="$(basename "$(dirname "$file")")";
-	# ref: https://superuser.com/questions/538877/get-the-parent-directory-for-a-file
-	# ref: https://stackoverflow.com/questions/10992814/passing-grep-into-a-variable-in-bash
-	# and check that it's >= 100k
-	# ref: https://askubuntu.com/questions/1042659/how-to-check-if-a-value-is-greater-than-or-equal-to-another
-	# ref: https://stackoverflow.com/questions/20360151/using-if-within-a-while-loop-in-bash
-	# ref: https://askubuntu.com/questions/1096849/cant-make-new-dir-with-mkdir
-	mkdir -p results/DataNonHuman/100k_Filt/${parentname};
-	read_count=$(grep -c "@" $file); 
-	if [[ $read_count -ge 100000 ]]; then 
-		cp $file results/DataNonHuman/100k_Filt/${parentname}; 
-		echo $file >> logs/100k_filt.txt;
-	fi; 
-done;
+# take thread count & read threshold as positional arguments
+# ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
+thread_count=${1:-1};
+min_reads=${2:-100000};
+
+
+# run the filtration on all normalized samples in parallel
+python workflow/scripts/count_fastq_reads.py --jobs $thread_count --min-reads $min_reads \
+--input-dir results/DataNonHuman/BBNorm_Reads --output-dir results/DataNonHuman/100k_Filt \
+--table results/DataNonHuman/100k_Filt/100k_read_counts.tsv --log logs/100k_filt.txt \
+--qc-dir results/QualityChecks/Metagenome_Norm || exit $?;
 
-# for the toy dataset testing, used: 
-# if [[ $read_count -ge 1 ]]; then
+# for the toy dataset testing, use: 
+# bash workflow/scripts/snakemake_100k_filt.sh 1 1
 
 
 # after completion of the above, need to generate a new target DB
@@ -45,15 +49,16 @@ done;
 
 # new full file path file
 cd results/DataNonHuman/100k_Filt/;
-ls */*.fq > FullFileNamesTrimmed.txt;
+# (the reads are gzip-compressed in the compressed preprocessing mode)
+ls */*.fq */*.fq.gz 2>/dev/null > FullFileNamesTrimmed.txt;
 # get the file paths in a file
 # and parse them with the python script
 python ../../../workflow/scripts/create_target_db.py ../../../resources/SPOT-BGC__sample-target_info_100k.txt \
-FullFileNamesTrimmed.txt noexclusion,noneexcluded;
+FullFileNamesTrimmed.txt noexclusion,noneexcluded || exit $?;
 
 
 # navigate back up to the main directory
 cd ../../..;
 # create an output file that marks script completion
-mkdir logs/completion;
+mkdir -p logs/completion;
 touch logs/completion/100k_filt__COMPLETE.txt;
@@ -2,44 +2,44 @@
 
 ###
 # 
-# Title: snakemake_antismash_cohort.sh
-# Date: 2024.11.10
+# Title: snakemake_antismash_bin.sh
+# Date: 2026.10.17
 # Author: Vi Varga
 #
 # Description: 
-# This script will run AntiSMASH on the non-human per-cohort assemblies in order to 
-# predict biosynthetic gene clusters. 
+# This script will run AntiSMASH on one MAG (bin) of the non-human per-sample or per-cohort 
+# assemblies in order to predict biosynthetic gene clusters. 
+# It is run once per bin by the antismash_perSample_bin & antismash_perCohort_bin rules, so 
+# that the bins can be processed in parallel across the cluster. 
 # 
 # Usage: 
-# 	./snakemake_antismash_cohort.sh threads
+# 	./snakemake_antismash_bin.sh threads bin_file out_dir
 # 	OR
-# 	bash snakemake_antismash_cohort.sh threads
+# 	bash snakemake_antismash_bin.sh threads bin_file out_dir
 # 
-# 	Note that this script is intended to be run from the parent SPOT-BGC-working/ directory!
+# 	Note that this script is intended to be run from the parent SPOT-BGC/ directory!
 #
 ###
 
 
-# take thread count as positional argument
+# take thread count, the bin & the output directory as positional arguments
 # ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
 thread_count=$1;
+bin_file=$2;
+out_dir=$3;
+# record the runtime, memory & I/O of each tool run (see instrument.py)
+instrument="python workflow/scripts/instrument.py";
 
 
 ### Running AntiSMASH
-# run these in a while loop
-ls results/MAGs/PerCohort/*/*_minContig1500.*.fa | while read file; do
-	# first designate variables & directories
-	parentname="$(basename "$(dirname "$file")")"; # this gets the parent/cohort directory name
-	full_file="${file##*/}"; #this line removes the path before the file name
-	file_base="${full_file%.*}"; #this line removes the file extension .fa
-	file_base2="${file_base//./_}"; # replace periods with underscores
-	mkdir -p results/BGCs/AntiSMASH/PerCohort/${parentname}/${file_base2}; #create an output directory
-	# now run AntiSMASH
-	apptainer exec workflow/containers/env-antismash.sif antismash --taxon bacteria --cpus $thread_count \
-	--minlength 30 --no-abort-on-invalid-records --genefinding-tool prodigal-m \
-	--output-dir results/BGCs/AntiSMASH/PerCohort/${parentname}/${file_base2} \
-	--fullhmmer --pfam2go $file;
-done;
+# AntiSMASH will not write into an output directory left over by an earlier, failed run
+rm -rf ${out_dir};
+mkdir -p ${out_dir}; #create an output directory
+$instrument --stage antismash_bin --sample "$(basename "$bin_file" .fa)" --inputs $bin_file -- \
+apptainer exec workflow/containers/env-antismash.sif antismash --taxon bacteria --cpus $thread_count \
+--minlength 30 --no-abort-on-invalid-records --genefinding-tool prodigal-m \
+--output-dir ${out_dir} \
+--fullhmmer --pfam2go $bin_file;
 
 
 # Refs: 
@@ -0,0 +1,86 @@
+#!/bin/bash
+
+###
+#
+# Title: snakemake_bgc_batch.sh
+# Date: 2026.10.17
+# Author: Vi Varga
+#
+# Description:
+# This script will run GECCO or AntiSMASH once on a batch of MAGs (bins) of the non-human
+# per-sample or per-cohort assemblies in order to predict biosynthetic gene clusters.
+# It is run once per batch by the gecco_*_batch & antismash_*_batch rules, which are used
+# instead of the per-bin rules if bgc_batch_mb is set in the config file.
+#
+# The bins are packed into one FASTA file by bgc_batch.py, with the contig IDs prefixed by
+# the ID of their bin, so the container is started & the databases (or GECCO model) are
+# loaded once per batch. The results are then split back out into the same per-bin result
+# files as those of the per-bin runs, which are listed in {batch_dir}_results.txt.
+#
+# Usage:
+# 	./snakemake_bgc_batch.sh tool threads batch_dir mag_root result_root bin [bin ...]
+# 	OR
+# 	bash snakemake_bgc_batch.sh tool threads batch_dir mag_root result_root bin [bin ...]
+#
+# 	Where tool is gecco or antismash, batch_dir is a temporary directory for the batch
+# 	(e.g., results/BGCs/GECCO/PerSample/batches/C1.1), mag_root is the MAG directory of the
+# 	bins (e.g., results/MAGs/PerSample), and result_root is the directory of the per-bin
+# 	results (e.g., results/BGCs/GECCO/PerSample).
+#
+# 	Note that this script is intended to be run from the parent SPOT-BGC/ directory!
+#
+###
+
+
+# take the tool, thread count, batch directory, MAG & result directories & the bins as positional arguments
+# ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
+tool=$1;
+thread_count=$2;
+batch_dir=$3;
+mag_root=$4;
+result_root=$5;
+shift 5;
+
+# the batch files go in a temporary directory, named after the batch
+batch_id=${batch_dir##*/};
+merged_fasta=${batch_dir}/${batch_id}.fasta;
+# record the runtime, memory & I/O of each tool run (see instrument.py)
+instrument="python workflow/scripts/instrument.py";
+
+
+### Packing the bins
+# a tool run left over by an earlier, failed run of the batch is removed
+rm -rf ${batch_dir};
+mkdir -p ${batch_dir};
+python workflow/scripts/bgc_batch.py merge --tool $tool --mag-root $mag_root --result-root $result_root \
+${batch_dir}/manifest.tsv $merged_fasta "$@" || exit $?;
+
+
+### Running GECCO or AntiSMASH on the batch
+if [[ "$tool" == "gecco" ]]; then
+	$instrument --stage gecco_batch --sample ${batch_id} --inputs $merged_fasta -- \
+	apptainer exec workflow/containers/env-gecco.sif gecco run --genome $merged_fasta \
+	-o ${batch_dir}/results --jobs $thread_count -m 0.3 || exit $?;
+else
+	# the bin IDs make the record IDs longer than the 16 characters AntiSMASH allows by default
+	$instrument --stage antismash_batch --sample ${batch_id} --inputs $merged_fasta -- \
+	apptainer exec workflow/containers/env-antismash.sif antismash --taxon bacteria --cpus $thread_count \
+	--minlength 30 --no-abort-on-invalid-records --genefinding-tool prodigal-m --allow-long-headers \
+	--output-dir ${batch_dir}/results \
+	--fullhmmer --pfam2go $merged_fasta || exit $?;
+fi;
+
+
+### Splitting the results per bin
+python workflow/scripts/bgc_batch.py split --tool $tool ${batch_dir}/manifest.tsv $merged_fasta \
+${batch_dir}/results ${batch_dir}_results.txt || exit $?;
+
+# remove the batch files
+rm -r ${batch_dir};
+
+
+# Refs:
+# GECCO GitHub with manual: https://github.com/zellerlab/GECCO
+# AntiSMASH command line usage: https://docs.antismash.secondarymetabolites.org/command_line/
+# --allow-long-headers  Prevents long headers from being renamed (default: False).
+# (see snakemake_gecco_bin.sh & snakemake_antismash_bin.sh for the other arguments)
@@ -0,0 +1,119 @@
+#!/bin/bash
+
+###
+#
+# Title: snakemake_checkm_batch.sh
+# Date: 2026.10.17
+# Author: Vi Varga
+#
+# Description:
+# This script will run CheckM on one batch of the non-human per-sample or per-cohort
+# assembled MAGs, in order to perform quality assessment (lineage_wf) or taxonomic
+# profiling (taxonomy_wf) of the MAGs.
+#
+# The bins of the batch (by default, all bins of one cohort) are symlinked into one
+# directory by checkm_batch.py, so that CheckM loads its reference tree & marker sets
+# once for the whole batch instead of once per sample. The combined CheckM table is
+# then split back out by checkm_batch.py into one result file per sample (or cohort):
+# 	lineage: {result_root}/.../{id}/{id}_CheckM_results.txt
+# 	taxonomy: {result_root}/.../{id}/{id}_CheckM_taxonomy.txt
+#
+# CheckM is only run on the bins of the samples (or cohorts) that are new or changed
+# since their last CheckM run (see incremental.py). The combined table of the batch
+# is then collected from the result files of all samples (or cohorts) of the batch.
+#
+# Usage:
+# 	./snakemake_checkm_batch.sh lineage|taxonomy threads batch_dir mag_root result_root bin [bin ...]
+# 	OR
+# 	bash snakemake_checkm_batch.sh lineage|taxonomy threads batch_dir mag_root result_root bin [bin ...]
+#
+# 	Where batch_dir is the CheckM output directory of the batch; the combined table is
+# 	written to ${batch_dir}_CheckM_results.txt (or ${batch_dir}_CheckM_taxonomy.txt).
+#
+# 	Note that this script is intended to be run from the parent SPOT-BGC/ directory!
+#
+###
+
+
+# take the CheckM workflow, thread count, directories & the bins of the batch as positional arguments
+# ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
+checkm_step=$1;
+thread_count=$2;
+batch_dir=$3;
+mag_root=$4;
+result_root=$5;
+shift 5;
+
+if [ "$checkm_step" == "lineage" ]; then
+	suffix=_CheckM_results.txt;
+else
+	suffix=_CheckM_taxonomy.txt;
+fi;
+staging_dir=${batch_dir}_bins;
+# the manifests of the samples (or cohorts) are kept per step & layout, e.g. checkm_lineage_perSample
+layout=${mag_root##*/};
+stage=checkm_${checkm_step}_per${layout#Per};
+pending_list=${batch_dir}_pending.txt;
+# record the runtime, memory & I/O of each tool run (see instrument.py)
+instrument="python workflow/scripts/instrument.py";
+
+# CheckM expects a fresh output directory
+rm -rf ${batch_dir} ${staging_dir};
+mkdir -p "$(dirname "$batch_dir")";
+
+
+### Listing the bins of new or changed samples (or cohorts)
+python workflow/scripts/incremental.py pending --stage ${stage} "$@" > ${pending_list} || exit $?;
+mapfile -t pending_bins < ${pending_list};
+
+
+if [ ${#pending_bins[@]} -gt 0 ]; then
+	### Staging the bins of the batch
+	python workflow/scripts/checkm_batch.py stage ${staging_dir} "${pending_bins[@]}" || exit $?;
+
+
+	### Running CheckM
+	if [ "$checkm_step" == "lineage" ]; then
+		$instrument --stage checkm_lineage --sample "$(basename "$batch_dir")" --inputs "${pending_bins[@]}" -- \
+		apptainer exec workflow/containers/mag_assembly_qc.sif checkm lineage_wf --nt \
+		-f ${batch_dir}_run${suffix} --tab_table -x fa -t $thread_count \
+		${staging_dir} ${batch_dir} || exit $?;
+	else
+		$instrument --stage checkm_taxonomy --sample "$(basename "$batch_dir")" --inputs "${pending_bins[@]}" -- \
+		apptainer exec workflow/containers/mag_assembly_qc.sif checkm taxonomy_wf \
+		-f ${batch_dir}_run${suffix} --tab_table -x fa -t $thread_count \
+		domain Bacteria ${staging_dir} ${batch_dir} || exit $?;
+	fi;
+
+
+	### Splitting the results per sample (or cohort)
+	python workflow/scripts/checkm_batch.py split --mag-root ${mag_root} --result-root ${result_root} \
+	--suffix ${suffix} ${batch_dir}_run${suffix} "${pending_bins[@]}" || exit $?;
+	# record the checked samples (or cohorts), so they are skipped by the next run
+	python workflow/scripts/incremental.py record --stage ${stage} --file-list ${pending_list} || exit $?;
+
+	# remove the symlinks & the table of this run
+	rm -r ${staging_dir} ${batch_dir}_run${suffix};
+fi;
+rm ${pending_list};
+
+
+### Collecting the results of all samples (or cohorts) of the batch
+python workflow/scripts/checkm_batch.py collect --mag-root ${mag_root} --result-root ${result_root} \
+--suffix ${suffix} ${batch_dir}${suffix} "$@" || exit $?;
+
+
+# Refs:
+# CheckM workflows: https://github.com/Ecogenomics/CheckM/wiki/Workflows
+# checkm lineage_wf <bin folder> <output folder>
+# lineage_wf   -> Runs tree, lineage_set, analyze, qa
+# checkm taxonomy_wf <rank> <taxon> <bin folder> <output folder>
+# taxonomy_wf   -> Generate taxonomic-specific marker set
+# --nt generate nucleotide gene sequences for each bin
+# -f, --file FILE print results to file (default: stdout)
+# --tab_table print tab-separated values table
+# -x, --extension EXTENSION extension of bins (other files in directory are ignored) (default: fna)
+# -t, --threads THREADS number of threads (default: 1)
+# bin_input directory containing bins (fasta format) or path to file describing genomes/genes -
+# tab separated in 2 or 3 columns [genome ID, genome fna, genome translation file (pep)]
+# output_dir directory to write output files
@@ -0,0 +1,59 @@
+#!/bin/bash
+
+###
+#
+# Title: snakemake_disk_usage.sh
+# Date: 2026.10.17
+# Author: Vi Varga
+#
+# Description:
+# This script records the disk usage of the read preprocessing directories of the
+# SPOT-BGC pipeline (trimming, human read filtration, normalization & 100k filtration)
+# at the end of a preprocessing job.
+#
+# Every job writes its own sample to logs/DiskUsage/{label}.tsv, as:
+# 	seconds since epoch	label	directory	size in KB
+# so jobs running in parallel (or on different nodes) never write to the same file.
+# The samples of all jobs are combined into the largest end-of-job disk usage per stage by
+# disk_usage_report.py.
+#
+# Usage:
+# 	./snakemake_disk_usage.sh label
+# 	OR
+# 	bash snakemake_disk_usage.sh label
+#
+# 	Where label names the job, e.g. map_reads_pe.C1/S1 ('/' is replaced by '_').
+#
+# 	Note that this script is intended to be run from the parent SPOT-BGC/ directory!
+#
+###
+
+
+# take the job label as positional argument
+# ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
+label=${1//\//_};
+sample_time=$(date +%s);
+
+
+### Measuring the preprocessing directories
+mkdir -p logs/DiskUsage;
+# directories that do not exist (yet) are skipped
+stage_dirs=();
+for stage_dir in results/Trimmomatic results/DataNonHuman/NonHumanOG \
+results/DataNonHuman/BBNorm_Reads results/DataNonHuman/100k_Filt; do
+	if [ -d "$stage_dir" ]; then
+		stage_dirs+=("$stage_dir");
+	fi;
+done;
+# one du call for all directories, so the normalized reads hard-linked into 100k_Filt/ are only counted once
+if [ ${#stage_dirs[@]} -gt 0 ]; then
+	du -sk "${stage_dirs[@]}" | while read -r size_kb stage_dir; do
+		printf '%s\t%s\t%s\t%s\n' "$sample_time" "$label" "$stage_dir" "$size_kb";
+	done > logs/DiskUsage/${label}.tsv;
+fi;
+
+
+# Refs:
+# du -s, --summarize display only a total for each argument
+# du -k like --block-size=1K
+# hard-linked files are only counted once within one du call (in the first directory listed)
@@ -0,0 +1,50 @@
+#!/bin/bash
+
+###
+# 
+# Title: snakemake_gecco_bin.sh
+# Date: 2026.10.17
+# Author: Vi Varga
+#
+# Description: 
+# This script will run GECCO on one MAG (bin) of the non-human per-sample or per-cohort 
+# assemblies in order to predict biosynthetic gene clusters. 
+# It is run once per bin by the gecco_perSample_bin & gecco_perCohort_bin rules, so that
+# the bins can be processed in parallel across the cluster. 
+# GECCO names its output files after the bin, so several bins can share an output directory. 
+# 
+# Usage: 
+# 	./snakemake_gecco_bin.sh threads bin_file out_dir
+# 	OR
+# 	bash snakemake_gecco_bin.sh threads bin_file out_dir
+# 
+# 	Note that this script is intended to be run from the parent SPOT-BGC/ directory!
+#
+###
+
+
+# take thread count, the bin & the output directory as positional arguments
+# ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
+thread_count=$1;
+bin_file=$2;
+out_dir=$3;
+# record the runtime, memory & I/O of each tool run (see instrument.py)
+instrument="python workflow/scripts/instrument.py";
+
+
+### Running GECCO
+mkdir -p ${out_dir}; #create an output directory
+$instrument --stage gecco_bin --sample "$(basename "$bin_file" .fa)" --inputs $bin_file -- \
+apptainer exec workflow/containers/env-gecco.sif gecco run --genome $bin_file \
+-o ${out_dir} --jobs $thread_count -m 0.3;
+
+
+# Refs: 
+# GECCO GitHub with manual: https://github.com/zellerlab/GECCO
+# Usage: 
+# gecco run --genome some_genome.fna -o some_output_dir
+# --jobs, which controls the number of threads that will be spawned by GECCO whenever a step can be parallelized. 
+# The default, 0, will autodetect the number of CPUs on the machine using os.cpu_count.
+# -p <p>, --p-filter <p> the p-value cutoff for protein domains to be included. [default: 1e-9]
+# -m <m>, --threshold <m> the probability threshold for cluster detection. Default depends on the
+# post-processing method (0.8 for gecco, 0.6 for antismash).
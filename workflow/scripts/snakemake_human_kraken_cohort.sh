@@ -8,11 +8,22 @@
 # Description: 
 # This script will run Kraken2 on the per-cohort assemblies in order to remove
 # human contigs as part of the SPOT-BGC  Snakemake pipeline.
+# The assemblies are the *_final.contigs_filtered.fa files written by filter_contigs.py,
+# from which contigs too short for binning have already been removed.
+# 
+# The assemblies are classified in one batch: kraken_batch.py merges them into one
+# FASTA file with labelled contig IDs, Kraken2 is run once on the merged file with
+# the memory-mapped human database, and kraken_batch.py splits the results back 
+# out per cohort, including a Kraken2 report per assembly, which is rebuilt from the 
+# report of the batch. 
+# The database is read from $STAGED_REFERENCE if set (see stage_reference.py). 
+# Only the assemblies that are new or changed since they were last classified are 
+# classified (see incremental.py). 
 # 
 # Usage: 
-# 	./snakemake_human_kraken_cohort.sh threads log_file
+# 	./snakemake_human_kraken_cohort.sh threads
 # 	OR
-# 	bash snakemake_human_kraken_cohort.sh threads log_file
+# 	bash snakemake_human_kraken_cohort.sh threads
 # 
 # 	Note that this script is intended to be run from the parent SPOT-BGC-working/ directory!
 #
@@ -23,24 +34,52 @@
 # ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
 thread_count=$1;
 
+# the batch files go in a temporary directory
+batch_dir=results/AssemblyNonHuman/PerCohort/kraken2_batch;
+mkdir -p ${batch_dir};
 
-### Running Kraken2
-# run these in a while loop
-ls results/Assembly/PerCohort/*/*_final.contigs.fa | while read file; do
-	# first designate variables & directories
-	parentname="$(basename "$(dirname "$file")")"; # this gets the parent/cohort directory name
-	full_file="${file##*/}"; #this line removes the path before the file name
-	file_base="${full_file%.*}"; #this line removes the file extension .fa
-	file_base_id="${file_base%_final.contigs}"; #this removes the "_final.contigs" substring
+# the human database, or its node-local copy when run through stage_reference.py
+kraken_db=${STAGED_REFERENCE:-resources/kraken2_human_db};
+# record the runtime, memory & I/O of each tool run (see instrument.py)
+instrument="python workflow/scripts/instrument.py";
+# a failure in any step of the pipelines below fails the script
+set -o pipefail;
+
+
+### Creating the batch manifest
+# one line per assembly: label, assembly file, output prefix
+# the new or changed assemblies are listed by incremental.py,
+# & their cohort IDs are derived in one pass by sample_paths.py
+python workflow/scripts/incremental.py pending --stage kraken_perCohort | \
+python workflow/scripts/sample_paths.py cohort-results | \
+while IFS=$'\t' read -r file parentname file_base_id file_base; do
+	# parentname is the parent/cohort directory name, & file_base_id the cohort ID of the assembly
 	mkdir -p results/AssemblyNonHuman/PerCohort/${parentname}; #create an output directory
-	# now run Kraken2
+	printf "%s\t%s\t%s\n" "${parentname}__${file_base_id}" "$file" \
+	"results/AssemblyNonHuman/PerCohort/${parentname}/${file_base_id}";
+done > ${batch_dir}/manifest.tsv || exit $?;
+
+
+### Running Kraken2
+# merge the assemblies, classify them in one Kraken2 run & split the results per cohort
+# (skipped if all assemblies are unchanged)
+if [[ -s ${batch_dir}/manifest.tsv ]]; then
+	python workflow/scripts/kraken_batch.py merge ${batch_dir}/manifest.tsv ${batch_dir}/merged.fasta || exit $?;
+	$instrument --stage kraken_perCohort --sample PerCohort --inputs ${batch_dir}/merged.fasta -- \
 	apptainer exec workflow/containers/env-kraken2db.sif kraken2 \
-	--db resources/kraken2_human_db/ --threads $thread_count \
-	--output results/AssemblyNonHuman/PerCohort/${parentname}/${file_base_id}__kraken2_out.txt \
-    --report results/AssemblyNonHuman/PerCohort/${parentname}/${file_base_id}__kraken2_report.txt \
-	--unclassified-out results/AssemblyNonHuman/PerCohort/${parentname}/${file_base_id}_final.contigs_nonHuman.fasta \
-    $file;
-done;
+	--db ${kraken_db} --memory-mapping --threads $thread_count \
+	--output ${batch_dir}/merged__kraken2_out.txt \
+	--report ${batch_dir}/merged__kraken2_report.txt \
+	--unclassified-out ${batch_dir}/merged_nonHuman.fasta \
+	${batch_dir}/merged.fasta || exit $?;
+	python workflow/scripts/kraken_batch.py split --report ${batch_dir}/merged__kraken2_report.txt ${batch_dir}/manifest.tsv \
+	${batch_dir}/merged__kraken2_out.txt ${batch_dir}/merged_nonHuman.fasta || exit $?;
+	# record the classified assemblies so they are skipped by the next run
+	python workflow/scripts/incremental.py record --stage kraken_perCohort $(cut -f2 ${batch_dir}/manifest.tsv) || exit $?;
+fi;
+
+# remove the merged batch files
+rm -r ${batch_dir};
 
 
 # create a file indicating program completion
@@ -52,6 +91,7 @@ touch logs/completion/Kraken_perCohort__COMPLETE.txt
 # Kraken2 arguments: https://software.cqls.oregonstate.edu/updates/docs/kraken2/MANUAL.html
 # --db NAME Name for Kraken 2 DB
 # --threads NUM Number of threads (default: 1)
+# --memory-mapping Avoids loading database into RAM
 # --output FILENAME Print output to filename (default: stdout); "-" will suppress normal output
 # --report FILENAME Print a report with aggregrate counts/clade to file
-# --unclassified-out FILENAME Print unclassified sequences to filename
\ No newline at end of file
+# --unclassified-out FILENAME Print unclassified sequences to filename
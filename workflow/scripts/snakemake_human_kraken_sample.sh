@@ -6,47 +6,90 @@
 # Author: Vi Varga
 #
 # Description: 
-# This script will run Kraken2 on the per-sample assemblies in order to remove
-# human contigs as part of the SPOT-BGC  Snakemake pipeline.
+# This script will run Kraken2 on the per-sample assemblies of one cohort in order 
+# to remove human contigs as part of the SPOT-BGC  Snakemake pipeline.
+# The assemblies are the *_scaffolds_filtered.fasta files written by filter_contigs.py,
+# from which contigs too short for binning have already been removed.
+# 
+# The assemblies are classified in one batch: kraken_batch.py merges them into one
+# FASTA file with labelled contig IDs, Kraken2 is run once on the merged file with
+# the memory-mapped human database, and kraken_batch.py splits the results back 
+# out per sample, including a Kraken2 report per assembly, which is rebuilt from the 
+# report of the batch. 
+# The database is read from $STAGED_REFERENCE if set (see stage_reference.py). 
+# Only the assemblies that are new or changed since they were last classified are 
+# classified (see incremental.py). 
 # 
 # Usage: 
-# 	./snakemake_human_kraken_sample.sh threads log_file
+# 	./snakemake_human_kraken_sample.sh threads cohort_id assembly [assembly ...]
 # 	OR
-# 	bash snakemake_human_kraken_sample.sh threads log_file
+# 	bash snakemake_human_kraken_sample.sh threads cohort_id assembly [assembly ...]
 # 
 # 	Note that this script is intended to be run from the parent SPOT-BGC/ directory!
 #
 ###
 
 
-# take thread count as positional argument
+# take thread count, cohort ID & the cohort's assemblies as positional arguments
 # ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
 thread_count=$1;
+cohort_id=$2;
+shift 2;
+# without assemblies, incremental.py would list the assemblies of all cohorts
+if [[ $# -eq 0 ]]; then
+	echo "No assemblies given for cohort ${cohort_id}" >&2;
+	exit 1;
+fi;
+
+# the batch files of the cohort go in a temporary directory
+batch_dir=results/AssemblyNonHuman/PerSample/${cohort_id}/kraken2_batch;
+mkdir -p ${batch_dir};
+
+# the human database, or its node-local copy when run through stage_reference.py
+kraken_db=${STAGED_REFERENCE:-resources/kraken2_human_db};
+# record the runtime, memory & I/O of each tool run (see instrument.py)
+instrument="python workflow/scripts/instrument.py";
+# a failure in any step of the pipelines below fails the script
+set -o pipefail;
+
+
+### Creating the batch manifest
+# one line per assembly: label, assembly file, output prefix
+# the new or changed assemblies are listed by incremental.py,
+# & their sample IDs are derived in one pass by sample_paths.py
+python workflow/scripts/incremental.py pending --stage kraken_perSample "$@" | \
+python workflow/scripts/sample_paths.py sample-results | \
+while IFS=$'\t' read -r file file_cohort_id file_base_id file_base; do
+	# file_base_id is the sample ID
+	mkdir -p results/AssemblyNonHuman/PerSample/${cohort_id}/${file_base_id}; #create an output directory
+	printf "%s\t%s\t%s\n" "$file_base_id" "$file" \
+	"results/AssemblyNonHuman/PerSample/${cohort_id}/${file_base_id}/${file_base_id}";
+done > ${batch_dir}/manifest.tsv || exit $?;
+
+# nothing to do if all assemblies of the cohort are unchanged
+if [[ ! -s ${batch_dir}/manifest.tsv ]]; then
+	rm -r ${batch_dir};
+	exit 0;
+fi;
 
 
 ### Running Kraken2
-# run these in a while loop
-ls results/Assembly/PerSample/*/*/*_*.fasta | while read file; do
-	# first designate variables & directories
-	parentname="$(dirname "$(dirname "$file")")"; 
-	#grandparent_dir="$(cut -d"/" -f3)"; # this gets the grandparent/cohort directory name
-	grandparent_dir="${parentname##*/}"
-	full_file="${file##*/}"; #this line removes the path before the file name
-	file_base="${full_file%.*}"; #this line removes the file extension .fasta
-	file_base_id="${file_base%_scaffolds}"; #this removes the "_scaffolds" substring
-	mkdir -p results/AssemblyNonHuman/PerSample/${grandparent_dir}/${file_base_id}; #create an output directory
-	# now run Kraken2
-	apptainer exec workflow/containers/env-kraken2db.sif kraken2 \
-	--db resources/kraken2_human_db/ --threads $thread_count \
-	--output results/AssemblyNonHuman/PerSample/${grandparent_dir}/${file_base_id}/${file_base_id}__kraken2_out.txt \
-    --report results/AssemblyNonHuman/PerSample/${grandparent_dir}/${file_base_id}/${file_base_id}__kraken2_report.txt \
-	--unclassified-out results/AssemblyNonHuman/PerSample/${grandparent_dir}/${file_base_id}/${file_base_id}_final.contigs_nonHuman.fasta \
-    $file;
-done;
-
-
-# create a file indicating program completion
-touch logs/completion/Kraken_perSample__COMPLETE.txt
+# merge the assemblies, classify them in one Kraken2 run & split the results per sample
+python workflow/scripts/kraken_batch.py merge ${batch_dir}/manifest.tsv ${batch_dir}/merged.fasta || exit $?;
+$instrument --stage kraken_perSample --sample ${cohort_id} --inputs ${batch_dir}/merged.fasta -- \
+apptainer exec workflow/containers/env-kraken2db.sif kraken2 \
+--db ${kraken_db} --memory-mapping --threads $thread_count \
+--output ${batch_dir}/merged__kraken2_out.txt \
+--report ${batch_dir}/merged__kraken2_report.txt \
+--unclassified-out ${batch_dir}/merged_nonHuman.fasta \
+${batch_dir}/merged.fasta || exit $?;
+python workflow/scripts/kraken_batch.py split --report ${batch_dir}/merged__kraken2_report.txt ${batch_dir}/manifest.tsv \
+${batch_dir}/merged__kraken2_out.txt ${batch_dir}/merged_nonHuman.fasta || exit $?;
+# record the classified assemblies so they are skipped by the next run
+python workflow/scripts/incremental.py record --stage kraken_perSample $(cut -f2 ${batch_dir}/manifest.tsv) || exit $?;
+
+# remove the merged batch files
+rm -r ${batch_dir};
 
 
 # Refs: 
@@ -54,6 +97,7 @@ touch logs/completion/Kraken_perSample__COMPLETE.txt
 # Kraken2 arguments: https://software.cqls.oregonstate.edu/updates/docs/kraken2/MANUAL.html
 # --db NAME Name for Kraken 2 DB
 # --threads NUM Number of threads (default: 1)
+# --memory-mapping Avoids loading database into RAM
 # --output FILENAME Print output to filename (default: stdout); "-" will suppress normal output
 # --report FILENAME Print a report with aggregrate counts/clade to file
 # --unclassified-out FILENAME Print unclassified sequences to filename
@@ -0,0 +1,72 @@
+#!/bin/bash
+
+###
+# Title: snakemake_megahit_cohort.sh
+# Date: 2026.10.17
+# Author: Vi Varga
+#
+# Description: 
+# This script will run MEGAHIT on one cohort as part of the SPOT-BGC Snakemake pipeline, 
+# in order to perform per-cohort assembly. 
+# It is run once per cohort by the assembly_perCohort rule, with the assembly mode & 
+# read files planned by cohort_assembly_plan.py: paired-end reads (PE), single-end reads 
+# (SE), or both together (PEandSE). 
+# 
+# Usage: 
+# 	./snakemake_megahit_cohort.sh threads mode cohort_id reads_1 reads_2 reads_se
+# 	OR
+# 	bash snakemake_megahit_cohort.sh threads mode cohort_id reads_1 reads_2 reads_se
+# 
+# 	Where the reads are comma-separated lists of files, and the lists that are not 
+# 	used by the assembly mode are ignored. 
+# 	Note that this script is intended to be run from the parent SPOT-BGC/ directory!
+#
+###
+
+
+# take the settings as positional arguments
+# ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
+thread_count=$1;
+mode=$2;
+cohort_id=$3;
+R1s=$4;
+R2s=$5;
+RSs=$6;
+
+out_dir=results/Assembly/PerCohort/${cohort_id};
+mkdir -p ${out_dir}; # create the directory if it doesn't exist
+# record the runtime, memory & I/O of each tool run (see instrument.py)
+instrument="python workflow/scripts/instrument.py";
+
+
+### Running MEGAHIT
+# MEGAHIT will not run if its output directory already exists
+rm -rf ${out_dir}/megahit/;
+# ref: https://merenlab.org/tutorials/assembly-based-metagenomics/
+if [[ "$mode" == "PEandSE" ]]; then
+	$instrument --stage assembly_perCohort --sample ${cohort_id} --inputs ${R1s//,/ } ${R2s//,/ } ${RSs//,/ } -- \
+	apptainer exec workflow/containers/metagenome_assembly.sif megahit -1 $R1s -2 $R2s -r $RSs \
+	-t $thread_count -o ${out_dir}/megahit/ || exit $?;
+elif [[ "$mode" == "PE" ]]; then
+	$instrument --stage assembly_perCohort --sample ${cohort_id} --inputs ${R1s//,/ } ${R2s//,/ } ${RSs//,/ } -- \
+	apptainer exec workflow/containers/metagenome_assembly.sif megahit -1 $R1s -2 $R2s \
+	-t $thread_count -o ${out_dir}/megahit/ || exit $?;
+else
+	$instrument --stage assembly_perCohort --sample ${cohort_id} --inputs ${R1s//,/ } ${R2s//,/ } ${RSs//,/ } -- \
+	apptainer exec workflow/containers/metagenome_assembly.sif megahit -r $RSs \
+	-t $thread_count -o ${out_dir}/megahit/ || exit $?;
+fi;
+# finally copy the primary output file to a more specific filename
+cp ${out_dir}/megahit/final.contigs.fa ${out_dir}/${cohort_id}_final.contigs.fa;
+# record the assembled reads (see incremental.py)
+python workflow/scripts/incremental.py record --stage assembly_perCohort ${R1s//,/ } ${R2s//,/ } ${RSs//,/ };
+
+
+# Refs: 
+# Megahit manual: https://home.cc.umanitoba.ca/~psgendb/doc/spades/manual.html
+# Usage: megahit [options] {-1 <pe1> -2 <pe2> | --12 <pe12> | -r <se>} [-o <out_dir>]
+# -1 <pe1> comma-separated list of fasta/q paired-end #1 files, paired with files in <pe2>
+# -2 <pe2> comma-separated list of fasta/q paired-end #2 files, paired with files in <pe1>
+# -r/--read <se> comma-separated list of fasta/q single-end files
+# -t/--num-cpu-threads <int> number of CPU threads [# of logical processors]
+# -o/--out-dir <string> output directory [./megahit_out]
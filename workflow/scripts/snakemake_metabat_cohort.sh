@@ -9,6 +9,8 @@
 # Description: 
 # This script will run MetaBAT on the non-human per-cohort assemblies in order to 
 # assemble the contigs into MAGs. 
+# Only the assemblies that are new or changed since they were last binned are 
+# binned (see incremental.py), so the bins of unchanged cohorts are left untouched. 
 # 
 # Usage: 
 # 	./snakemake_metabat_cohort.sh threads
@@ -23,18 +25,30 @@
 # take thread count as positional argument
 # ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
 thread_count=$1;
+# record the runtime, memory & I/O of each tool run (see instrument.py)
+instrument="python workflow/scripts/instrument.py";
+# a failure in any step of the pipelines below fails the script
+set -o pipefail;
 
 
 ### Running MetaBAT
 # run these in a while loop
-ls results/AssemblyNonHuman/PerCohort/[[:upper:]]*/*_nonHuman.fasta | while read file; do
-	# first designate variables & directories
-	parentname="$(basename "$(dirname "$file")")"; # this gets the parent/cohort directory name
+# the new or changed assemblies are listed by incremental.py,
+# & their cohort IDs are derived in one pass by sample_paths.py
+ls results/AssemblyNonHuman/PerCohort/[[:upper:]]*/*_nonHuman.fasta | \
+python workflow/scripts/incremental.py pending --stage metabat_perCohort --file-list /dev/stdin | \
+python workflow/scripts/sample_paths.py cohort-results | \
+while IFS=$'\t' read -r file parentname cohort_id file_base; do
+	# parentname is the parent/cohort directory name
 	mkdir -p results/MAGs/PerCohort/${parentname}; #create an output directory
-	# now run MetaBAT
+	# remove the bins of an earlier run of the cohort, which may have had more bins
+	rm -f results/MAGs/PerCohort/${parentname}/${parentname}_metabat2_minContig1500.*.fa;
+	# now run MetaBAT, & record the binned cohort so it is skipped by the next run
+	$instrument --stage metabat_perCohort --sample ${parentname} --inputs $file -- \
 	apptainer exec workflow/containers/metagenome_assembly.sif metabat2 -i $file -m 1500 -t $thread_count \
-	-o results/MAGs/PerCohort/${parentname}/${parentname}_metabat2_minContig1500; 
-done;
+	-o results/MAGs/PerCohort/${parentname}/${parentname}_metabat2_minContig1500 || exit $?;
+	python workflow/scripts/incremental.py record --stage metabat_perCohort $file || exit $?;
+done || exit $?;
 
 
 # create an output file to mark program completion
@@ -9,6 +9,8 @@
 # Description: 
 # This script will run MetaBAT on the non-human per-sample assemblies in order to 
 # assemble the contigs into MAGs. 
+# Only the assemblies that are new or changed since they were last binned are 
+# binned (see incremental.py), so the bins of unchanged samples are left untouched. 
 # 
 # Usage: 
 # 	./snakemake_metabat_sample.sh threads
@@ -23,23 +25,30 @@
 # take thread count as positional argument
 # ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
 thread_count=$1;
+# record the runtime, memory & I/O of each tool run (see instrument.py)
+instrument="python workflow/scripts/instrument.py";
+# a failure in any step of the pipelines below fails the script
+set -o pipefail;
 
 
 ### Running MetaBAT
 # run these in a while loop
-ls results/AssemblyNonHuman/PerSample/*/[[:upper:]]*/*_nonHuman.fasta | while read file; do
-	# first designate variables & directories
-	parentname="$(dirname "$(dirname "$file")")"; 
-	grandparent_dir="${parentname##*/}"; # this gets the grandparent/cohort directory name
-	full_file="${file##*/}"; #this line removes the path before the file name
-	file_base="${full_file%.*}"; #this line removes the file extension .fasta
- 	# ref: https://unix.stackexchange.com/questions/53310/splitting-string-by-the-first-occurrence-of-a-delimiter
-	file_base_id="$( cut -d "_" -f 1 <<< "$file_base" )"; #this selects only the sample ID from the name
+# the new or changed assemblies are listed by incremental.py,
+# & their cohort & sample IDs are derived in one pass by sample_paths.py
+ls results/AssemblyNonHuman/PerSample/*/[[:upper:]]*/*_nonHuman.fasta | \
+python workflow/scripts/incremental.py pending --stage metabat_perSample --file-list /dev/stdin | \
+python workflow/scripts/sample_paths.py sample-results | \
+while IFS=$'\t' read -r file grandparent_dir file_base_id file_base; do
+	# grandparent_dir is the cohort ID & file_base_id the sample ID
 	mkdir -p results/MAGs/PerSample/${grandparent_dir}/${file_base_id}; #create an output directory
-	# now run MetaBAT
+	# remove the bins of an earlier run of the sample, which may have had more bins
+	rm -f results/MAGs/PerSample/${grandparent_dir}/${file_base_id}/${file_base_id}_metabat2_minContig1500.*.fa;
+	# now run MetaBAT, & record the binned sample so it is skipped by the next run
+	$instrument --stage metabat_perSample --sample ${grandparent_dir}/${file_base_id} --inputs $file -- \
 	apptainer exec workflow/containers/metagenome_assembly.sif metabat2 -i $file -m 1500 -t $thread_count \
-	-o results/MAGs/PerSample/${grandparent_dir}/${file_base_id}/${file_base_id}_metabat2_minContig1500; 
-done;
+	-o results/MAGs/PerSample/${grandparent_dir}/${file_base_id}/${file_base_id}_metabat2_minContig1500 || exit $?;
+	python workflow/scripts/incremental.py record --stage metabat_perSample $file || exit $?;
+done || exit $?;
 
 
 # create an output file to mark program completion
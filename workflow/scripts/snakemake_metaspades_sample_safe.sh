@@ -0,0 +1,139 @@
+#!/bin/bash
+
+###
+# Title: snakemake_metaspades_sample_safe.sh
+# Date: 2026.10.17
+# Author: Vi Varga
+#
+# Description:
+# This script will run MetaSPAdes (paired-end) or SPAdes (single-end) on one sample
+# as part of the SPOT-BGC Snakemake pipeline, in order to perform per-sample assembly.
+# It is run once per sample by the assembly_perSample_sample rule, so that samples
+# can be assembled in parallel across the cluster.
+# As a backup, if MetaSPAdes runs for too long (6 hours by default), the MetaSPAdes
+# run will be cancelled, and MEGAHIT will be run on the sample, instead.
+# Samples predicted to be too complex for MetaSPAdes (see resource_estimation.py) are
+# assembled with MEGAHIT directly, by passing MEGAHIT as the assembler.
+# The final assembly is always written to {out_dir}/{sample_id}_scaffolds.fasta, and
+# the assembler that produced it is recorded in {out_dir}/{sample_id}_assembler.txt.
+#
+# Usage:
+# 	./snakemake_metaspades_sample_safe.sh layout assembler threads memory_mb time_limit out_dir sample_id reads_1 [reads_2]
+# 	OR
+# 	bash snakemake_metaspades_sample_safe.sh layout assembler threads memory_mb time_limit out_dir sample_id reads_1 [reads_2]
+#
+# 	Where layout is PE or SE, assembler is MetaSPAdes or MEGAHIT, memory_mb is the memory of the job
+# 	(in MB, as requested from Snakemake), and time_limit is a `timeout` duration (e.g., 6h).
+# 	Note that this script is intended to be run from the parent SPOT-BGC/ directory!
+#
+###
+
+
+### Set up variables
+
+# take the settings as positional arguments
+# ref: https://www.baeldung.com/linux/use-command-line-arguments-in-bash-script
+layout=$1;
+assembler=$2;
+thread_count=$3;
+memory_mb=$4;
+time_limit=$5;
+out_dir=$6;
+sample_id=$7;
+reads_1=$8;
+reads_2=$9;
+
+# (Meta)SPAdes takes its memory limit in whole GB
+memory_gb=$(( memory_mb / 1024 ));
+if [[ $memory_gb -lt 1 ]]; then memory_gb=1; fi;
+
+mkdir -p ${out_dir}; # create the output directory if it doesn't exist
+# record the runtime, memory & I/O of each tool run (see instrument.py)
+instrument="python workflow/scripts/instrument.py";
+
+
+### Running MetaSPAdes
+# skipped if the sample was predicted to be too complex for MetaSPAdes
+if [[ "$assembler" == "MEGAHIT" ]]; then
+	echo "${sample_id} is predicted to be too complex for MetaSPAdes: running MEGAHIT.";
+else
+	if [[ -f ${out_dir}/params.txt ]]; then
+		# an earlier run of this sample was interrupted, so resume from its last checkpoint
+		$instrument --stage assembly_perSample --sample ${sample_id} --inputs $reads_1 $reads_2 -- \
+		timeout $time_limit apptainer exec workflow/containers/metagenome_assembly.sif spades.py \
+		--restart-from last --threads $thread_count --memory $memory_gb -o ${out_dir};
+	elif [[ "$layout" == "PE" ]]; then
+		# now run the program, with a time limit for successful assembly
+		$instrument --stage assembly_perSample --sample ${sample_id} --inputs $reads_1 $reads_2 -- \
+		timeout $time_limit apptainer exec workflow/containers/metagenome_assembly.sif metaspades.py \
+		-1 $reads_1 -2 $reads_2 \
+		--checkpoints all --threads $thread_count --memory $memory_gb \
+		-o ${out_dir};
+	else
+		# metaspades proper doesn't work on SE reads, so SPAdes is used
+		$instrument --stage assembly_perSample --sample ${sample_id} --inputs $reads_1 $reads_2 -- \
+		timeout $time_limit apptainer exec workflow/containers/metagenome_assembly.sif spades.py \
+		-s $reads_1 --checkpoints all --threads $thread_count --memory $memory_gb \
+		-o ${out_dir};
+	fi;
+	# check exit status of the sample
+	exit_status=$?;
+	if [[ $exit_status -eq 0 ]]; then
+		# if MetaSPAdes completed successfully
+		# copy the primary output file to a more specific filename
+		cp ${out_dir}/scaffolds.fasta ${out_dir}/${sample_id}_scaffolds.fasta;
+		echo "MetaSPAdes" > ${out_dir}/${sample_id}_assembler.txt;
+		# record the assembled reads (see incremental.py)
+		python workflow/scripts/incremental.py record --stage assembly_perSample $reads_1 $reads_2;
+		exit 0;
+	elif [[ $exit_status -ne 124 ]]; then
+		# any other failure than a time-out fails the job, so Snakemake can retry it
+		exit $exit_status;
+	fi;
+	# if the exit status of MetaSPAdes was 124, this means the process timed out
+	echo "MetaSPAdes timed out after ${time_limit}: running MEGAHIT on ${sample_id}.";
+fi;
+
+
+### Running MEGAHIT on overly complex samples
+# MEGAHIT will not run if the directory already exists
+rm -rf ${out_dir}/megahit/;
+# now run the program
+if [[ "$layout" == "PE" ]]; then
+	$instrument --stage assembly_perSample --sample ${sample_id} --inputs $reads_1 $reads_2 -- \
+	apptainer exec workflow/containers/metagenome_assembly.sif megahit -1 $reads_1 -2 $reads_2 \
+	-t $thread_count -o ${out_dir}/megahit/ || exit $?;
+else
+	$instrument --stage assembly_perSample --sample ${sample_id} --inputs $reads_1 $reads_2 -- \
+	apptainer exec workflow/containers/metagenome_assembly.sif megahit -r $reads_1 \
+	-t $thread_count -o ${out_dir}/megahit/ || exit $?;
+fi;
+# finally copy the primary output file to the same filename as the MetaSPAdes assemblies
+cp ${out_dir}/megahit/final.contigs.fa ${out_dir}/${sample_id}_scaffolds.fasta;
+echo "MEGAHIT" > ${out_dir}/${sample_id}_assembler.txt;
+# record the assembled reads (see incremental.py)
+python workflow/scripts/incremental.py record --stage assembly_perSample $reads_1 $reads_2;
+
+
+# Refs:
+# Metaspades manual: https://home.cc.umanitoba.ca/~psgendb/doc/spades/manual.html
+# Usage: spades.py [options] -o <output_dir>
+# -o <output_dir> directory to store all the resulting files (required)
+# -1 <filename> file with forward paired-end reads
+# -2 <filename> file with reverse paired-end reads
+# -s <filename> file with unpaired reads
+# --checkpoints <last or all> ave intermediate check-points ('last', 'all')
+# --restart-from <cp> restart run with updated options and from the specified check-point ('last' for the last available)
+# -t <int>, --threads <int> number of threads. [default: 16]
+# -m <int>, --memory <int> RAM limit for SPAdes in Gb (terminates if exceeded). [default: 250]
+# metaspades proper doesn't work on SE reads:
+# ref: https://github.com/ablab/spades/discussions/1009
+# some recommend simply using SPAdes
+# ref: https://www.biostars.org/p/432620/
+# Megahit manual: https://home.cc.umanitoba.ca/~psgendb/doc/spades/manual.html
+# Usage: megahit [options] {-1 <pe1> -2 <pe2> | --12 <pe12> | -r <se>} [-o <out_dir>]
+# -1 <pe1> comma-separated list of fasta/q paired-end #1 files, paired with files in <pe2>
+# -2 <pe2> comma-separated list of fasta/q paired-end #2 files, paired with files in <pe1>
+# -r/--read <se> comma-separated list of fasta/q single-end files
+# -t/--num-cpu-threads <int> number of CPU threads [# of logical processors]
+# -o/--out-dir <string> output directory [./megahit_out]
@@ -8,6 +8,8 @@
 # Description: 
 # This script will generate the files needed to begin running the 
 # SPOT-BGC pipeline.
+# It can be re-run after adding new samples to resources/RawData/: only the
+# rows of the new files are added to the target files.
 # 
 # Usage: 
 # 	./snakemake_setup.sh
@@ -19,14 +21,12 @@
 ###
 
 
-# Navigate to the correct directory
-cd resources/RawData/
-# generate the file names file
-ls */*/*.fastq > FullFileNames.txt
-# navigate back up to resources/
-cd ..
+# Navigate to the resources/ directory
+cd resources/
 
 # run the python script below
-python ../workflow/scripts/create_input_target_db.py RawData/FullFileNames.txt
+# the RawData/ directory is scanned directly, and the target files are only
+# rewritten if the list of FASTQ files changed since the last run
+python ../workflow/scripts/create_input_target_db.py --scan RawData --incremental
 # and navigate back up to the main directory
 cd ..
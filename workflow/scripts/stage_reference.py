@@ -0,0 +1,307 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: stage_reference.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This program stages a reference index of the SPOT-BGC pipeline (the Bowtie2
+		index of the masked human genome, or the Kraken2 human database) to
+		node-local scratch, and runs a command on the local copy. With many
+		concurrent mapping & classification jobs on a SLURM cluster, reading the
+		indexes from the shared project filesystem in every job makes the shared
+		filesystem the bottleneck; with staging, each node copies an index once.
+	The staging cache lives in the cache directory (by default, $TMPDIR):
+		- Each index is copied into its own entry directory. The copy is checked
+			against a SHA-256 checksum manifest of the source files, and the manifest
+			is written into the entry last, so an entry without a matching manifest
+			is never used.
+		- An exclusive lock on the entry's lock file guards the copy, so concurrent
+			jobs on the same node wait for one copy instead of each making their own.
+			While the command runs, the job holds a shared lock on the entry, so the
+			entry is not evicted under a running job.
+		- Before a copy, the least recently used entries that are not in use are
+			evicted until the new entry fits under the size cap.
+	The checksum manifest of the source files is computed once & stored next to the
+		source (it is recomputed only if a source file's size or modification time
+		changes).
+	In the command, any argument equal to the source path is replaced by the path
+		of the local copy, which is also exported as $STAGED_REFERENCE & added to
+		$APPTAINER_BIND, so that containerized tools can read it. Without a cache
+		directory (or if the index does not fit), the command is run on the source.
+
+List of functions:
+	source_files(source, include): Lists the files of a reference index.
+	source_manifest(source, include): Returns the checksum manifest of the source
+		files, computing it only if the files changed.
+	copy_file(source_file, staged_file): Copies a file & returns its SHA-256 checksum.
+	evict(cache_dir, required_bytes, max_bytes, keep): Evicts the least recently used
+		entries not in use until required_bytes fit under max_bytes.
+	stage(source, cache_dir, max_bytes, include): Stages a reference index & returns
+		its local path & the open (shared-locked) entry lock file.
+
+List of standard and non-standard modules used:
+	sys
+	os
+	time
+	json
+	glob
+	fcntl
+	shutil
+	fnmatch
+	hashlib
+	argparse
+	subprocess
+
+Procedure:
+	1. Loading required modules & defining the staging functions.
+	2. Assigning command line arguments.
+	3. Staging the reference index (if a cache directory is available).
+	4. Running the command on the local copy, holding the shared lock.
+
+Known bugs and limitations:
+	- Locks use flock, so the cache directory must be on a node-local filesystem.
+	- When the whole shell command of a rule is run in a container (--use-apptainer),
+		the cache directory must also be bound into that container.
+
+Usage
+	./stage_reference.py [--cache-dir DIR] [--max-gb N] [--include PATTERN] [--disabled] source -- command [arg ...]
+	OR
+	python stage_reference.py [--cache-dir DIR] [--max-gb N] [--include PATTERN] [--disabled] source -- command [arg ...]
+
+	Where source is a directory (e.g., resources/kraken2_human_db) or the prefix of an
+	index (e.g., resources/Ref/GCA_000001405__29_GRCh38__p14_masked, with --include '*.bt2').
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules & define the staging functions
+
+# import necessary modules
+import sys # allows execution of script from command line
+import os # allows access to the operating system
+import time # enables recording of the last use of an entry
+import json # enables reading & writing the checksum manifests
+import glob # enables listing the files of a prefix index
+import fcntl # enables file locking
+import shutil # enables removal of evicted entries
+import fnmatch # enables filtering the files of an index
+import hashlib # enables SHA-256 checksums
+import argparse # enables parsing of command line arguments
+import subprocess # enables running the command
+
+
+# size of the blocks files are copied & checksummed in
+BLOCK_SIZE = 8 * 1024 * 1024
+
+# name of the staging cache below the cache directory
+CACHE_NAME = "spot-bgc_references"
+
+# name of the checksum manifest, next to the source & inside each entry
+MANIFEST_NAME = ".staging_manifest.json"
+
+
+def source_files(source, include=None):
+	"""List the files of a reference index (a directory, or a prefix), as paths relative to its base."""
+	if os.path.isdir(source):
+		base = source
+		files = [os.path.relpath(os.path.join(root, name), base)
+			for root, _, names in os.walk(source) for name in names]
+	else:
+		base = os.path.dirname(source) or "."
+		files = [os.path.basename(path) for path in glob.glob(glob.escape(source) + ".*")]
+	files = [name for name in files if not name.endswith(MANIFEST_NAME)
+		and (include is None or fnmatch.fnmatch(os.path.basename(name), include))]
+	return base, sorted(files)
+
+
+def _sha256(path):
+	"""Return the SHA-256 checksum of a file."""
+	checksum = hashlib.sha256()
+	with open(path, "rb") as infile:
+		for block in iter(lambda: infile.read(BLOCK_SIZE), b""):
+			checksum.update(block)
+	return checksum.hexdigest()
+
+
+def source_manifest(source, include=None):
+	"""Return the checksum manifest ({file: [size, mtime, sha256]}) of the source files.
+
+	The manifest is stored next to the source, and checksums are only recomputed for
+	files whose size or modification time changed.
+	"""
+	base, files = source_files(source, include)
+	manifest_file = os.path.join(source, MANIFEST_NAME) if os.path.isdir(source) else source + MANIFEST_NAME
+	try:
+		with open(manifest_file, "r") as infile:
+			stored = json.load(infile)
+	except (OSError, ValueError):
+		stored = {}
+	manifest = {}
+	for name in files:
+		stat = os.stat(os.path.join(base, name))
+		entry = stored.get(name)
+		if entry is not None and entry[:2] == [stat.st_size, stat.st_mtime]:
+			manifest[name] = entry
+		else:
+			manifest[name] = [stat.st_size, stat.st_mtime, _sha256(os.path.join(base, name))]
+	if manifest != stored:
+		# write atomically, as several jobs may compute the manifest at once
+		try:
+			with open(manifest_file + f".{os.getpid()}", "w") as outfile:
+				json.dump(manifest, outfile)
+			os.replace(manifest_file + f".{os.getpid()}", manifest_file)
+		except OSError:
+			pass
+	return manifest
+
+
+def copy_file(source_file, staged_file):
+	"""Copy a file & return the SHA-256 checksum of the data written."""
+	checksum = hashlib.sha256()
+	os.makedirs(os.path.dirname(staged_file), exist_ok=True)
+	with open(source_file, "rb") as infile, open(staged_file, "wb") as outfile:
+		for block in iter(lambda: infile.read(BLOCK_SIZE), b""):
+			checksum.update(block)
+			outfile.write(block)
+	return checksum.hexdigest()
+
+
+def _entry_size(entry_dir):
+	"""Return the total size of the files in an entry directory."""
+	return sum(os.path.getsize(os.path.join(root, name))
+		for root, _, names in os.walk(entry_dir) for name in names)
+
+
+def evict(cache_dir, required_bytes, max_bytes, keep):
+	"""Evict the least recently used entries not in use, until required_bytes fit under max_bytes.
+
+	Returns True if the required bytes fit (under the cap & on the disk).
+	"""
+	entries = []
+	for name in os.listdir(cache_dir):
+		entry_dir = os.path.join(cache_dir, name)
+		# skip the entry being staged, and copies in progress
+		if os.path.isdir(entry_dir) and name != keep and not name.endswith(".copy"):
+			last_used = os.path.getmtime(entry_dir + ".lock") if os.path.exists(entry_dir + ".lock") else 0
+			entries.append((last_used, entry_dir))
+	used_bytes = sum(_entry_size(entry_dir) for _, entry_dir in entries)
+	for _, entry_dir in sorted(entries):
+		if used_bytes + required_bytes <= max_bytes and shutil.disk_usage(cache_dir).free > required_bytes:
+			break
+		with open(entry_dir + ".lock", "a") as lock_file:
+			try:
+				fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+			except OSError:
+				# the entry is in use (or being copied) by another job
+				continue
+			size = _entry_size(entry_dir)
+			shutil.rmtree(entry_dir, ignore_errors=True)
+			used_bytes -= size
+			print(f"Evicted {entry_dir} ({size / 1e9:.1f} GB) from the staging cache.", file=sys.stderr)
+	return used_bytes + required_bytes <= max_bytes and shutil.disk_usage(cache_dir).free > required_bytes
+
+
+def stage(source, cache_dir, max_bytes, include=None):
+	"""Stage a reference index in the cache directory.
+
+	Returns the path of the local copy (or of the source, if it does not fit) & the
+	entry lock file, which is held with a shared lock until it is closed.
+	"""
+	manifest = source_manifest(source, include)
+	base, files = source_files(source, include)
+	source_id = hashlib.sha256(os.path.abspath(source).encode()).hexdigest()[:12]
+	name = f"{os.path.basename(os.path.normpath(source))}_{source_id}"
+	entry_dir = os.path.join(cache_dir, name)
+	staged_path = entry_dir if os.path.isdir(source) else os.path.join(entry_dir, os.path.basename(source))
+	os.makedirs(cache_dir, exist_ok=True)
+
+	lock_file = open(entry_dir + ".lock", "a")
+	fcntl.flock(lock_file, fcntl.LOCK_EX)
+	try:
+		try:
+			with open(os.path.join(entry_dir, MANIFEST_NAME), "r") as infile:
+				staged_manifest = json.load(infile)
+		except (OSError, ValueError):
+			staged_manifest = None
+		if staged_manifest != manifest:
+			shutil.rmtree(entry_dir, ignore_errors=True)
+			required_bytes = sum(size for size, _, _ in manifest.values())
+			with open(os.path.join(cache_dir, ".lock"), "a") as cache_lock:
+				fcntl.flock(cache_lock, fcntl.LOCK_EX)
+				fits = evict(cache_dir, required_bytes, max_bytes, keep=name)
+			if not fits:
+				print(f"{source} ({required_bytes / 1e9:.1f} GB) does not fit in the staging cache; "
+					"using the source.", file=sys.stderr)
+				fcntl.flock(lock_file, fcntl.LOCK_SH)
+				return source, lock_file
+			start = time.perf_counter()
+			copy_dir = entry_dir + ".copy"
+			shutil.rmtree(copy_dir, ignore_errors=True)
+			for file_name in files:
+				checksum = copy_file(os.path.join(base, file_name), os.path.join(copy_dir, file_name))
+				if checksum != manifest[file_name][2]:
+					shutil.rmtree(copy_dir, ignore_errors=True)
+					raise OSError(f"Checksum mismatch staging {os.path.join(base, file_name)}")
+			with open(os.path.join(copy_dir, MANIFEST_NAME), "w") as outfile:
+				json.dump(manifest, outfile)
+			os.rename(copy_dir, entry_dir)
+			print(f"Staged {source} in {entry_dir} in {time.perf_counter() - start:.0f} s.", file=sys.stderr)
+		# record the use of the entry for the LRU eviction
+		os.utime(entry_dir + ".lock")
+		fcntl.flock(lock_file, fcntl.LOCK_SH)
+	except BaseException:
+		lock_file.close()
+		raise
+	return staged_path, lock_file
+
+
+def main():
+	"""Parse the command line arguments, stage the reference index & run the command."""
+
+	# Part 2: Assign command line arguments
+
+	parser = argparse.ArgumentParser(description="Stage a reference index to node-local scratch & run a command on it.")
+	parser.add_argument("source", help="reference index directory, or index prefix")
+	parser.add_argument("command", nargs=argparse.REMAINDER, help="command to run, after --")
+	parser.add_argument("--cache-dir", default="", help="node-local cache directory (default: $TMPDIR)")
+	parser.add_argument("--max-gb", type=float, default=50, help="size cap of the staging cache (default: 50)")
+	parser.add_argument("--include", help="only stage the index files matching this pattern (e.g., '*.bt2')")
+	parser.add_argument("--disabled", action="store_true", help="run the command on the source")
+	args = parser.parse_args()
+	command = args.command[1:] if args.command[:1] == ["--"] else args.command
+	if not command:
+		parser.error("no command given")
+
+
+	# Part 3: Stage the reference index
+
+	cache_dir = args.cache_dir or os.environ.get("TMPDIR", "")
+	staged_path, lock_file = args.source, None
+	if not args.disabled and cache_dir:
+		staged_path, lock_file = stage(args.source, os.path.join(cache_dir, CACHE_NAME),
+			int(args.max_gb * 1e9), args.include)
+
+
+	# Part 4: Run the command on the local copy
+
+	environment = dict(os.environ, STAGED_REFERENCE=staged_path)
+	if staged_path != args.source:
+		bind_dir = os.path.dirname(staged_path) if not os.path.isdir(args.source) else staged_path
+		environment["APPTAINER_BIND"] = ",".join(filter(None, [os.environ.get("APPTAINER_BIND"), bind_dir]))
+	source_paths = {args.source, args.source.rstrip("/"), args.source.rstrip("/") + "/"}
+	command = [staged_path if arg in source_paths else arg for arg in command]
+	try:
+		return_code = subprocess.call(command, env=environment)
+	finally:
+		if lock_file is not None:
+			lock_file.close()
+	sys.exit(return_code)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,180 @@
+#!/bin/python
+# -*- coding: utf-8 -*-
+"""
+
+Title: target_index.py
+Date: 2026.10.17
+Author: Vi Varga
+
+Description:
+	This module parses the SPOT-BGC sample & cohort target files created by
+		create_input_target_db.py into an index of plain Python dictionaries & lists,
+		which the Snakefile uses to resolve wildcards to file paths with O(1) lookups.
+	The index is cached as a pickle file named after the SHA-256 hash of both target
+		files, so the target files are only parsed once: later Snakemake runs, and
+		every SLURM job that re-parses the Snakefile, load the cached index instead.
+	In the compressed preprocessing mode (compress_reads in the config file), a read
+		suffix (".gz") is appended to the trimmed, nonhuman, normalized & filtered
+		read locations of the target file.
+
+List of functions:
+	target_files_hash(sample_sheet, cohort_sheet, read_suffix): Returns the SHA-256
+		hash of the contents of both target files & the read suffix.
+	read_target_table(file_path): Reads a tab-separated target file into a list of
+		row dictionaries.
+	build_target_index(sample_sheet, cohort_sheet, read_suffix): Parses the target
+		files into the target index dictionary.
+	load_target_index(sample_sheet, cohort_sheet, cache_dir, read_suffix): Returns
+		the target index, from the cache if the target files are unchanged.
+
+List of standard and non-standard modules used:
+	os
+	csv
+	pickle
+	hashlib
+	cohort_assembly_plan (SPOT-BGC)
+
+Procedure:
+	1. Loading required modules.
+	2. Parsing the target files into dictionaries keyed by the wildcard values
+		used in the Snakefile rules.
+	3. Caching the index, keyed by the hash of the target files.
+
+Known bugs and limitations:
+	- If the same key occurs more than once in a target file (e.g., identical
+		file names in the same cohort), the last row wins.
+	- Old cache files are removed whenever a new index is cached.
+
+Usage
+	From the Snakefile:
+		from target_index import load_target_index
+		targets = load_target_index(config['targets_per_sample'], config['targets_per_cohort'],
+			config['target_index_cache'], READS_GZ)
+
+	From the command line, to (re)build the cache & print a summary:
+		python target_index.py sample_target_file cohort_target_file [cache_dir]
+
+This script was written for Python 3.9.19.
+
+"""
+
+
+# Part 1: Import modules
+
+# import necessary modules
+import os # allows access to the operating system
+import csv # enables parsing of tab-separated files
+import pickle # enables caching of the parsed index
+import hashlib # enables hashing of the target files
+from cohort_assembly_plan import plan_cohort_assemblies # plans the per-cohort assemblies
+
+
+# version of the index layout, part of the cache key
+INDEX_VERSION = "2"
+
+# read locations of the target file that are written by the pipeline, & so take the read suffix
+PIPELINE_READ_LOCATIONS = ["Location_Trim", "Location_NonHuman", "Location_Norm", "Location_100k"]
+
+
+# Part 2: Parse the target files into the index
+
+def target_files_hash(sample_sheet, cohort_sheet, read_suffix=""):
+	"""Return the SHA-256 hash of the contents of both target files & the read suffix."""
+	digest = hashlib.sha256((INDEX_VERSION + read_suffix).encode())
+	for file_path in (sample_sheet, cohort_sheet):
+		with open(file_path, "rb") as infile:
+			for chunk in iter(lambda: infile.read(1024 * 1024), b''):
+				digest.update(chunk)
+		# separate the two files in the hashed content
+		digest.update(b'\0')
+	return digest.hexdigest()
+
+
+def read_target_table(file_path):
+	"""Read a tab-separated target file into a list of row dictionaries."""
+	with open(file_path, "r", newline="") as infile:
+		return list(csv.DictReader(infile, delimiter="\t"))
+
+
+def build_target_index(sample_sheet, cohort_sheet, read_suffix=""):
+	"""Parse the target files into the target index dictionary.
+
+	The index contains lookup dictionaries for every wildcard->path mapping used by
+	the rules, and ordered lists of wildcard values used to expand the targets.
+	read_suffix (e.g., ".gz") is appended to the read files written by the pipeline.
+	"""
+	sample_rows = read_target_table(sample_sheet)
+	cohort_rows = read_target_table(cohort_sheet)
+	if read_suffix:
+		for row in sample_rows:
+			for column in PIPELINE_READ_LOCATIONS:
+				row[column] += read_suffix
+	# split the rows by read type
+	rows_by_read = {"1": [], "2": [], "SE": []}
+	for row in sample_rows:
+		rows_by_read.setdefault(row["ReadNum"], []).append(row)
+
+	index = {
+		# raw & trimmed read locations, keyed by Cohort/FileBase
+		"raw_by_cohort_base": {row["CohortBase_Raw"]: row["Location_Raw"] for row in sample_rows},
+		"trim_by_cohort_base": {row["CohortBase_Trim"]: row["Location_Trim"] for row in sample_rows},
+		# per-read-type locations, keyed by Cohort/Sample
+		"trim_r1": {row["CohortSample"]: row["Location_Trim"] for row in rows_by_read["1"]},
+		"trim_r2": {row["CohortSample"]: row["Location_Trim"] for row in rows_by_read["2"]},
+		"trim_se": {row["CohortSample"]: row["Location_Trim"] for row in rows_by_read["SE"]},
+		"nonhuman_r1": {row["CohortSample"]: row["Location_NonHuman"] for row in rows_by_read["1"]},
+		"nonhuman_r2": {row["CohortSample"]: row["Location_NonHuman"] for row in rows_by_read["2"]},
+		"nonhuman_se": {row["CohortSample"]: row["Location_NonHuman"] for row in rows_by_read["SE"]},
+		# wildcard values used to expand the targets, in target file order
+		"cohort_bases_raw": [row["CohortBase_Raw"] for row in sample_rows],
+		"cohort_bases_trim": [row["CohortBase_Trim"] for row in sample_rows],
+		"cohorts": list(dict.fromkeys(row["Cohort"] for row in sample_rows)),
+		"pe_samples": list(dict.fromkeys(row["CohortSample"] for row in rows_by_read["1"])),
+		"se_samples": list(dict.fromkeys(row["CohortSample"] for row in rows_by_read["SE"])),
+		"pe_cohorts": list(dict.fromkeys(row["Cohort"] for row in rows_by_read["1"])),
+		"se_cohorts": list(dict.fromkeys(row["Cohort"] for row in rows_by_read["SE"])),
+		# per-cohort target information, keyed by Cohort
+		"cohort_targets": {row["Cohort"]: row for row in cohort_rows},
+		# per-cohort assembly mode & normalized read files, keyed by Cohort
+		"cohort_assemblies": plan_cohort_assemblies(sample_rows),
+	}
+	return index
+
+
+# Part 3: Cache the index
+
+def load_target_index(sample_sheet, cohort_sheet, cache_dir, read_suffix=""):
+	"""Return the target index, from the cache if the target files are unchanged."""
+	digest = target_files_hash(sample_sheet, cohort_sheet, read_suffix)
+	cache_file = os.path.join(cache_dir, digest + ".pickle")
+	if os.path.exists(cache_file):
+		try:
+			with open(cache_file, "rb") as infile:
+				return pickle.load(infile)
+		except (OSError, EOFError, pickle.UnpicklingError):
+			# an unreadable cache file is simply rebuilt
+			pass
+
+	index = build_target_index(sample_sheet, cohort_sheet, read_suffix)
+	os.makedirs(cache_dir, exist_ok=True)
+	# write to a temporary file first, so concurrent jobs never read a partial cache
+	tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+	with open(tmp_file, "wb") as outfile:
+		pickle.dump(index, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+	os.replace(tmp_file, cache_file)
+	# remove the caches of earlier versions of the target files
+	for file_name in os.listdir(cache_dir):
+		if file_name.endswith(".pickle") and file_name != digest + ".pickle":
+			try:
+				os.remove(os.path.join(cache_dir, file_name))
+			except OSError:
+				pass
+	return index
+
+
+if __name__ == "__main__":
+	import sys # allows execution of script from command line
+	cache_dir = sys.argv[3] if len(sys.argv) > 3 else ".snakemake/spot-bgc_target_index"
+	target_index = load_target_index(sys.argv[1], sys.argv[2], cache_dir)
+	print(f"{len(target_index['cohorts'])} cohorts, {len(target_index['pe_samples'])} PE samples, "
+		f"{len(target_index['se_samples'])} SE samples indexed in {cache_dir}")